@@ -0,0 +1,418 @@
+"""
+In-process stand-ins for the BigQuery, Gemini, Dataplex and GitHub clients.
+
+They replay the responses of a fixture (see `benchmarks/fixtures.py`) with configurable
+latency and error injection, and count every RPC so a benchmark can report calls per
+stage. Only the methods the pipeline actually calls are implemented.
+"""
+import base64
+import datetime
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class InjectedError(Exception):
+    """
+    Error raised by the fakes. `code`/`status` make it look like a GCP or GitHub
+    error to `core.retry`, so 429/503 are retried exactly like the real ones.
+    """
+
+    def __init__(self, code: int, rpc: str):
+        super().__init__(f"injected {code} on {rpc}")
+        self.code = code
+        self.status = code
+
+
+@dataclass
+class FaultProfile:
+    """
+    Latency and error injection of one fake service.
+
+    Args:
+        latency (float): Mean seconds per RPC.
+        jitter (float): Uniform +/- seconds added to the latency.
+        error_rate (float): Probability of a transient error (503) per RPC.
+        quota_rate (float): Probability of a quota error (429) per RPC.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    quota_rate: float = 0.0
+
+
+class _FakeService:
+    def __init__(self, faults: Optional[FaultProfile] = None, seed: int = 0):
+        self.faults = faults or FaultProfile()
+        self.calls: Dict[str, int] = {}
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _rpc(self, name: str):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            roll = self._random.random()
+            delay = max(0.0, self.faults.latency + self._random.uniform(-self.faults.jitter, self.faults.jitter))
+        if delay:
+            time.sleep(delay)
+        if roll < self.faults.quota_rate:
+            with self._lock:
+                self.errors += 1
+            raise InjectedError(429, name)
+        if roll < self.faults.quota_rate + self.faults.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise InjectedError(503, name)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+            self.errors = 0
+
+
+# --- BigQuery ---
+
+_STANDARD_TYPE_NAMES = {"INTEGER": "INT64", "FLOAT": "FLOAT64", "BOOLEAN": "BOOL", "RECORD": "STRUCT"}
+
+
+class _QueryJob:
+    def __init__(self, rows: list, total_bytes_processed: int = 0):
+        self._rows = rows
+        self.total_bytes_processed = total_bytes_processed
+
+    def result(self):
+        return self._rows
+
+
+def _schema_field(column: dict):
+    return SimpleNamespace(
+        name=column["name"],
+        field_type=column["field_type"],
+        description=column.get("description"),
+        mode=column.get("mode", "NULLABLE"),
+        fields=[_schema_field(f) for f in column.get("fields", [])],
+    )
+
+
+class FakeBigQueryClient(_FakeService):
+    """
+    Answers `list_datasets`, `list_tables`, `get_table` and the queries issued by the
+    harvester (`__TABLES__`, INFORMATION_SCHEMA) and the profiler (dry run + aggregate).
+    """
+
+    def __init__(self, datasets: Dict[str, List[dict]], project: str = "bench-project", faults: Optional[FaultProfile] = None, seed: int = 0):
+        super().__init__(faults, seed)
+        self.project = project
+        self.datasets = datasets  # dataset id -> [TableMetadata dicts]
+
+    def _tables(self, ref: str) -> List[dict]:
+        # `dataset`, `project.dataset` or `project.dataset.table`
+        dataset = next((part for part in reversed(ref.split(".")) if part in self.datasets), None)
+        return self.datasets.get(dataset, [])
+
+    def list_datasets(self, project: Optional[str] = None):
+        self._rpc("list_datasets")
+        return [SimpleNamespace(dataset_id=d) for d in self.datasets]
+
+    def list_tables(self, dataset_id: str):
+        self._rpc("list_tables")
+        return [SimpleNamespace(table_id=t["table_id"]) for t in self._tables(dataset_id)]
+
+    def get_table(self, table_ref: str):
+        self._rpc("get_table")
+        dataset_ref, table_id = table_ref.rsplit(".", 1)
+        table = next(t for t in self._tables(dataset_ref) if t["table_id"] == table_id)
+        return SimpleNamespace(
+            table_id=table_id,
+            description=table.get("description"),
+            schema=[_schema_field(c) for c in table["columns"]],
+            modified=datetime.datetime.fromtimestamp(table.get("last_modified", 0) / 1000, tz=datetime.timezone.utc),
+        )
+
+    def query(self, sql: str, job_config=None):
+        self._rpc("query")
+        dataset = re.search(r"`([\w.-]+?)(?:\.__TABLES__)?`", sql)
+        tables = self._tables(dataset.group(1)) if dataset else []
+        if getattr(job_config, "dry_run", False):
+            # ~8 bytes per column and row, which is enough to exercise the byte budget
+            table = next((t for t in tables if f".{t['table_id']}`" in sql), {"columns": [], "rows": 0})
+            return _QueryJob([], 8 * len(table["columns"]) * table.get("rows", 0))
+        if "__TABLES__" in sql:
+            return _QueryJob([{"table_id": t["table_id"], "last_modified_time": t.get("last_modified", 0)} for t in tables])
+        if "COLUMN_FIELD_PATHS" in sql:
+            return _QueryJob(list(self._column_rows(tables)))
+        if "TABLE_OPTIONS" in sql:
+            return _QueryJob([{"table_name": t["table_id"], "option_value": json.dumps(t["description"])} for t in tables if t.get("description")])
+        # Profile query: a row count is enough for the pipeline to go on
+        table = next((t for t in tables if f".{t['table_id']}`" in sql), {"rows": 0})
+        return _QueryJob([{"row_count": table.get("rows", 0)}])
+
+    def _column_rows(self, tables: List[dict]):
+        def walk(table_id: str, columns: List[dict], prefix: str = "", top: str = ""):
+            for column in columns:
+                path = f"{prefix}{column['name']}"
+                data_type = _STANDARD_TYPE_NAMES.get(column["field_type"], column["field_type"])
+                if column.get("mode") == "REPEATED":
+                    data_type = f"ARRAY<{data_type}>"
+                yield {"table_name": table_id, "column_name": top or column["name"], "field_path": path,
+                       "data_type": data_type, "description": column.get("description")}
+                yield from walk(table_id, column.get("fields", []), f"{path}.", top or column["name"])
+
+        for table in tables:
+            yield from walk(table["table_id"], table["columns"])
+
+
+# --- Gemini ---
+
+class FakeGenerativeModel(_FakeService):
+    """
+    Replays recorded rule proposals: for every table named in the prompt, the rules
+    recorded for it in the fixture. Latency is per call plus `seconds_per_1k_tokens` of
+    output, so larger prompts/responses cost more as with the real model.
+    """
+
+    def __init__(self, rules_by_table: Dict[str, List[dict]], faults: Optional[FaultProfile] = None,
+                 seconds_per_1k_tokens: float = 0.0, seed: int = 0):
+        super().__init__(faults, seed)
+        self.rules_by_table = rules_by_table
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+    def _response(self, prompt: str) -> str:
+        tables = re.findall(r"^\s*(?:## |Table: )([\w-]+)", prompt, flags=re.MULTILINE)
+        rules = [rule for table in dict.fromkeys(tables) for rule in self.rules_by_table.get(table, [])]
+        return json.dumps({"rules": rules}, indent=2)
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        self._rpc("generate_content")
+        text = self._response(prompt)
+        with self._lock:
+            self.prompt_chars += len(prompt)
+            self.response_chars += len(text)
+        if self.seconds_per_1k_tokens:
+            time.sleep(self.seconds_per_1k_tokens * len(text) / 4000)
+        if not stream:
+            return SimpleNamespace(text=text)
+        return iter([SimpleNamespace(text=text[i:i + 2048]) for i in range(0, len(text), 2048)])
+
+
+# --- Dataplex business glossary ---
+
+class _Operation:
+    def __init__(self, value=None):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+class _Pager:
+    def __init__(self, items: list, attribute: str, page_size: int):
+        self._pages = [items[i:i + page_size] for i in range(0, len(items), page_size)] or [[]]
+        self.attribute = attribute
+
+    @property
+    def pages(self):
+        for page in self._pages:
+            yield SimpleNamespace(**{self.attribute: page})
+
+
+class FakeGlossaryServiceClient(_FakeService):
+    """
+    In-memory `BusinessGlossaryServiceClient`: glossaries, categories and terms with
+    create/get/list/update/delete and paginated listings.
+    """
+
+    def __init__(self, faults: Optional[FaultProfile] = None, page_size: int = 1000, seed: int = 0):
+        super().__init__(faults, seed)
+        self.page_size = page_size
+        self.glossaries: Dict[str, object] = {}
+        self.items: Dict[str, Dict[str, object]] = {"categories": {}, "terms": {}}
+
+    @staticmethod
+    def _exceptions():
+        from google.api_core import exceptions
+
+        return exceptions
+
+    def _store(self, kind: str, parent: str, item, item_id: str):
+        name = f"{parent}/{kind}/{item_id}"
+        with self._lock:
+            if name in self.items[kind]:
+                raise self._exceptions().AlreadyExists(name)
+            item.name = name
+            self.items[kind][name] = item
+        return item
+
+    def _remove(self, kind: str, name: str):
+        with self._lock:
+            if self.items[kind].pop(name, None) is None:
+                raise self._exceptions().NotFound(name)
+
+    def create_glossary(self, parent: str, glossary, glossary_id: str):
+        self._rpc("create_glossary")
+        name = f"{parent}/glossaries/{glossary_id}"
+        if name in self.glossaries:
+            raise self._exceptions().AlreadyExists(name)
+        glossary.name = name
+        self.glossaries[name] = glossary
+        return _Operation(glossary)
+
+    def update_glossary(self, glossary, update_mask=None):
+        self._rpc("update_glossary")
+        self.glossaries[glossary.name] = glossary
+        return _Operation(glossary)
+
+    def get_glossary(self, name: str):
+        self._rpc("get_glossary")
+        if name not in self.glossaries:
+            raise self._exceptions().NotFound(name)
+        return self.glossaries[name]
+
+    def delete_glossary(self, name: str):
+        self._rpc("delete_glossary")
+        self.glossaries.pop(name, None)
+        return _Operation()
+
+    def create_glossary_category(self, parent: str, category, category_id: str):
+        self._rpc("create_glossary_category")
+        return self._store("categories", parent, category, category_id)
+
+    def create_glossary_term(self, parent: str, term, term_id: str):
+        self._rpc("create_glossary_term")
+        return self._store("terms", parent, term, term_id)
+
+    def update_glossary_category(self, category, update_mask=None):
+        self._rpc("update_glossary_category")
+        self.items["categories"][category.name] = category
+        return category
+
+    def update_glossary_term(self, term, update_mask=None):
+        self._rpc("update_glossary_term")
+        self.items["terms"][term.name] = term
+        return term
+
+    def delete_glossary_category(self, name: str):
+        self._rpc("delete_glossary_category")
+        self._remove("categories", name)
+
+    def delete_glossary_term(self, name: str):
+        self._rpc("delete_glossary_term")
+        self._remove("terms", name)
+
+    def _list(self, kind: str, parent: str) -> _Pager:
+        self._rpc(f"list_glossary_{kind}")
+        with self._lock:
+            items = [item for name, item in self.items[kind].items() if name.startswith(f"{parent}/")]
+        return _Pager(items, kind, self.page_size)
+
+    def list_glossary_categories(self, parent: str):
+        return self._list("categories", parent)
+
+    def list_glossary_terms(self, parent: str):
+        return self._list("terms", parent)
+
+
+# --- GitHub ---
+
+class FakeGitHubRepo(_FakeService):
+    """
+    In-memory repository for `GitHubClient`: refs, trees, blobs, commits and pull
+    requests of the Git Data and Contents APIs used when publishing proposals.
+    """
+
+    def __init__(self, files: Optional[Dict[str, str]] = None, faults: Optional[FaultProfile] = None, seed: int = 0):
+        super().__init__(faults, seed)
+        self._ids = itertools.count(1)
+        self.blobs: Dict[str, str] = {}
+        self.trees: Dict[str, List[SimpleNamespace]] = {}
+        self.commits: Dict[str, SimpleNamespace] = {}
+        self.refs: Dict[str, str] = {}
+        self.pulls: List[str] = []
+        root = self._tree_from_files(files or {})
+        commit = self._commit(root)
+        self.refs["heads/main"] = commit.sha
+
+    def _sha(self, payload: str) -> str:
+        return hashlib.sha1(f"{next(self._ids)}:{payload}".encode("utf-8")).hexdigest()
+
+    def _blob(self, content: str) -> str:
+        from core.github_client import git_blob_sha
+
+        sha = git_blob_sha(content)
+        self.blobs[sha] = content
+        return sha
+
+    def _tree_from_files(self, files: Dict[str, str]) -> str:
+        directories: Dict[str, Dict[str, str]] = {}
+        entries = []
+        for path, content in files.items():
+            directory, _, name = path.rpartition("/")
+            if directory:
+                directories.setdefault(directory, {})[name] = content
+            else:
+                entries.append(SimpleNamespace(path=name, type="blob", sha=self._blob(content)))
+        for directory, children in directories.items():
+            entries.append(SimpleNamespace(path=directory, type="tree", sha=self._tree_from_files(children)))
+        sha = self._sha("tree")
+        self.trees[sha] = entries
+        return sha
+
+    def _commit(self, tree_sha: str) -> SimpleNamespace:
+        commit = SimpleNamespace(sha=self._sha("commit"), tree=SimpleNamespace(sha=tree_sha))
+        self.commits[commit.sha] = commit
+        return commit
+
+    def get_git_ref(self, ref: str):
+        self._rpc("get_git_ref")
+        return SimpleNamespace(object=SimpleNamespace(sha=self.refs[ref]))
+
+    def create_git_ref(self, ref: str, sha: str):
+        self._rpc("create_git_ref")
+        self.refs[ref.replace("refs/", "", 1)] = sha
+
+    def get_git_commit(self, sha: str):
+        self._rpc("get_git_commit")
+        return self.commits[sha]
+
+    def get_git_tree(self, sha: str, recursive: bool = False):
+        self._rpc("get_git_tree")
+        return SimpleNamespace(sha=sha, tree=list(self.trees[sha]))
+
+    def get_git_blob(self, sha: str):
+        self._rpc("get_git_blob")
+        return SimpleNamespace(sha=sha, content=base64.b64encode(self.blobs[sha].encode("utf-8")).decode("ascii"))
+
+    def create_git_tree(self, elements: list, base_tree=None):
+        self._rpc("create_git_tree")
+        sha = self._sha("tree")
+        self.trees[sha] = list(self.trees.get(getattr(base_tree, "sha", None), [])) + [
+            SimpleNamespace(path=f"new-{i}", type="blob", sha=self._sha("blob")) for i, _ in enumerate(elements)
+        ]
+        return SimpleNamespace(sha=sha)
+
+    def create_git_commit(self, message: str, tree, parents: list):
+        self._rpc("create_git_commit")
+        return self._commit(tree.sha)
+
+    def create_file(self, path: str, message: str, content: str, branch: str):
+        self._rpc("create_file")
+        self._blob(content)
+
+    def create_pull(self, title: str, body: str, head: str, base: str):
+        self._rpc("create_pull")
+        self.pulls.append(head)
+        return SimpleNamespace(html_url=f"https://github.invalid/pull/{len(self.pulls)}")
@@ -0,0 +1,115 @@
+"""
+Benchmark fixtures: the datasets, model responses and glossary replayed by the fakes.
+
+A fixture is a JSON document:
+
+    {
+      "datasets": {"<dataset>": [<TableMetadata dict + "rows">, ...]},
+      "rules_by_table": {"<table>": [<rule>, ...]},
+      "glossary": {"glossary": {"categories": [...]}}
+    }
+
+`synthetic_fixture` builds one deterministically (seeded) for a given size; fixtures
+recorded from real runs can be saved in the same format and replayed with `--fixture`.
+"""
+import json
+import random
+from typing import Dict, List
+
+# Column archetypes: (name, type, description, rule kinds the model would propose)
+_COLUMNS = [
+    ("{entity}_id", "INTEGER", "Identifier of the {entity}", ["UNIQUENESS", "NOT_NULL"]),
+    ("{entity}_code", "STRING", "Business code of the {entity}", ["REGEX"]),
+    ("email", "STRING", "Contact email address", ["REGEX"]),
+    ("phone_number", "STRING", "Contact phone number in E.164 format", ["REGEX"]),
+    ("status", "STRING", "Lifecycle status", ["SET"]),
+    ("country_code", "STRING", "ISO 3166-1 alpha-2 country code", ["SET"]),
+    ("amount", "NUMERIC", "Amount in the account currency", ["RANGE"]),
+    ("quantity", "INTEGER", "Number of units", ["RANGE"]),
+    ("{entity}_date", "DATE", "Business date of the {entity}", ["RANGE"]),
+    ("notes", "STRING", "Free text notes entered by the operator", []),
+    ("is_active", "BOOLEAN", "Whether the {entity} is active", ["NOT_NULL"]),
+]
+_AUDIT_COLUMNS = [
+    ("created_at", "TIMESTAMP", "Creation timestamp", ["NOT_NULL"]),
+    ("updated_at", "TIMESTAMP", "Last update timestamp", []),
+    ("etl_batch_id", "STRING", "Load batch identifier", []),
+]
+_ENTITIES = ["customer", "order", "product", "invoice", "payment", "shipment", "supplier", "account", "store", "employee"]
+_RULE_TEMPLATES = {
+    "UNIQUENESS": {"dimension": "UNIQUENESS"},
+    "NOT_NULL": {"dimension": "COMPLETENESS"},
+    "REGEX": {"dimension": "VALIDITY", "parameters": {"pattern": "^[A-Z0-9._%+-]+$"}},
+    "SET": {"dimension": "VALIDITY", "parameters": {"values": ["A", "B", "C"]}},
+    "RANGE": {"dimension": "VALIDITY", "parameters": {"min": 0}},
+}
+
+
+def _table(rng: random.Random, index: int, max_columns: int) -> dict:
+    entity = rng.choice(_ENTITIES)
+    columns = []
+    for position in range(rng.randint(3, max_columns)):
+        name, field_type, description, _ = _COLUMNS[position % len(_COLUMNS)]
+        suffix = f"_{position // len(_COLUMNS)}" if position >= len(_COLUMNS) else ""
+        columns.append({"name": name.format(entity=entity) + suffix, "field_type": field_type,
+                        "description": description.format(entity=entity), "mode": "NULLABLE", "fields": []})
+    if rng.random() < 0.3:
+        columns.append({"name": "address", "field_type": "RECORD", "description": "Postal address", "mode": "NULLABLE", "fields": [
+            {"name": "city", "field_type": "STRING", "description": "City", "mode": "NULLABLE", "fields": []},
+            {"name": "postal_code", "field_type": "STRING", "description": "Postal code", "mode": "NULLABLE", "fields": []},
+        ]})
+    columns += [{"name": n, "field_type": t, "description": d, "mode": "NULLABLE", "fields": []} for n, t, d, _ in _AUDIT_COLUMNS]
+    return {
+        "table_id": f"{entity}_{index:04d}",
+        "description": f"{entity.capitalize()} records, table {index}",
+        "columns": columns,
+        "last_modified": 1_700_000_000_000 + index,
+        "rows": rng.choice([1_000, 50_000, 2_000_000, 80_000_000]),
+    }
+
+
+def _rules(table: dict) -> List[dict]:
+    kinds_by_name = {}
+    for name, _, _, kinds in _COLUMNS + _AUDIT_COLUMNS:
+        kinds_by_name[name.split("{entity}")[-1] if "{entity}" in name else name] = kinds
+    rules = []
+    for column in table["columns"]:
+        base = column["name"].rsplit("_", 1)[0] if column["name"][-1].isdigit() else column["name"]
+        kinds = next((k for suffix, k in kinds_by_name.items() if base.endswith(suffix)), [])
+        for kind in kinds:
+            rules.append(dict(_RULE_TEMPLATES[kind], table=table["table_id"], column=column["name"], type=kind,
+                              description=f"{kind} check on {column['name']}"))
+    return rules
+
+
+def synthetic_fixture(tables: int = 10, glossary_terms: int = 0, max_columns: int = 40, dataset_id: str = "bench_dataset", seed: int = 7) -> dict:
+    """
+    Deterministic fixture with `tables` tables (3 to `max_columns` columns each, shared
+    audit columns, some nested records) and a glossary of `glossary_terms` terms.
+    """
+    rng = random.Random(seed)
+    dataset = [_table(rng, i, max_columns) for i in range(tables)]
+    categories = []
+    for c in range(max(1, glossary_terms // 50) if glossary_terms else 0):
+        categories.append({"id": f"category-{c}", "display_name": f"Category {c}", "description": f"Business area {c}", "terms": []})
+    for t in range(glossary_terms):
+        categories[t % len(categories)]["terms"].append({
+            "term": f"Term {t}",
+            "definition": f"Definition of business term {t} used across reports.",
+            "labels": {"owner": f"team-{t % 7}"},
+        })
+    return {
+        "datasets": {dataset_id: dataset},
+        "rules_by_table": {t["table_id"]: _rules(t) for t in dataset},
+        "glossary": {"glossary": {"categories": categories}},
+    }
+
+
+def load_fixture(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(fixture: Dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
@@ -0,0 +1,210 @@
+"""
+Offline benchmarks of the pipeline stages against the fakes in `benchmarks/fakes.py`.
+
+Scenarios:
+    tables-10 / tables-100 / tables-1000   harvest, generate and publish DQ rules
+    terms-100 / terms-5000                 publish and reconcile a business glossary
+
+Each stage reports wall time, RPCs per fake service, injected errors and peak Python
+memory (tracemalloc). Nothing is sent to GCP or GitHub.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scenario tables-100 --latency 0.02 --error-rate 0.01
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import io
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Placeholders so `config.settings` validates without a real environment
+for _name, _value in {"PROJECT_ID": "bench-project", "LOCATION": "us", "GCS_BUCKET": "bench-bucket",
+                      "DATASET_ID": "bench_dataset", "TABLE_ID": "-", "GEMINI_API_KEY": "-"}.items():
+    os.environ.setdefault(_name, _value)
+
+from core import rate_limit
+from benchmarks.fakes import FakeBigQueryClient, FakeGenerativeModel, FakeGitHubRepo, FakeGlossaryServiceClient, FaultProfile
+from benchmarks.fixtures import load_fixture, save_fixture, synthetic_fixture
+
+SCENARIOS = {
+    "tables-10": dict(tables=10),
+    "tables-100": dict(tables=100),
+    "tables-1000": dict(tables=1000),
+    "terms-100": dict(glossary_terms=100),
+    "terms-5000": dict(glossary_terms=5000),
+}
+# Default error rates per service, roughly what each API shows in production runs
+DEFAULT_ERROR_RATES = {"bigquery": 0.01, "gemini": 0.02, "dataplex": 0.005, "github": 0.01}
+
+
+@dataclass
+class StageResult:
+    scenario: str
+    stage: str
+    seconds: float
+    rpcs: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    peak_memory_mb: Optional[float] = None
+    ok: bool = True
+    detail: str = ""
+
+
+def run_stage(scenario: str, stage: str, func: Callable, fakes: List, measure_memory: bool = True, verbose: bool = False):
+    """
+    Runs one stage, returning its `StageResult` and the value returned by `func`.
+    The pipeline's own progress output is hidden unless `verbose`.
+    """
+    for fake in fakes:
+        fake.reset()
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    value, ok, detail = None, True, ""
+    try:
+        with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+            value = func()
+    except Exception as e:
+        ok, detail = False, f"{type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+    peak = None
+    if measure_memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    rpcs = {f"{type(fake).__name__.replace('Fake', '')}.{name}": n for fake in fakes for name, n in sorted(fake.calls.items())}
+    return StageResult(scenario, stage, seconds, rpcs, sum(f.errors for f in fakes), peak, ok, detail), value
+
+
+def _faults(args, service: str) -> FaultProfile:
+    error_rate = args.error_rate if args.error_rate is not None else DEFAULT_ERROR_RATES[service]
+    return FaultProfile(latency=args.latency, jitter=args.jitter, error_rate=error_rate, quota_rate=args.quota_rate)
+
+
+def bench_quality_rules(name: str, fixture: dict, args) -> List[StageResult]:
+    import main
+    from core.github_client import GitHubClient
+    from modules.data_quality import DataQualityGenerator
+
+    dataset_id, tables = next(iter(fixture["datasets"].items()))
+    bigquery = FakeBigQueryClient(fixture["datasets"], faults=_faults(args, "bigquery"), seed=args.seed)
+    gemini = FakeGenerativeModel(fixture["rules_by_table"], faults=_faults(args, "gemini"),
+                                 seconds_per_1k_tokens=args.seconds_per_1k_tokens, seed=args.seed)
+    repo = FakeGitHubRepo(faults=_faults(args, "github"), seed=args.seed)
+    results = []
+
+    result, metadata = run_stage(name, "harvest", lambda: main.get_tables_from_bigquery(
+        bigquery.project, "us", dataset_id, cache=None, client=bigquery), [bigquery], not args.no_memory, args.verbose)
+    result.detail = result.detail or f"{len(metadata or [])}/{len(tables)} tables"
+    results.append(result)
+    if not metadata:
+        return results
+
+    dq_gen = DataQualityGenerator(model=gemini)
+    result, proposal = run_stage(name, "generate", lambda: main.generate_quality_rules(
+        dq_gen, bigquery.project, dataset_id, metadata), [gemini], not args.no_memory, args.verbose)
+    if proposal:
+        result.detail = f"{len(json.loads(proposal)['rules'])} rules, {gemini.prompt_chars // 4} prompt tokens"
+    results.append(result)
+    if not proposal:
+        return results
+
+    github = GitHubClient(repo=repo)
+    result, urls = run_stage(name, "publish", lambda: github.create_proposals_pr({dataset_id: proposal}), [repo],
+                             not args.no_memory, args.verbose)
+    result.detail = result.detail or f"{sum(1 for url in (urls or {}).values() if url)} PRs"
+    results.append(result)
+    return results
+
+
+def bench_glossary(name: str, fixture: dict, args) -> List[StageResult]:
+    from modules.dataplex_client import DataplexGlossaryClient
+
+    dataplex = FakeGlossaryServiceClient(faults=_faults(args, "dataplex"), seed=args.seed)
+    client = DataplexGlossaryClient("bench-project", "us", client=dataplex)
+    glossary = fixture["glossary"]
+    results = []
+
+    def publish():
+        client.create_or_update_glossary("bench-glossary", "Benchmark glossary")
+        return client.publish_glossary(glossary, "bench-glossary")
+
+    result, report = run_stage(name, "publish", publish, [dataplex], not args.no_memory, args.verbose)
+    result.detail = result.detail or (report.summary() if report else "")
+    results.append(result)
+
+    # Second run with 10% of the definitions changed: only the diff should be sent
+    changed = json.loads(json.dumps(glossary))
+    terms = [term for category in changed["glossary"]["categories"] for term in category["terms"]]
+    for term in terms[::10]:
+        term["definition"] += " (revised)"
+    result, report = run_stage(name, "reconcile", lambda: client.reconcile_glossary(changed, "bench-glossary"),
+                               [dataplex], not args.no_memory, args.verbose)
+    result.detail = result.detail or (report.summary() if report else "")
+    results.append(result)
+    return results
+
+
+def print_results(results: List[StageResult]):
+    header = f"{'scenario':<12} {'stage':<10} {'seconds':>9} {'rpcs':>7} {'errors':>7} {'peak MB':>9}  detail"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        peak = f"{r.peak_memory_mb:.1f}" if r.peak_memory_mb is not None else "-"
+        detail = r.detail if r.ok else f"FAILED {r.detail}"
+        print(f"{r.scenario:<12} {r.stage:<10} {r.seconds:>9.2f} {sum(r.rpcs.values()):>7} {r.errors:>7} {peak:>9}  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the DQ and glossary pipelines.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--fixture", help="Replay a recorded fixture instead of a synthetic one")
+    parser.add_argument("--save-fixture", help="Write the synthetic fixture of the (single) scenario to this path")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean seconds per RPC on every fake service")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, help="Transient error rate on every service (default: per-service rates)")
+    parser.add_argument("--quota-rate", type=float, default=0.0, help="Quota (429) error rate on every service")
+    parser.add_argument("--seconds-per-1k-tokens", type=float, default=0.0, help="Simulated model generation time")
+    parser.add_argument("--rate-limit", action="store_true", help="Apply the client-side rate limits and circuit breakers (RATE_LIMITS)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows the run down)")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline output")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    from config.settings import get_config
+
+    # Benchmarks measure the uncached path; the rule index would skip the model calls
+    settings = get_config()
+    settings.CACHE_ENABLED = False
+    settings.RULE_INDEX_ENABLED = False
+    # The fakes have no quota: only throttle when the limiter itself is being measured
+    settings.RATE_LIMIT_ENABLED = args.rate_limit
+
+    results: List[StageResult] = []
+    for name in args.scenario or list(SCENARIOS):
+        fixture = load_fixture(args.fixture) if args.fixture else synthetic_fixture(seed=args.seed, **SCENARIOS[name])
+        if args.save_fixture:
+            save_fixture(fixture, args.save_fixture)
+        bench = bench_glossary if name.startswith("terms-") else bench_quality_rules
+        rate_limit.reset_guards()
+        results.extend(bench(name, fixture, args))
+        if args.rate_limit and rate_limit.summary():
+            print(rate_limit.summary())
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+        print(f"Results written to {args.output}")
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
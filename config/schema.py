@@ -0,0 +1,152 @@
+import os
+import threading
+from dataclasses import dataclass
+from config.secrets import SecretResolver, build_backend
+
+# The defaults below read the environment when this module is imported: import it through
+# config.settings.get_config(), which loads config/.env first.
+
+
+@dataclass
+class Config:
+    """
+    Centralized configuration class for the **Business Glossary Agent**.
+    It loads environment variables and sets defaults.
+    """
+    # --- GCP Config ---
+    PROJECT_ID: str = os.getenv("PROJECT_ID")
+    LOCATION: str = os.getenv("LOCATION")
+    GCS_BUCKET: str = os.getenv("GCS_BUCKET")
+    # Dataplex specific for Glossary
+    GLOSSARY_ID: str = os.getenv("GLOSSARY_ID", "my-business-glossary")
+    GLOSSARY_LOCATION: str = os.getenv("GLOSSARY_LOCATION", os.getenv("LOCATION"))
+    
+    DATASET_ID: str = os.getenv("DATASET_ID") # Optional, if needed for context
+    TABLE_ID: str = os.getenv("TABLE_ID") # Optional, if needed for context
+    
+    # --- BigQuery Metadata Harvesting ---
+    BQ_MAX_WORKERS: int = int(os.getenv("BQ_MAX_WORKERS", "8"))
+    BQ_MAX_RETRIES: int = int(os.getenv("BQ_MAX_RETRIES", "5"))
+    BQ_BULK_METADATA: bool = os.getenv("BQ_BULK_METADATA", "true").lower() == "true"
+
+    # --- Local Cache (unchanged tables skip harvesting and generation) ---
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "output/cache")
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+
+    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
+    # Sharded generation: one prompt per token-budgeted group of tables, sent in parallel
+    GENERATION_SHARDING: bool = os.getenv("GENERATION_SHARDING", "false").lower() == "true"
+    SHARD_TOKEN_BUDGET: int = int(os.getenv("SHARD_TOKEN_BUDGET", "4000"))
+    # Prompt context: "compact" (tabular, deduplicated, within a token budget) or "text"
+    CONTEXT_FORMAT: str = os.getenv("CONTEXT_FORMAT", "compact")
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "30000"))  # Single-prompt mode; shards use SHARD_TOKEN_BUDGET
+    CONTEXT_MAX_DESCRIPTION_CHARS: int = int(os.getenv("CONTEXT_MAX_DESCRIPTION_CHARS", "120"))
+    GEMINI_MAX_WORKERS: int = int(os.getenv("GEMINI_MAX_WORKERS", "4"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "5"))
+    # Generation mode: "online" (generate_content calls) or "batch" (one batch prediction job)
+    GENERATION_MODE: str = os.getenv("GENERATION_MODE", "online")
+    BATCH_EXECUTOR: str = os.getenv("BATCH_EXECUTOR", "vertex")  # "vertex" or "local"
+    BATCH_WORK_DIR: str = os.getenv("BATCH_WORK_DIR", "output/batch")
+    BATCH_GCS_PREFIX: str = os.getenv("BATCH_GCS_PREFIX", "batch/dq")
+    BATCH_POLL_SECONDS: int = int(os.getenv("BATCH_POLL_SECONDS", "30"))
+    # Pipeline mode: "sequential" (harvest everything, then generate) or "streaming" (stages overlap per table)
+    PIPELINE_MODE: str = os.getenv("PIPELINE_MODE", "sequential")
+    PIPELINE_HARVEST_CHUNK: int = int(os.getenv("PIPELINE_HARVEST_CHUNK", "50"))  # Tables per harvest query
+    PIPELINE_HARVEST_WORKERS: int = int(os.getenv("PIPELINE_HARVEST_WORKERS", "2"))
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))  # Items waiting per stage (backpressure)
+    # Fan-out runner (runner.py): datasets in flight and per-API concurrency budgets
+    FANOUT_MAX_TARGETS: int = int(os.getenv("FANOUT_MAX_TARGETS", "8"))
+    FANOUT_BQ_CONCURRENCY: int = int(os.getenv("FANOUT_BQ_CONCURRENCY", "4"))
+    FANOUT_GITHUB_CONCURRENCY: int = int(os.getenv("FANOUT_GITHUB_CONCURRENCY", "1"))
+    # Data profiling: one sampled aggregate query per table, its summary goes into the prompt
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+    PROFILE_MAX_BYTES_BILLED: int = int(os.getenv("PROFILE_MAX_BYTES_BILLED", str(1024 ** 3)))  # Per table
+    PROFILE_TOP_K: int = int(os.getenv("PROFILE_TOP_K", "5"))
+    PROFILE_MAX_WORKERS: int = int(os.getenv("PROFILE_MAX_WORKERS", "4"))
+    # Rule reuse: columns matching approved rules (local proposals + base branch) skip the model
+    RULE_INDEX_ENABLED: bool = os.getenv("RULE_INDEX_ENABLED", "true").lower() == "true"
+    RULE_INDEX_SOURCES: str = os.getenv("RULE_INDEX_SOURCES", "local,github")
+    RULE_INDEX_LOCAL_GLOB: str = os.getenv("RULE_INDEX_LOCAL_GLOB", "output/dq_rules_proposal_*.json")
+    RULE_INDEX_MIN_SIMILARITY: float = float(os.getenv("RULE_INDEX_MIN_SIMILARITY", "0.8"))
+    RULE_INDEX_MIN_SUPPORT: int = int(os.getenv("RULE_INDEX_MIN_SUPPORT", "1"))
+    # Gemini response cache (memory LRU + disk), keyed by model, prompt and generation config
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_DIR: str = os.getenv("RESPONSE_CACHE_DIR", "output/cache/gemini")
+    RESPONSE_CACHE_MEMORY_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "256"))
+    RESPONSE_CACHE_MAX_MB: int = int(os.getenv("RESPONSE_CACHE_MAX_MB", "200"))
+    # Run ledger: per-item progress (harvested/generated/validated/published) so an interrupted run resumes
+    RUN_LEDGER_ENABLED: bool = os.getenv("RUN_LEDGER_ENABLED", "true").lower() == "true"
+    RUN_LEDGER_PATH: str = os.getenv("RUN_LEDGER_PATH", "output/ledger/run_ledger.sqlite3")
+    RUN_LEDGER_RESUME: bool = os.getenv("RUN_LEDGER_RESUME", "true").lower() == "true"  # false = always start over
+    RUN_LEDGER_MAX_AGE_HOURS: int = int(os.getenv("RUN_LEDGER_MAX_AGE_HOURS", "24"))  # Older unfinished runs start over
+    # Proposal history: Parquet per proposal (by dataset/date) + SQLite index of the latest per dataset (needs pyarrow)
+    PROPOSAL_STORE_ENABLED: bool = os.getenv("PROPOSAL_STORE_ENABLED", "true").lower() == "true"
+    PROPOSAL_STORE_DIR: str = os.getenv("PROPOSAL_STORE_DIR", "output/proposals")
+    # Client-side rate limiting per API (core/rate_limit.py): AIMD token bucket + circuit breaker
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMITS: str = os.getenv("RATE_LIMITS", "")  # Requests/second ceilings, e.g. "vertex=2,dataplex=5" (defaults in core/rate_limit.py)
+    RATE_LIMIT_MIN_RATE: float = float(os.getenv("RATE_LIMIT_MIN_RATE", "0.1"))
+    CIRCUIT_BREAKER_THRESHOLD: int = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))  # Consecutive transient failures
+    CIRCUIT_BREAKER_RESET_SECONDS: float = float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+    # Run telemetry: spans with wall time, RPCs, retries, tokens and bytes (summary printed at the end)
+    TELEMETRY_ENABLED: bool = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+    TELEMETRY_JSONL_PATH: str = os.getenv("TELEMETRY_JSONL_PATH", "output/telemetry/spans.jsonl")  # "" = not written
+    TELEMETRY_OTEL_ENABLED: bool = os.getenv("TELEMETRY_OTEL_ENABLED", "false").lower() == "true"
+    # TODO revisar modelo más adecuado
+    MODEL_NAME: str = "gemini-2.5-flash-lite"
+
+    # --- GitHub Config ---
+    GITHUB_REPO: str = os.getenv("GITHUB_REPO", "")  # Ej: "usuario/repo"
+    GITHUB_BASE_BRANCH: str = os.getenv("GITHUB_BASE_BRANCH", "main")
+    GITHUB_SECRET_NAME: str = os.getenv("GITHUB_SECRET_NAME", "github-token-agent")
+    # --- Secrets (resolved lazily, cached in process) ---
+    # Comma-separated backends tried in order: env (SECRET_<ID>), file (SECRETS_DIR/<id>), secretmanager
+    SECRETS_BACKEND: str = os.getenv("SECRETS_BACKEND", "secretmanager")
+    SECRETS_DIR: str = os.getenv("SECRETS_DIR", "config/secrets")
+    SECRET_CACHE_TTL_SECONDS: int = int(os.getenv("SECRET_CACHE_TTL_SECONDS", "3600"))
+    SECRET_REFRESH_AHEAD_SECONDS: int = int(os.getenv("SECRET_REFRESH_AHEAD_SECONDS", "300"))
+    SECRET_BACKGROUND_REFRESH: bool = os.getenv("SECRET_BACKGROUND_REFRESH", "false").lower() == "true"
+    # Batched PRs (Git Data API): one tree/commit/PR for many proposals; 0 = a single PR
+    GITHUB_BATCH_PRS: bool = os.getenv("GITHUB_BATCH_PRS", "true").lower() == "true"
+    GITHUB_PR_GROUP_SIZE: int = int(os.getenv("GITHUB_PR_GROUP_SIZE", "0"))
+    # --- Flask Config ---
+    PORT: int = os.environ.get("PORT", 8080)
+
+    def __post_init__(self):
+        # Validation of global variables
+        missing_fields = [
+            field_name for field_name, value in vars(self).items()
+            if value is None
+        ]
+
+        if missing_fields:
+            raise ValueError(
+                "Initialization Error: The following fields cannot be None: "
+                f"{', '.join(missing_fields)}"
+            )
+
+
+    @property
+    def GITHUB_TOKEN(self) -> str:
+        return self._fetch_secret(self.GITHUB_SECRET_NAME)
+
+    _secrets_lock = threading.Lock()
+
+    @property
+    def secrets(self) -> SecretResolver:
+        # Created on first access; not a dataclass field
+        with self._secrets_lock:
+            if "_secrets" not in self.__dict__:
+                self.__dict__["_secrets"] = SecretResolver(
+                    build_backend(self.SECRETS_BACKEND, self.PROJECT_ID, self.SECRETS_DIR),
+                    ttl_seconds=self.SECRET_CACHE_TTL_SECONDS,
+                    refresh_ahead_seconds=self.SECRET_REFRESH_AHEAD_SECONDS,
+                    background_refresh=self.SECRET_BACKGROUND_REFRESH,
+                )
+            return self.__dict__["_secrets"]
+
+    def _fetch_secret(self, secret_id: str, version_id: str = "latest") -> str:
+        # Cached per process: one Secret Manager client and one fetch per TTL
+        return self.secrets.get(secret_id, version_id)
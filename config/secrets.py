@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class SecretBackend:
+    """
+    Source of secret values. `fetch` returns None when the backend does not hold the secret.
+    """
+
+    def fetch(self, secret_id: str, version_id: str = "latest") -> Optional[str]:
+        raise NotImplementedError
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_secret_manager_client():
+    """
+    Process-wide Secret Manager client, so every secret access reuses one gRPC channel.
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            from google.cloud import secretmanager
+
+            _shared_client = secretmanager.SecretManagerServiceClient()
+        return _shared_client
+
+
+class SecretManagerBackend(SecretBackend):
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+
+    def fetch(self, secret_id: str, version_id: str = "latest") -> Optional[str]:
+        from core.retry import retry_call
+
+        name = f"projects/{self.project_id}/secrets/{secret_id}/versions/{version_id}"
+        response = retry_call(
+            lambda: get_secret_manager_client().access_secret_version(request={"name": name}),
+            max_attempts=3,
+            description=f"access_secret_version({secret_id})",
+            api="secretmanager",
+        )
+        return response.payload.data.decode("UTF-8")
+
+
+def secret_env_var(secret_id: str) -> str:
+    """
+    Environment variable holding a secret offline, e.g. `github-token-agent` -> `SECRET_GITHUB_TOKEN_AGENT`.
+    """
+    return "SECRET_" + re.sub(r"[^A-Za-z0-9]+", "_", secret_id).upper()
+
+
+class EnvBackend(SecretBackend):
+    def fetch(self, secret_id: str, version_id: str = "latest") -> Optional[str]:
+        return os.getenv(secret_env_var(secret_id)) or None
+
+
+class FileBackend(SecretBackend):
+    """
+    One file per secret under `directory` (e.g. mounted Kubernetes/Cloud Run secrets).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, secret_id: str, version_id: str = "latest") -> Optional[str]:
+        path = os.path.join(self.directory, secret_id)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+
+
+class ChainBackend(SecretBackend):
+    """
+    Tries each backend in order; the first one holding the secret wins.
+    """
+
+    def __init__(self, backends: List[SecretBackend]):
+        self.backends = backends
+
+    def fetch(self, secret_id: str, version_id: str = "latest") -> Optional[str]:
+        for backend in self.backends:
+            value = backend.fetch(secret_id, version_id)
+            if value:
+                return value
+        return None
+
+
+def build_backend(spec: str, project_id: str, secrets_dir: str) -> SecretBackend:
+    """
+    Builds a backend from a comma-separated spec such as `env,file,secretmanager`.
+    """
+    factories = {
+        "env": EnvBackend,
+        "file": lambda: FileBackend(secrets_dir),
+        "secretmanager": lambda: SecretManagerBackend(project_id),
+    }
+    names = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if name not in factories]
+    if unknown or not names:
+        raise ValueError(f"Unknown secret backend(s): {', '.join(unknown) or spec!r}")
+    backends = [factories[name]() for name in names]
+    return backends[0] if len(backends) == 1 else ChainBackend(backends)
+
+
+class SecretResolver:
+    """
+    Resolves secrets through a backend with an in-process TTL cache.
+
+    Concurrent misses for the same secret trigger a single fetch. With
+    `background_refresh`, a value inside its last `refresh_ahead_seconds` is served
+    from the cache while a daemon thread fetches the new one, so callers never wait
+    on the network after the first access. If a refresh fails the stale value keeps
+    being served and the fetch is retried on the next access.
+    """
+
+    def __init__(self, backend: SecretBackend, ttl_seconds: int = 3600, refresh_ahead_seconds: int = 300, background_refresh: bool = False):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.background_refresh = background_refresh
+        self._values: Dict[Tuple[str, str], Tuple[str, float]] = {}  # key -> (value, expires_at)
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, key: Tuple[str, str]) -> Optional[str]:
+        secret_id, version_id = key
+        try:
+            value = self.backend.fetch(secret_id, version_id)
+        except Exception as e:
+            print(f"Error recuperando secreto {secret_id}: {e}")
+            return None
+        if value:
+            with self._lock:
+                self._values[key] = (value, time.monotonic() + self.ttl_seconds)
+        return value
+
+    def _refresh_in_background(self, key: Tuple[str, str]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run():
+            try:
+                with self._key_lock(key):
+                    self._fetch(key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name=f"secret-refresh-{key[0]}", daemon=True).start()
+
+    def get(self, secret_id: str, version_id: str = "latest") -> str:
+        """
+        Returns the secret value, or "" if it cannot be resolved.
+        """
+        key = (secret_id, version_id)
+        with self._lock:
+            cached = self._values.get(key)
+        now = time.monotonic()
+        if cached and now < cached[1]:
+            if self.background_refresh and cached[1] - now <= self.refresh_ahead_seconds:
+                self._refresh_in_background(key)
+            return cached[0]
+
+        with self._key_lock(key):
+            # Another thread may have fetched it while we waited
+            with self._lock:
+                cached = self._values.get(key)
+            if cached and time.monotonic() < cached[1]:
+                return cached[0]
+            value = self._fetch(key)
+        if value:
+            return value
+        if cached:
+            print(f"⚠️ Usando el valor anterior (caducado) del secreto {secret_id}.")
+            return cached[0]
+        return ""
+
+    def invalidate(self, secret_id: Optional[str] = None):
+        """
+        Drops cached values (all of them, or every version of `secret_id`), e.g. after a 401.
+        """
+        with self._lock:
+            for key in list(self._values):
+                if secret_id is None or key[0] == secret_id:
+                    del self._values[key]
@@ -1,75 +1,65 @@
 import os
-from dataclasses import dataclass
-from dotenv import load_dotenv
-from google.cloud import secretmanager
-import google.auth
+import threading
+from typing import TYPE_CHECKING, Optional
 
+if TYPE_CHECKING:
+    from config.schema import Config
 
-@dataclass
-class Config:
+_config: Optional["Config"] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> "Config":
+    """
+    Shared `Config`, created and validated on first use rather than at import time.
+    `config/.env` is loaded at that point too, before the Config fields read the environment.
+    """
+    global _config
+    with _config_lock:
+        if _config is None:
+            try:
+                from dotenv import load_dotenv
+
+                load_dotenv(f"{os.getcwd()}/config/.env")
+            except ImportError:
+                # Without python-dotenv only the process environment is used
+                pass
+            from config.schema import Config
+
+            _config = Config()
+        return _config
+
+
+def loaded_config() -> Optional["Config"]:
+    """
+    The shared `Config` if it was already created, without creating (and validating) it.
+    """
+    return _config
+
+
+class _LazyConfig:
     """
-    Centralized configuration class for the **Business Glossary Agent**.
-    It loads environment variables and sets defaults.
+    `config`: forwards attribute access to the shared Config, so `from config.settings
+    import config` at module level does not build (and validate) it.
     """
-    # Load Global Vars
-    load_dotenv(f"{os.getcwd()}/config/.env")
-
-    # --- GCP Config ---
-    PROJECT_ID: str = os.getenv("PROJECT_ID")
-    LOCATION: str = os.getenv("LOCATION")
-    GCS_BUCKET: str = os.getenv("GCS_BUCKET")
-    # Dataplex specific for Glossary
-    GLOSSARY_ID: str = os.getenv("GLOSSARY_ID", "my-business-glossary")
-    GLOSSARY_LOCATION: str = os.getenv("GLOSSARY_LOCATION", os.getenv("LOCATION"))
-    
-    DATASET_ID: str = os.getenv("DATASET_ID") # Optional, if needed for context
-    TABLE_ID: str = os.getenv("TABLE_ID") # Optional, if needed for context
-    
-    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
-    # TODO revisar modelo más adecuado
-    MODEL_NAME: str = "gemini-2.5-flash-lite"
-
-    # --- GitHub Config ---
-    GITHUB_REPO: str = os.getenv("GITHUB_REPO", "")  # Ej: "usuario/repo"
-    GITHUB_BASE_BRANCH: str = os.getenv("GITHUB_BASE_BRANCH", "main")
-    GITHUB_SECRET_NAME: str = os.getenv("GITHUB_SECRET_NAME", "github-token-agent")
-    # --- Flask Config ---
-    PORT: int = os.environ.get("PORT", 8080)
-
-    def __post_init__(self):
-        # Validation of global variables
-        missing_fields = [
-            field_name for field_name, value in vars(self).items()
-            if value is None
-        ]
-
-        if missing_fields:
-            raise ValueError(
-                "Initialization Error: The following fields cannot be None: "
-                f"{', '.join(missing_fields)}"
-            )
-
-
-    @property
-    def GITHUB_TOKEN(self) -> str:
-        return self._fetch_secret(self.GITHUB_SECRET_NAME)
-
-
-    def _fetch_secret(self, secret_id: str, version_id: str = "latest") -> str:
-        try:
-            # Crea el cliente de Secret Manager
-            client = secretmanager.SecretManagerServiceClient()
-
-            # Construye el nombre del recurso
-            name = f"projects/{self.PROJECT_ID}/secrets/{secret_id}/versions/{version_id}"
-
-            # Accede al secreto
-            response = client.access_secret_version(request={"name": name})
-
-            # Decodifica el payload (bytes -> string)
-            return response.payload.data.decode("UTF-8")
-        except Exception as e:
-            print(f"Error recuperando secreto {secret_id}: {e}")
-            return ""
-
-config = Config()
\ No newline at end of file
+
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(get_config(), name, value)
+
+    def __repr__(self) -> str:
+        return repr(_config) if _config is not None else "<config: not loaded yet>"
+
+
+config = _LazyConfig()
+
+
+def __getattr__(name: str):
+    # PEP 562: `from config.settings import Config` keeps working, lazily
+    if name == "Config":
+        from config.schema import Config
+
+        return Config
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,30 @@
-from github import Github
 from config.settings import config
+from core import telemetry
+from core.retry import RetryingProxy, retry_call
+from typing import Dict, List, Optional
+import hashlib
 import time
 
+def git_blob_sha(content: str) -> str:
+    """
+    SHA that Git assigns to a blob with this content, used to detect proposals
+    already present in the base branch without downloading them.
+    """
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def _already_exists(error: BaseException) -> bool:
+    # 422 Unprocessable Entity: "Reference already exists", "A pull request already exists"...
+    return getattr(error, "status", None) == 422
+
 class GitHubClient:
-    def __init__(self):
+    def __init__(self, repo=None):
+        # An already built repository object (e.g. a benchmark stand-in) skips authentication
+        if repo is not None:
+            self.github = None
+            self.repo = RetryingProxy(repo, "github")
+            return
+
         # Retrieve the actual token using the property that calls Secret Manager
         token = config.GITHUB_TOKEN
 
@@ -12,18 +33,23 @@ class GitHubClient:
             self.repo = None
             return
 
-        # Initialize with the retrieved token
+        # Initialize with the retrieved token (PyGithub is only imported when a client is built)
+        from github import Github
+
         self.github = Github(token)
         
         try:
-            self.repo = self.github.get_repo(config.GITHUB_REPO)
+            # Each Repository method is one REST call: rate limited, retried and counted as an RPC
+            self.repo = RetryingProxy(retry_call(lambda: self.github.get_repo(config.GITHUB_REPO), api="github", description="get_repo"), "github")
         except Exception as e:
             print(f"Error accessing repo: {e}")
             self.repo = None
 
+    @telemetry.timed("github.create_proposal_pr")
     def create_proposal_pr(self, file_content: str, entity_name: str) -> str:
         if not self.repo:
             raise ValueError("GitHub Repo not initialized (Check Secret/Token).")
+        telemetry.count(telemetry.BYTES_SENT, len(file_content.encode("utf-8")))
 
         timestamp = int(time.time())
         branch_name = f"governance/suggestion-{entity_name}-{timestamp}"
@@ -33,10 +59,10 @@ class GitHubClient:
         base_ref = self.repo.get_git_ref(f"heads/{config.GITHUB_BASE_BRANCH}")
 
         # 2. Crear rama
-        self.repo.create_git_ref(ref=f"refs/heads/{branch_name}", sha=base_ref.object.sha)
+        self._create_branch(branch_name, base_ref.object.sha)
 
         # 3. Subir fichero JSON
-        self.repo.create_file(
+        self._create_file(
             path=file_path,
             message=f"chore: Update metadata for {entity_name}",
             content=file_content,
@@ -44,11 +70,153 @@ class GitHubClient:
         )
 
         # 4. Crear Pull Request
-        pr = self.repo.create_pull(
+        pr = self._create_pull(
             title=f"[Agent] Metadata Proposal: {entity_name}",
             body=f"Sugerencia automática de gobierno para `{entity_name}` basada en documentación.",
             head=branch_name,
-            base=config.GITHUB_BASE_BRANCH
         )
 
-        return pr.html_url
\ No newline at end of file
+        return pr.html_url
+
+    # Writes are retried by RetryingProxy on 5xx. When the failed attempt did reach GitHub,
+    # the retry gets 422 (already exists): the object is looked up and checked instead.
+
+    def _create_branch(self, branch_name: str, sha: str):
+        try:
+            self.repo.create_git_ref(ref=f"refs/heads/{branch_name}", sha=sha)
+        except Exception as e:
+            if not _already_exists(e) or self.repo.get_git_ref(f"heads/{branch_name}").object.sha != sha:
+                raise
+
+    def _create_file(self, path: str, message: str, content: str, branch: str):
+        try:
+            self.repo.create_file(path=path, message=message, content=content, branch=branch)
+        except Exception as e:
+            if not _already_exists(e) or self.repo.get_contents(path, ref=branch).sha != git_blob_sha(content):
+                raise
+
+    def _create_pull(self, title: str, body: str, head: str):
+        try:
+            return self.repo.create_pull(title=title, body=body, head=head, base=config.GITHUB_BASE_BRANCH)
+        except Exception as e:
+            if not _already_exists(e):
+                raise
+            pulls = list(self.repo.get_pulls(state="open", head=f"{self.repo.owner.login}:{head}", base=config.GITHUB_BASE_BRANCH))
+            if not pulls:
+                raise
+            return pulls[0]
+
+    def _existing_proposal_shas(self, base_tree_sha: str, directory: str = "output") -> Dict[str, set]:
+        """
+        Blob SHAs of the proposals already in the base branch, grouped by entity name.
+        Only the `output/` subtree is listed (two API calls regardless of repo size).
+        """
+        root = self.repo.get_git_tree(base_tree_sha)
+        subtree = next((e for e in root.tree if e.path == directory and e.type == "tree"), None)
+        existing: Dict[str, set] = {}
+        if subtree is None:
+            return existing
+        for element in self.repo.get_git_tree(subtree.sha).tree:
+            entity, sep, _ = element.path.rpartition("_metadata_v")
+            if sep and element.type == "blob":
+                existing.setdefault(entity, set()).add(element.sha)
+        return existing
+
+    @telemetry.timed("github.get_approved_proposals")
+    def get_approved_proposals(self, prefix: str = "data_quality_rules", directory: str = "output") -> Dict[str, str]:
+        """
+        Latest proposal of each entity merged into the base branch (i.e. approved through
+        its PR), as `{path: content}`. Lists the `output/` subtree and downloads one blob per entity.
+        """
+        if not self.repo:
+            raise ValueError("GitHub Repo not initialized (Check Secret/Token).")
+        import base64
+
+        base_ref = self.repo.get_git_ref(f"heads/{config.GITHUB_BASE_BRANCH}")
+        root = self.repo.get_git_tree(self.repo.get_git_commit(base_ref.object.sha).tree.sha)
+        subtree = next((e for e in root.tree if e.path == directory and e.type == "tree"), None)
+        if subtree is None:
+            return {}
+
+        latest: Dict[str, tuple] = {}
+        for element in self.repo.get_git_tree(subtree.sha).tree:
+            entity, sep, version = element.path.rpartition("_metadata_v")
+            if not sep or element.type != "blob" or not entity.startswith(prefix):
+                continue
+            timestamp = int(version.split(".", 1)[0]) if version.split(".", 1)[0].isdigit() else 0
+            if entity not in latest or timestamp > latest[entity][0]:
+                latest[entity] = (timestamp, element)
+
+        proposals = {}
+        for _, element in latest.values():
+            blob = self.repo.get_git_blob(element.sha)
+            proposals[f"{directory}/{element.path}"] = base64.b64decode(blob.content).decode("utf-8")
+            telemetry.count(telemetry.BYTES_RECEIVED, len(blob.content))
+        return proposals
+
+    @telemetry.timed("github.create_proposals_pr")
+    def create_proposals_pr(self, proposals: Dict[str, str], group_size: int = 0, title: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        Publishes many proposals with the Git Data API: one tree holding every file, one
+        commit, one branch and one PR per group (instead of four calls per proposal).
+        Proposals identical to one already in the base branch are skipped.
+
+        Args:
+            proposals (Dict[str, str]): File content by entity name.
+            group_size (int): Maximum proposals per PR; 0 puts them all in a single PR.
+            title (Optional[str]): PR title; defaults to a summary of the entities.
+
+        Returns:
+            Dict[str, Optional[str]]: PR URL by entity name (None when unchanged).
+        """
+        if not self.repo:
+            raise ValueError("GitHub Repo not initialized (Check Secret/Token).")
+        from github import InputGitTreeElement
+
+        timestamp = int(time.time())
+        base_ref = self.repo.get_git_ref(f"heads/{config.GITHUB_BASE_BRANCH}")
+        base_commit = self.repo.get_git_commit(base_ref.object.sha)
+        existing = self._existing_proposal_shas(base_commit.tree.sha)
+
+        results: Dict[str, Optional[str]] = {}
+        pending: List[str] = []
+        for entity_name, content in proposals.items():
+            if git_blob_sha(content) in existing.get(entity_name, set()):
+                print(f"♻️ Propuesta sin cambios para {entity_name}, no se vuelve a subir.")
+                results[entity_name] = None
+            else:
+                pending.append(entity_name)
+
+        size = group_size or len(pending) or 1
+        groups = [pending[i:i + size] for i in range(0, len(pending), size)]
+        for index, group in enumerate(groups, start=1):
+            suffix = f"-{index}" if len(groups) > 1 else ""
+            branch_name = f"governance/suggestion-batch-{timestamp}{suffix}"
+            elements = [
+                InputGitTreeElement(
+                    path=f"output/{entity_name}_metadata_v{timestamp}.json",
+                    mode="100644",
+                    type="blob",
+                    content=proposals[entity_name],
+                )
+                for entity_name in group
+            ]
+            telemetry.count(telemetry.BYTES_SENT, sum(len(proposals[e].encode("utf-8")) for e in group))
+            tree = self.repo.create_git_tree(elements, base_commit.tree)
+            commit = self.repo.create_git_commit(
+                message=f"chore: Update metadata for {len(group)} entities\n\n" + "\n".join(f"- {e}" for e in group),
+                tree=tree,
+                parents=[base_commit],
+            )
+            self._create_branch(branch_name, commit.sha)
+
+            pr_title = title or f"[Agent] Metadata Proposals: {len(group)} entities"
+            pr = self._create_pull(
+                title=f"{pr_title} ({index}/{len(groups)})" if len(groups) > 1 else pr_title,
+                body="Sugerencias automáticas de gobierno para:\n" + "\n".join(f"- `{e}`" for e in group),
+                head=branch_name,
+            )
+            for entity_name in group:
+                results[entity_name] = pr.html_url
+
+        return results
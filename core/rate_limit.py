@@ -0,0 +1,300 @@
+"""
+Client-side rate limiting per API, shared by every client in the process.
+
+Each API (vertex, bigquery, dataplex, secretmanager, github, storage) gets one
+`ApiGuard` made of:
+
+- an `AdaptiveRateLimiter`: a token bucket whose rate adapts to the quota actually
+  available (AIMD). Successes raise the rate additively up to the configured ceiling;
+  a 429 / RESOURCE_EXHAUSTED cuts it multiplicatively and pauses every caller.
+- a `CircuitBreaker`: after repeated transient failures (5xx, timeouts) calls fail
+  fast for a while instead of piling more load on a failing backend.
+
+`core.retry.retry_call(..., api="dataplex")` runs every attempt through the guard.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Ceiling in requests/second per API (RATE_LIMITS overrides them, e.g. "vertex=2,github=5")
+DEFAULT_RATES = {
+    "vertex": 5.0,
+    "bigquery": 20.0,
+    "dataplex": 10.0,
+    "secretmanager": 5.0,
+    "github": 10.0,
+    "storage": 20.0,
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an API whose circuit breaker is open.
+    """
+
+    def __init__(self, api: str, retry_in: float):
+        super().__init__(f"Circuit open for {api}: retry in {retry_in:.0f}s")
+        self.api = api
+        self.retry_in = retry_in
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with additive-increase / multiplicative-decrease of its rate.
+
+    Args:
+        rate (float): Ceiling (and starting rate) in requests per second.
+        min_rate (float): Floor the rate never drops below.
+        increase (float): Requests/second regained per second of successful traffic.
+        decrease (float): Factor applied to the rate on a quota error.
+        burst (Optional[float]): Bucket capacity; defaults to one second of traffic.
+    """
+
+    def __init__(self, rate: float, min_rate: float = 0.1, increase: float = 1.0, decrease: float = 0.5,
+                 burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst or max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._resume_at = 0.0
+        self._last_cut = float("-inf")
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._resume_at and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = max(self._resume_at - now, (1 - self._tokens) / self.rate)
+                self.waited_seconds += delay
+            self._sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            # +increase req/s for every second of traffic at the current rate
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self, pause: float = 0.0):
+        """
+        Cuts the rate after a quota error and pauses every caller for `pause` seconds.
+        Concurrent errors from the same burst only cut the rate once.
+        """
+        with self._lock:
+            now = self._clock()
+            self.throttled += 1
+            if now - self._last_cut >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_cut = now
+                self._tokens = min(self._tokens, 0.0)
+            self._resume_at = max(self._resume_at, now + pause)
+
+
+class CircuitBreaker:
+    """
+    Closed → open after `failure_threshold` consecutive failures; open → half-open after
+    `reset_seconds`, when a single probe call decides whether it closes or opens again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self, api: str = "api"):
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset_seconds - self._clock()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(api, max(remaining, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """
+        Returns True when this failure opened the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = self._clock()
+                self.opened += 1
+                return True
+            return False
+
+
+class ApiGuard:
+    """
+    Rate limiter and circuit breaker of one API.
+    """
+
+    def __init__(self, api: str, limiter: AdaptiveRateLimiter, breaker: CircuitBreaker):
+        self.api = api
+        self.limiter = limiter
+        self.breaker = breaker
+
+    def before_call(self):
+        self.breaker.before_call(self.api)
+        self.limiter.acquire()
+
+    def on_success(self):
+        self.limiter.on_success()
+        self.breaker.record_success()
+
+    def on_error(self, error: BaseException, pause: float = 0.0):
+        from core.retry import is_quota_error, is_transient_error
+
+        if is_quota_error(error):
+            # Quota is the limiter's job: the backend is healthy, only busy
+            self.limiter.on_throttle(pause)
+            self.breaker.record_success()
+        elif is_transient_error(error):
+            if self.breaker.record_failure():
+                print(f"🚧 Circuito abierto para {self.api}: pausa de {self.breaker.reset_seconds:.0f}s tras {self.breaker.failures} fallos")
+        else:
+            # The call reached the backend and got an answer (e.g. 404): not a health signal
+            self.breaker.record_success()
+
+    def summary(self) -> str:
+        return (f"{self.api}: {self.limiter.rate:.1f}/{self.limiter.max_rate:.1f} req/s, "
+                f"{self.limiter.throttled} cuotas agotadas, {self.limiter.waited_seconds:.1f}s de espera acumulada, "
+                f"circuito {self.breaker.state}")
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """
+    Parses `"vertex=2,github=5"` into `{"vertex": 2.0, "github": 5.0}`.
+    """
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        api, sep, value = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid rate limit '{part}', expected api=requests_per_second")
+        rates[api.strip().lower()] = float(value)
+    return rates
+
+
+_guards: Dict[str, ApiGuard] = {}
+_guards_lock = threading.Lock()
+_settings_warned = False
+
+
+def _settings() -> dict:
+    """
+    Rate limit settings without building the validated `Config`: scripts such as
+    publish_glossary.py run with only a couple of variables set. The shared Config is
+    used when it already exists (so programmatic overrides apply), else the environment.
+    """
+    try:
+        from config.settings import loaded_config
+
+        built = loaded_config()
+    except ImportError:
+        # e.g. python-dotenv not installed where only the publish scripts run
+        built = None
+    if built is not None:
+        return {
+            "enabled": built.RATE_LIMIT_ENABLED,
+            "rates": built.RATE_LIMITS,
+            "min_rate": built.RATE_LIMIT_MIN_RATE,
+            "threshold": built.CIRCUIT_BREAKER_THRESHOLD,
+            "reset_seconds": built.CIRCUIT_BREAKER_RESET_SECONDS,
+        }
+    return {
+        "enabled": os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+        "rates": os.getenv("RATE_LIMITS", ""),
+        "min_rate": float(os.getenv("RATE_LIMIT_MIN_RATE", "0.1")),
+        "threshold": int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5")),
+        "reset_seconds": float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30")),
+    }
+
+
+def get_guard(api: str) -> Optional[ApiGuard]:
+    """
+    Process-wide guard of an API, built on first use. Returns None when rate limiting is
+    disabled (`RATE_LIMIT_ENABLED=false`) or its settings cannot be read: the call then
+    goes out unguarded rather than failing.
+    """
+    global _settings_warned
+
+    try:
+        settings = _settings()
+        if not settings["enabled"]:
+            return None
+        with _guards_lock:
+            if api in _guards:
+                return _guards[api]
+        rates = dict(DEFAULT_RATES, **parse_rates(settings["rates"]))
+    except Exception as e:
+        if not _settings_warned:
+            _settings_warned = True
+            print(f"⚠️ Limitación de peticiones desactivada: no se pudo leer su configuración ({e})")
+        return None
+    with _guards_lock:
+        if api not in _guards:
+            _guards[api] = ApiGuard(
+                api,
+                AdaptiveRateLimiter(rates.get(api, max(DEFAULT_RATES.values())), min_rate=settings["min_rate"]),
+                CircuitBreaker(settings["threshold"], settings["reset_seconds"]),
+            )
+        return _guards[api]
+
+
+def guards() -> Dict[str, ApiGuard]:
+    """
+    Guards created so far in this process, by API.
+    """
+    with _guards_lock:
+        return dict(_guards)
+
+
+def summary() -> str:
+    """
+    One line per API used in this run: current/ceiling rate, quota errors, time spent
+    waiting for the limiter and circuit state. Empty when nothing was rate limited.
+    """
+    return "\n".join(f"🚦 {guard.summary()}" for guard in guards().values())
+
+
+def reset_guards():
+    global _settings_warned
+
+    with _guards_lock:
+        _guards.clear()
+        _settings_warned = False
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class CacheBackend:
+    """
+    Storage interface for cached model responses (JSON-serializable dicts).
+    """
+
+    def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: dict):
+        raise NotImplementedError
+
+
+class MemoryLRUBackend(CacheBackend):
+    """
+    In-process LRU bounded by number of entries.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DiskBackend(CacheBackend):
+    """
+    SQLite store bounded by total payload size; least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory: str = "output/cache/gemini", max_bytes: int = 200 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "responses.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), time.time()),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+                for old_key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= size
+            self._conn.commit()
+
+
+class TieredBackend(CacheBackend):
+    """
+    Memory LRU in front of a persistent backend. Persistent hits are promoted to memory.
+    """
+
+    def __init__(self, memory: MemoryLRUBackend, persistent: CacheBackend):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self.memory.get(key)
+        if value is None:
+            value = self.persistent.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: dict):
+        self.memory.set(key, value)
+        self.persistent.set(key, value)
+
+
+def _to_jsonable(value: Any) -> Any:
+    """
+    Canonical, hashable view of prompt contents and configs (str, Part, Content, dicts...).
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if hasattr(value, "to_dict"):
+        # vertexai Part/Content/GenerationConfig: file parts expose their URI and mime type
+        return _to_jsonable(value.to_dict())
+    return repr(value)
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of Gemini responses with hit/miss counters.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model_name: str, contents: Any, generation_config: Any = None, extra: Optional[Dict[str, Any]] = None) -> str:
+        """
+        sha256 over model name, prompt contents (attached parts by URI), generation config
+        and caller-provided extras such as the etag of attached files.
+        """
+        material = {
+            "model": model_name,
+            "contents": _to_jsonable(contents),
+            "generation_config": _to_jsonable(generation_config),
+            "extra": _to_jsonable(extra),
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict):
+        self.backend.set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for a `GenerationResponse` served from the cache.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class CachedGenerativeModel:
+    """
+    Wraps a `GenerativeModel` so `generate_content` calls are memoized. Streams are
+    stored once fully consumed and replayed as a single chunk.
+
+    Pass `cache_extra` to `generate_content` to add inputs the prompt does not carry
+    (e.g. `{"etag": ...}` of an attached GCS file). Any other attribute is delegated
+    to the wrapped model.
+    """
+
+    def __init__(self, model, model_name: str, cache: ResponseCache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    def generate_content(self, contents, generation_config=None, stream: bool = False, cache_extra: Optional[Dict[str, Any]] = None, **kwargs):
+        extra = dict(cache_extra or {}, **{k: kwargs[k] for k in sorted(kwargs)})
+        key = ResponseCache.make_key(self.model_name, contents, generation_config, extra)
+        cached = self.cache.get(key)
+        if cached is not None:
+            # A cached stream is replayed as a single chunk
+            return iter([CachedResponse(cached["text"])]) if stream else CachedResponse(cached["text"])
+
+        if stream:
+            return self._stream_and_cache(key, contents, generation_config, kwargs)
+
+        response = self.model.generate_content(contents, generation_config=generation_config, **kwargs)
+        try:
+            text = response.text
+        except Exception:
+            # Blocked or empty candidates: nothing worth caching
+            return response
+        if text:
+            self.cache.set(key, {"text": text, "created_at": time.time()})
+        return response
+
+    def _stream_and_cache(self, key: str, contents, generation_config, kwargs: dict):
+        parts = []
+        for chunk in self.model.generate_content(contents, generation_config=generation_config, stream=True, **kwargs):
+            try:
+                parts.append(chunk.text)
+            except Exception:
+                pass
+            yield chunk
+        # Only a fully consumed stream is stored
+        text = "".join(parts)
+        if text:
+            self.cache.set(key, {"text": text, "created_at": time.time()})
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache(directory: str = "output/cache/gemini", memory_entries: int = 256, max_disk_bytes: int = 200 * 1024 * 1024) -> ResponseCache:
+    """
+    Process-wide response cache (memory LRU + disk). Parameters apply on first call only.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                TieredBackend(MemoryLRUBackend(memory_entries), DiskBackend(directory, max_disk_bytes))
+            )
+        return _shared_cache
@@ -0,0 +1,122 @@
+import functools
+import random
+import time
+from typing import Callable, Optional, TypeVar
+
+from core import telemetry
+from core.rate_limit import get_guard
+
+T = TypeVar("T")
+
+# HTTP statuses that signal throttling or a transient backend failure.
+# google-api-core exceptions expose them as `code`, PyGithub exceptions as `status`.
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Returns True when the error is worth retrying (quota exhaustion, throttling,
+    transient backend or network failures).
+
+    Args:
+        exc (BaseException): Exception raised by a GCP or GitHub client call.
+    """
+    status = getattr(exc, "code", None)
+    if not isinstance(status, int):
+        status = getattr(exc, "status", None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    """
+    Returns True for throttling errors (HTTP 429 / gRPC RESOURCE_EXHAUSTED).
+    """
+    status = getattr(exc, "code", None)
+    if not isinstance(status, int):
+        status = getattr(exc, "status", None)
+    return status == 429
+
+
+def retry_call(
+    func: Callable[[], T],
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    is_retryable: Callable[[BaseException], bool] = is_transient_error,
+    description: Optional[str] = None,
+    on_retry: Optional[Callable[[BaseException, int, float], None]] = None,
+    api: Optional[str] = None,
+) -> T:
+    """
+    Calls `func` retrying transient failures with exponential backoff and full jitter.
+
+    Args:
+        func (Callable): Zero-argument callable performing the remote call.
+        max_attempts (int): Total attempts, including the first one.
+        base_delay (float): Initial backoff in seconds.
+        max_delay (float): Upper bound for a single backoff in seconds.
+        is_retryable (Callable): Predicate deciding whether an error is retried.
+        description (Optional[str]): Label used in retry log messages.
+        on_retry (Optional[Callable]): Called with `(error, attempt, delay)` before each backoff.
+        api (Optional[str]): API whose shared rate limiter and circuit breaker every attempt
+            goes through (see `core.rate_limit`), e.g. "bigquery" or "github".
+
+    Returns:
+        The value returned by `func`. The last error is re-raised once attempts are exhausted.
+    """
+    guard = get_guard(api) if api else None
+    attempt = 1
+    while True:
+        if guard:
+            try:
+                guard.before_call()
+            except Exception:
+                telemetry.count(telemetry.ERRORS)
+                raise
+        telemetry.count(telemetry.RPCS)
+        try:
+            result = func()
+        except Exception as e:
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+            if guard:
+                # A quota error pauses every caller of the API for the backoff, not just this one
+                guard.on_error(e, pause=delay)
+            if attempt >= max_attempts or not is_retryable(e):
+                telemetry.count(telemetry.ERRORS)
+                raise
+            label = description or getattr(func, "__name__", "call")
+            telemetry.count(telemetry.RETRIES)
+            if on_retry:
+                on_retry(e, attempt, delay)
+            print(f"⏳ Reintentando {label} ({attempt}/{max_attempts - 1}) en {delay:.1f}s: {e}")
+            time.sleep(delay)
+            attempt += 1
+        else:
+            if guard:
+                guard.on_success()
+            return result
+
+
+class RetryingProxy:
+    """
+    Wraps a client object so every public method call goes through `retry_call` with the
+    rate limiter and circuit breaker of `api` (e.g. a PyGithub `Repository`, where each
+    method is one REST request). Every attempt counts as one RPC on the current span.
+    """
+
+    def __init__(self, target, api: str, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self._target = target
+        self._api = api
+        self._retry = dict(max_attempts=max_attempts, base_delay=base_delay, max_delay=max_delay)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            return retry_call(lambda: attribute(*args, **kwargs), api=self._api, description=f"{self._api} {name}", **self._retry)
+        return call
@@ -0,0 +1,299 @@
+"""
+Lightweight run instrumentation: nested spans with wall time and counters.
+
+    with telemetry.span("bigquery.harvest", dataset=dataset_id):
+        ...
+        telemetry.count("rpcs")
+
+    @telemetry.timed("gemini.generate")
+    def _generate(...): ...
+
+Counters recorded inside a span are added to it and to every enclosing span, so a
+stage reports the RPCs, retries, tokens and bytes of everything it ran. Spans started
+in worker threads keep their parent when the pool is a `TracedThreadPoolExecutor`.
+Finished spans stay in memory for `summary_table()` and can also be written as JSON
+lines and/or exported to OpenTelemetry (see `configure`).
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Counters shown in the summary table, in this order
+RPCS = "rpcs"
+RETRIES = "retries"
+ERRORS = "errors"
+PROMPT_TOKENS = "prompt_tokens"
+RESPONSE_TOKENS = "response_tokens"
+BYTES_SENT = "bytes_sent"
+BYTES_RECEIVED = "bytes_received"
+SUMMARY_COUNTERS = [RPCS, RETRIES, ERRORS, PROMPT_TOKENS, RESPONSE_TOKENS, BYTES_SENT, BYTES_RECEIVED]
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    name: str
+    parent: Optional["Span"] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+    span_id: int = field(default_factory=lambda: next(_ids))
+    start: float = field(default_factory=time.time)
+    seconds: Optional[float] = None
+    status: str = "ok"
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _otel: Any = field(default=None, repr=False)
+
+    @property
+    def depth(self) -> int:
+        return 0 if self.parent is None else self.parent.depth + 1
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self, run_id: str) -> dict:
+        return {
+            "run_id": run_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": self.start,
+            "seconds": round(self.seconds or 0.0, 6),
+            "status": self.status,
+            "attributes": self.attributes,
+            "counters": self.counters,
+        }
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("telemetry_span", default=None)
+
+
+class Telemetry:
+    """
+    Collector of the spans of one run. Thread-safe; the module-level helpers use a
+    process-wide instance.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.enabled = True
+        self.finished: List[Span] = []
+        self.unscoped: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._jsonl = None
+        self._tracer = None
+
+    def configure(self, enabled: bool = True, jsonl_path: Optional[str] = None, otel: bool = False):
+        """
+        Args:
+            enabled (bool): Record spans at all (disabled, spans are no-ops).
+            jsonl_path (Optional[str]): Append every finished span to this file as a JSON line.
+            otel (bool): Mirror spans to OpenTelemetry (`opentelemetry-api`; the exporter is
+                whatever the OpenTelemetry SDK of the process is configured with).
+        """
+        self.enabled = enabled
+        with self._lock:
+            if self._jsonl:
+                self._jsonl.close()
+                self._jsonl = None
+            if enabled and jsonl_path:
+                os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+                self._jsonl = open(jsonl_path, "a", encoding="utf-8")
+        self._tracer = None
+        if enabled and otel:
+            try:
+                from opentelemetry import trace
+
+                self._tracer = trace.get_tracer("data-quality-agent")
+            except ImportError:
+                print("⚠️ opentelemetry-api no está instalado; la telemetría solo se exporta en JSONL.")
+
+    def _start(self, name: str, attributes: dict) -> Span:
+        parent = _current.get()
+        span = Span(name=name, parent=parent, attributes=attributes)
+        if self._tracer is not None:
+            from opentelemetry import trace
+
+            context = trace.set_span_in_context(parent._otel) if parent is not None and parent._otel is not None else None
+            span._otel = self._tracer.start_span(name, context=context)
+        return span
+
+    def _finish(self, span: Span):
+        span.seconds = time.perf_counter() - span._started
+        if span._otel is not None:
+            for key, value in {**span.attributes, **span.counters}.items():
+                if isinstance(value, (str, bool, int, float)):
+                    span._otel.set_attribute(key, value)
+            span._otel.set_attribute("status", span.status)
+            span._otel.end()
+        with self._lock:
+            self.finished.append(span)
+            if self._jsonl:
+                self._jsonl.write(json.dumps(span.to_dict(self.run_id), default=str) + "\n")
+                self._jsonl.flush()
+
+    def span(self, name: str, **attributes) -> "_SpanContext":
+        return _SpanContext(self, name, attributes)
+
+    def count(self, counter: str, value: float = 1):
+        """
+        Adds `value` to `counter` on the current span and its ancestors (or to the
+        unscoped totals when no span is open).
+        """
+        if not self.enabled or not value:
+            return
+        span = _current.get()
+        with self._lock:
+            if span is None:
+                self.unscoped[counter] = self.unscoped.get(counter, 0) + value
+            while span is not None:
+                span.counters[counter] = span.counters.get(counter, 0) + value
+                span = span.parent
+
+    def summary_rows(self) -> List[dict]:
+        """
+        Finished spans aggregated by name, in order of first appearance.
+        """
+        rows: Dict[str, dict] = {}
+        with self._lock:
+            spans = sorted(self.finished, key=lambda s: s.start)
+        for span in spans:
+            row = rows.setdefault(span.name, {"name": span.name, "depth": span.depth, "calls": 0, "failed": 0,
+                                              "seconds": 0.0, **{c: 0 for c in SUMMARY_COUNTERS}})
+            row["calls"] += 1
+            row["failed"] += span.status != "ok"
+            row["seconds"] += span.seconds or 0.0
+            for counter in SUMMARY_COUNTERS:
+                row[counter] += span.counters.get(counter, 0)
+        return list(rows.values())
+
+    def summary_table(self) -> str:
+        rows = self.summary_rows()
+        if not rows:
+            return ""
+        headers = ["etapa", "llamadas", "segundos", "rpc", "reintentos", "errores", "tokens in", "tokens out", "KB out", "KB in"]
+        lines = [[
+            "  " * row["depth"] + row["name"],
+            f"{row['calls']}" + (f" ({row['failed']} ✗)" if row["failed"] else ""),
+            f"{row['seconds']:.2f}",
+            *(f"{int(row[c])}" for c in (RPCS, RETRIES, ERRORS, PROMPT_TOKENS, RESPONSE_TOKENS)),
+            f"{row[BYTES_SENT] / 1024:.1f}",
+            f"{row[BYTES_RECEIVED] / 1024:.1f}",
+        ] for row in rows]
+        widths = [max(len(h), *(len(line[i]) for line in lines)) for i, h in enumerate(headers)]
+        render = lambda cells: "  ".join(c.ljust(w) if i == 0 else c.rjust(w) for i, (c, w) in enumerate(zip(cells, widths)))
+        return "\n".join([f"📊 Telemetría de la ejecución {self.run_id}", render(headers), render(["-" * w for w in widths])] + [render(line) for line in lines])
+
+    def reset(self):
+        with self._lock:
+            self.finished = []
+            self.unscoped = {}
+        self.run_id = uuid.uuid4().hex[:12]
+
+
+class _SpanContext:
+    def __init__(self, telemetry: Telemetry, name: str, attributes: dict):
+        self.telemetry = telemetry
+        self.name = name
+        self.attributes = attributes
+        self.span: Optional[Span] = None
+        self._token = None
+
+    def __enter__(self) -> Optional[Span]:
+        if not self.telemetry.enabled:
+            return None
+        self.span = self.telemetry._start(self.name, self.attributes)
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.span is None:
+            return False
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.span.status = "error"
+            self.span.attributes.setdefault("error", f"{exc_type.__name__}: {exc}")
+        self.telemetry._finish(self.span)
+        return False
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    return _telemetry
+
+
+def configure(enabled: bool = True, jsonl_path: Optional[str] = None, otel: bool = False):
+    _telemetry.configure(enabled=enabled, jsonl_path=jsonl_path, otel=otel)
+
+
+def span(name: str, **attributes) -> _SpanContext:
+    return _telemetry.span(name, **attributes)
+
+
+def count(counter: str, value: float = 1):
+    _telemetry.count(counter, value)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def timed(name: Optional[str] = None):
+    """
+    Decorator running the function inside a span (named after the function by default).
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _telemetry.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_usage(usage_metadata):
+    """
+    Counts the tokens of a Vertex AI response (`response.usage_metadata`).
+    """
+    if usage_metadata is None:
+        return
+    count(PROMPT_TOKENS, getattr(usage_metadata, "prompt_token_count", 0) or 0)
+    count(RESPONSE_TOKENS, getattr(usage_metadata, "candidates_token_count", 0) or 0)
+
+
+def bind(func: Callable) -> Callable:
+    """
+    Binds `func` to the current span, so calls made from another thread are recorded under it.
+    """
+    parent = _current.get()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return wrapper
+
+
+class TracedThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    `ThreadPoolExecutor` whose tasks run under the span that submitted them.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(bind(fn), *args, **kwargs)
+
@@ -1,6 +1,9 @@
 import vertexai
 from vertexai.generative_models import GenerativeModel, Part
+from google.cloud import storage
 from config.settings import config
+from core.response_cache import CachedGenerativeModel, ResponseCache, get_shared_cache
+from core.retry import retry_call
 from typing import Optional
 
 class VertexAIClient:
@@ -8,12 +11,40 @@ class VertexAIClient:
     Client to interact with Vertex AI models.
     """
 
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
         """
         Initializes the connection with Vertex AI.
+
+        Args:
+            response_cache (Optional[ResponseCache]): Cache for model responses. Defaults to the
+                shared cache when `RESPONSE_CACHE_ENABLED` is set.
         """
         vertexai.init(project=config.PROJECT_ID, location=config.LOCATION)
         self.model = GenerativeModel(config.MODEL_NAME)
+        if response_cache is None and config.RESPONSE_CACHE_ENABLED:
+            response_cache = get_shared_cache(
+                config.RESPONSE_CACHE_DIR,
+                memory_entries=config.RESPONSE_CACHE_MEMORY_ENTRIES,
+                max_disk_bytes=config.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+            )
+        if response_cache:
+            self.model = CachedGenerativeModel(self.model, config.MODEL_NAME, response_cache)
+        self._storage_client = None
+
+    def _gcs_etag(self, gcs_uri: str) -> Optional[str]:
+        """
+        Returns the etag of a GCS object so cached responses are invalidated when the file changes.
+        """
+        try:
+            if self._storage_client is None:
+                self._storage_client = storage.Client(project=config.PROJECT_ID)
+            bucket_name, _, blob_name = gcs_uri[len("gs://"):].partition("/")
+            bucket = self._storage_client.bucket(bucket_name)
+            blob = retry_call(lambda: bucket.get_blob(blob_name), max_attempts=3, description=f"get_blob({gcs_uri})", api="storage")
+            return blob.etag if blob else None
+        except Exception as e:
+            print(f"Could not read etag for {gcs_uri}: {e}")
+            return None
 
     def analyze_pdf_content(self, gcs_uri: str, prompt_text: str) -> Optional[str]:
         """
@@ -40,10 +71,24 @@ class VertexAIClient:
                 "top_p": 0.95,
             }
 
-            responses = self.model.generate_content(
-                [pdf_file, prompt_text],
-                generation_config=generation_config,
-                stream=False
+            model, cache_kwargs = self.model, {}
+            if isinstance(self.model, CachedGenerativeModel):
+                # Without an etag the file may have changed: bypass the cache instead of serving stale output
+                etag = self._gcs_etag(gcs_uri)
+                if etag:
+                    cache_kwargs["cache_extra"] = {"etag": etag}
+                else:
+                    model = self.model.model
+
+            responses = retry_call(
+                lambda: model.generate_content(
+                    [pdf_file, prompt_text],
+                    generation_config=generation_config,
+                    stream=False,
+                    **cache_kwargs
+                ),
+                description="Gemini generate_content",
+                api="vertex",
             )
 
             return responses.text
@@ -1,97 +1,673 @@
 import os
+import json
 import time
-from google.cloud import bigquery
-import vertexai
-from core.github_client import GitHubClient
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from core import rate_limit, telemetry
+from core.response_cache import get_shared_cache
 from modules.data_quality import DataQualityGenerator
+from modules.batch_generation import BatchExecutor, BatchRequest, LocalBatchExecutor, VertexBatchExecutor
+from modules.context_builder import ContextBuilder, flatten_columns
+from modules.data_profiler import DataProfiler
+from modules.bigquery_metadata import BigQueryMetadataHarvester, TableMetadata, qualify_dataset, render_dataset_context, render_table_context
+from modules.metadata_cache import MetadataCache, table_fingerprint
+from modules.pipeline import Stage, StagedPipeline
+from modules.proposal_store import RULES, ProposalDiff, ProposalStore
+from modules.rule_index import RuleIndex, build_rule_index, read_local_proposals
+from modules.run_ledger import GENERATED, HARVESTED, PUBLISHED, VALIDATED, LedgerRun, RunLedger, content_hash
+from modules.sharding import estimate_tokens, pack_shards
 from config.settings import config
 
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+    from core.github_client import GitHubClient
+
 # --- CONFIGURACIÓN TÉCNICA ---
-PROJECT_ID = config.PROJECT_ID
-LOCATION = config.LOCATION
-TARGET_DATASET = config.DATASET_ID or "pharmaceutical_drugs" 
+def target_dataset() -> str:
+    # Se resuelve al ejecutar, no al importar: importar main no exige la configuración completa
+    return config.DATASET_ID or "pharmaceutical_drugs"
+
+def build_harvester(client: "bigquery.Client", max_workers: Optional[int] = None) -> BigQueryMetadataHarvester:
+    return BigQueryMetadataHarvester(
+        client,
+        max_workers=max_workers or config.BQ_MAX_WORKERS,
+        max_retries=config.BQ_MAX_RETRIES,
+        use_bulk_query=config.BQ_BULK_METADATA,
+    )
 
-def get_context_from_bigquery(project_id: str, location: str, dataset_id: str) -> str:
+def build_profiler(client: "bigquery.Client", cache: Optional[MetadataCache] = None) -> Optional[DataProfiler]:
     """
-    Recupera el contexto de los metadatos de las tablas en BigQuery de un dataset específico.
+    Perfilador de datos según `PROFILE_*`, o None si `PROFILING_ENABLED` está desactivado.
     """
-    client = bigquery.Client(project=project_id, location=location)
-    context = ""
-    
+    if not config.PROFILING_ENABLED:
+        return None
+    return DataProfiler(
+        client,
+        max_bytes_billed=config.PROFILE_MAX_BYTES_BILLED,
+        top_k=config.PROFILE_TOP_K,
+        max_workers=config.PROFILE_MAX_WORKERS,
+        max_retries=config.BQ_MAX_RETRIES,
+        cache=cache,
+    )
+
+def harvest_tables(harvester: BigQueryMetadataHarvester, project_id: str, dataset_id: str, table_ids: List[str], cache: Optional[MetadataCache] = None, last_modified: Optional[Dict[str, int]] = None) -> Tuple[List[TableMetadata], int]:
+    """
+    Metadatos de `table_ids` (en ese orden): de la caché si la tabla no ha cambiado
+    (según `last_modified`), del harvester el resto. Devuelve también cuántas vinieron de caché.
+    """
+    dataset_ref = qualify_dataset(project_id, dataset_id)
+    last_modified = last_modified or {}
+    cached: Dict[str, TableMetadata] = {}
+    if cache:
+        for table_id in table_ids:
+            metadata = cache.get_metadata(f"{dataset_ref}.{table_id}", last_modified.get(table_id))
+            if metadata:
+                cached[table_id] = metadata
+
+    harvested = {t.table_id: t for t in harvester.harvest(dataset_id, [t for t in table_ids if t not in cached])}
+    if cache:
+        for table_id, metadata in harvested.items():
+            metadata.last_modified = last_modified.get(table_id, metadata.last_modified)
+            cache.put_metadata(f"{dataset_ref}.{table_id}", metadata)
+    return [cached.get(t) or harvested[t] for t in table_ids if t in cached or t in harvested], len(cached)
+
+@telemetry.timed("bigquery.harvest")
+def get_tables_from_bigquery(project_id: str, location: str, dataset_id: str, cache: Optional[MetadataCache] = None, max_workers: Optional[int] = None, client: Optional["bigquery.Client"] = None, ledger: Optional[LedgerRun] = None) -> List[TableMetadata]:
+    """
+    Recupera los metadatos de las tablas en BigQuery de un dataset específico.
+    Los metadatos se obtienen en bloque (INFORMATION_SCHEMA) o en paralelo por tabla,
+    manteniendo el orden del listado de tablas. Con caché, las tablas no modificadas
+    desde la última ejecución no se vuelven a leer. Se puede pasar un `client` ya
+    creado para reutilizarlo entre datasets. Con `PROFILING_ENABLED`, cada tabla
+    incluye además su perfil de datos (consulta muestreada, acotada en bytes). Con
+    `ledger`, una ejecución reanudada reutiliza las tablas ya extraídas.
+    """
+    harvest_hash = content_hash(qualify_dataset(project_id, dataset_id))
+    if ledger:
+        entry = ledger.completed("tables", HARVESTED, harvest_hash)
+        if entry:
+            print(f"⏯️ {len(entry.payload)} tablas de {dataset_id} recuperadas del registro de la ejecución.")
+            return [TableMetadata.from_dict(t) for t in entry.payload]
+
+    if client is None:
+        from google.cloud import bigquery
+
+        client = bigquery.Client(project=project_id, location=location)
+    harvester = build_harvester(client, max_workers)
+
     try:
         print(f"DEBUG: Listando tablas en el dataset '{dataset_id}'...")
         
         try:
-             tables = list(client.list_tables(dataset_id))
+             table_ids = harvester.list_tables(dataset_id)
         except Exception as e:
             print(f"⚠️ Error accediendo al dataset {dataset_id}: {e}")
-            return ""
+            return []
 
-        if not tables:
+        if not table_ids:
              print(f"⚠️ No se encontraron tablas en {dataset_id}.")
-             return ""
+             return []
 
-        context += f"\nDataset: {dataset_id}\n"
-        
-        for table in tables:
-            full_table = client.get_table(table)
-            context += f"  Table: {full_table.table_id}\n"
-            if full_table.description:
-                context += f"    Description: {full_table.description}\n"
-            
-            context += "    Columns:\n"
-            for schema_field in full_table.schema:
-                desc_str = f" - Description: {schema_field.description}" if schema_field.description else ""
-                context += f"      - {schema_field.name} ({schema_field.field_type}){desc_str}\n"
+        last_modified = harvester.get_last_modified(dataset_id) if cache else {}
+        tables, from_cache = harvest_tables(harvester, project_id, dataset_id, table_ids, cache, last_modified)
+        if cache:
+            print(f"♻️ {from_cache}/{len(table_ids)} tablas sin cambios servidas desde caché.")
 
     except Exception as e:
         print(f"⚠️ Error recuperando metadatos de BigQuery: {e}")
-        return ""
+        return []
+
+    profiler = build_profiler(client, cache)
+    if profiler and tables:
+        print(f"🔎 Perfilando {len(tables)} tablas de {dataset_id}...")
+        profiler.profile(dataset_id, tables)
+    if ledger and tables:
+        ledger.record("tables", HARVESTED, harvest_hash, [t.to_dict() for t in tables])
+    return tables
+
+def build_context(dataset_id: str, tables: List[TableMetadata]) -> str:
+    """
+    Contexto técnico de un único prompt: compacto y acotado a `CONTEXT_TOKEN_BUDGET`
+    (`CONTEXT_FORMAT=compact`) o el texto completo.
+    """
+    if config.CONTEXT_FORMAT == "compact":
+        return ContextBuilder(config.CONTEXT_TOKEN_BUDGET, max_description_chars=config.CONTEXT_MAX_DESCRIPTION_CHARS).build(dataset_id, tables)
+    return render_dataset_context(dataset_id, tables)
+
+def build_context_shards(dataset_id: str, tables: List[TableMetadata]) -> List[str]:
+    """
+    Contextos por fragmento (lotes de tablas) dentro de `SHARD_TOKEN_BUDGET`.
+    """
+    if not tables:
+        return []
+    if config.CONTEXT_FORMAT == "compact":
+        return ContextBuilder(config.SHARD_TOKEN_BUDGET, max_description_chars=config.CONTEXT_MAX_DESCRIPTION_CHARS).build_shards(dataset_id, tables)
+    return pack_shards([render_table_context(t) for t in tables], config.SHARD_TOKEN_BUDGET, header=f"Dataset: {dataset_id}")
+
+@telemetry.timed("bigquery.context")
+def get_context_from_bigquery(project_id: str, location: str, dataset_id: str, max_workers: Optional[int] = None) -> str:
+    """
+    Recupera el contexto de los metadatos de las tablas en BigQuery de un dataset específico.
+    """
+    tables = get_tables_from_bigquery(project_id, location, dataset_id, max_workers=max_workers)
+    return build_context(dataset_id, tables)
+
+def _rules_salt() -> str:
+    # Las reglas generadas con perfil de datos no sustituyen a las generadas sin él (y viceversa)
+    return f"{config.MODEL_NAME}+profile" if config.PROFILING_ENABLED else config.MODEL_NAME
+
+def _rule_table(rule: dict) -> str:
+    # El modelo puede devolver la tabla cualificada (dataset.tabla)
+    return str(rule.get("table", "")).rsplit(".", 1)[-1]
+
+def split_cached_rules(project_id: str, dataset_id: str, tables: List[TableMetadata], cache: Optional[MetadataCache] = None, ledger: Optional[LedgerRun] = None) -> Tuple[Dict[str, List[dict]], List[TableMetadata]]:
+    """
+    Separa las tablas con reglas en caché (esquema sin cambios) o ya generadas en la
+    ejecución que se reanuda (`ledger`) de las que hay que enviar al modelo.
+    """
+    dataset_ref = qualify_dataset(project_id, dataset_id)
+    cached_rules: Dict[str, List[dict]] = {}
+    if cache or ledger:
+        for t in tables:
+            fingerprint = table_fingerprint(t, salt=_rules_salt())
+            entry = ledger.completed(f"rules:{t.table_id}", GENERATED, fingerprint) if ledger else None
+            rules = entry.payload if entry else None
+            if rules is None and cache:
+                rules = cache.get_rules(f"{dataset_ref}.{t.table_id}", fingerprint)
+            if rules is not None:
+                cached_rules[t.table_id] = rules
+    pending = [t for t in tables if t.table_id not in cached_rules]
+    print(f"♻️ Reglas en caché para {len(cached_rules)} tablas; {len(pending)} tablas se envían al modelo.")
+    return cached_rules, pending
+
+def record_generated_rules(ledger: Optional[LedgerRun], tables: List[TableMetadata], rules: List[dict]):
+    """
+    Registra en la ejecución las reglas de cada tabla en cuanto están generadas, para
+    no volver a pedirlas al modelo si la ejecución se interrumpe.
+    """
+    if not ledger:
+        return
+    for t in tables:
+        table_rules = [r for r in rules if _rule_table(r) == t.table_id]
+        # Una tabla sin reglas puede venir de un fragmento fallido: se vuelve a generar
+        if table_rules:
+            ledger.record(f"rules:{t.table_id}", GENERATED, table_fingerprint(t, salt=_rules_salt()), table_rules)
+
+@telemetry.timed("rule_index.load")
+def load_rule_index(github_client: Optional["GitHubClient"] = None) -> Optional[RuleIndex]:
+    """
+    Índice de reglas aprobadas (`RULE_INDEX_SOURCES`): propuestas locales y las
+    fusionadas en la rama base del repositorio de GitHub.
+    """
+    if not config.RULE_INDEX_ENABLED:
+        return None
+    sources = {s.strip() for s in config.RULE_INDEX_SOURCES.split(",")}
+    proposals = read_local_proposals(config.RULE_INDEX_LOCAL_GLOB) if "local" in sources else []
+    if "github" in sources and github_client is not None and github_client.repo:
+        try:
+            proposals += list(github_client.get_approved_proposals().items())
+        except Exception as e:
+            print(f"⚠️ No se pudieron leer las propuestas aprobadas de GitHub: {e}")
+    index = build_rule_index(proposals, min_similarity=config.RULE_INDEX_MIN_SIMILARITY, min_support=config.RULE_INDEX_MIN_SUPPORT)
+    print(f"♻️ Índice de reglas aprobadas: {len(index)} columnas de {len(proposals)} propuestas.")
+    return index
+
+def reuse_indexed_rules(rule_index: Optional[RuleIndex], pending: List[TableMetadata]) -> Tuple[List[dict], List[TableMetadata]]:
+    """
+    Asigna reglas aprobadas a las columnas con coincidencia; solo las columnas nuevas
+    (y las tablas que las contienen) se envían al modelo.
+    """
+    if rule_index is None or not pending:
+        return [], pending
+    reused, remaining = rule_index.assign(pending)
+    rules = [rule for t in pending for rule in reused.get(t.table_id, [])]
+    print(f"♻️ {len(rules)} reglas reutilizadas; {len(remaining)}/{len(pending)} tablas se envían al modelo.")
+    return rules, remaining
+
+def merge_quality_rules(project_id: str, dataset_id: str, tables: List[TableMetadata], cached_rules: Dict[str, List[dict]], new_rules: List[dict], cache: Optional[MetadataCache] = None) -> str:
+    """
+    Guarda en caché las reglas nuevas y devuelve la propuesta completa, en el orden de las tablas.
+    """
+    dataset_ref = qualify_dataset(project_id, dataset_id)
+    if cache:
+        for t in tables:
+            if t.table_id in cached_rules:
+                continue
+            table_rules = [r for r in new_rules if _rule_table(r) == t.table_id]
+            # Una tabla sin reglas puede venir de un fragmento fallido: no se cachea
+            if table_rules:
+                cache.put_rules(f"{dataset_ref}.{t.table_id}", table_fingerprint(t, salt=_rules_salt()), table_rules)
+
+    # Reglas en el orden de las tablas; las que no referencian una tabla conocida van al final
+    table_order = {t.table_id: i for i, t in enumerate(tables)}
+    rules = [r for t in tables for r in cached_rules.get(t.table_id, [])] + new_rules
+    rules.sort(key=lambda r: table_order.get(_rule_table(r), len(table_order)))
+    return json.dumps({"rules": rules}, indent=2, ensure_ascii=False)
+
+@telemetry.timed("dq.generate")
+def generate_quality_rules(dq_gen: DataQualityGenerator, project_id: str, dataset_id: str, tables: List[TableMetadata], cache: Optional[MetadataCache] = None, rule_index: Optional[RuleIndex] = None, ledger: Optional[LedgerRun] = None) -> Optional[str]:
+    """
+    Genera la propuesta de reglas de calidad. Con caché, solo las tablas cuyo esquema
+    ha cambiado se envían al modelo; el resto reutiliza las reglas ya generadas. Con
+    índice de reglas, las columnas ya conocidas reciben reglas aprobadas sin llamar al modelo.
+    Con `ledger`, las reglas de cada fragmento se registran al terminar, de modo que una
+    ejecución reanudada solo genera las tablas que faltaban.
+    """
+    cached_rules, pending = split_cached_rules(project_id, dataset_id, tables, cache, ledger)
+    uncached = [t for t in tables if t.table_id not in cached_rules]
+    new_rules, pending = reuse_indexed_rules(rule_index, pending)
+    # El índice deja en `pending` copias reducidas a las columnas nuevas: el registro usa
+    # las tablas completas, cuya huella es la que se comprueba al reanudar
+    pending_ids = {t.table_id for t in pending}
+    record_generated_rules(ledger, [t for t in uncached if t.table_id not in pending_ids], new_rules)
+    generated = [t for t in uncached if t.table_id in pending_ids]
+
+    if pending:
+        reused_rules = list(new_rules)
+
+        def checkpoint(shard_json: str):
+            # Solo las tablas de este fragmento (las que aparecen en su respuesta)
+            shard_rules = json.loads(shard_json).get("rules", [])
+            shard_tables = {_rule_table(r) for r in shard_rules}
+            record_generated_rules(ledger, [t for t in generated if t.table_id in shard_tables], reused_rules + shard_rules)
+
+        if config.GENERATION_SHARDING:
+            dq_json = dq_gen.suggest_quality_rules_for_shards(build_context_shards(dataset_id, pending), max_workers=config.GEMINI_MAX_WORKERS, on_result=checkpoint if ledger else None)
+        else:
+            dq_json = dq_gen.suggest_quality_rules(build_context(dataset_id, pending))
+        if not dq_json:
+            return None
+        new_rules += json.loads(dq_json).get("rules", [])
+        record_generated_rules(ledger, generated, new_rules)
+
+    return merge_quality_rules(project_id, dataset_id, tables, cached_rules, new_rules, cache)
+
+@telemetry.timed("dq.generate_batch")
+def generate_quality_rules_batch(dq_gen: DataQualityGenerator, executor: BatchExecutor, project_id: str, datasets: Dict[str, List[TableMetadata]], cache: Optional[MetadataCache] = None, rule_index: Optional[RuleIndex] = None) -> Dict[str, Optional[str]]:
+    """
+    Modo batch: los prompts de todos los datasets (un fragmento por lote de tablas) se
+    envían en un único job y cada respuesta se asigna de vuelta a su dataset.
+    Devuelve la propuesta de cada dataset (None si todos sus fragmentos fallaron).
+    """
+    requests: List[BatchRequest] = []
+    keys_by_dataset: Dict[str, List[str]] = {}
+    cached_by_dataset: Dict[str, Dict[str, List[dict]]] = {}
+    reused_by_dataset: Dict[str, List[dict]] = {}
+    for dataset_id, tables in datasets.items():
+        cached_rules, pending = split_cached_rules(project_id, dataset_id, tables, cache)
+        cached_by_dataset[dataset_id] = cached_rules
+        reused_by_dataset[dataset_id], pending = reuse_indexed_rules(rule_index, pending)
+        shards = build_context_shards(dataset_id, pending)
+        keys_by_dataset[dataset_id] = [f"{dataset_id}:{i}" for i in range(len(shards))]
+        requests.extend(BatchRequest(key=key, prompt=dq_gen.build_prompt(shard)) for key, shard in zip(keys_by_dataset[dataset_id], shards))
+
+    print(f"🧠 Generación batch: {len(requests)} peticiones para {len(datasets)} datasets...")
+    results = executor.run(requests)
 
-    return context.strip()
+    proposals: Dict[str, Optional[str]] = {}
+    for dataset_id, tables in datasets.items():
+        keys = keys_by_dataset[dataset_id]
+        failed = [results[k] for k in keys if results[k].text is None]
+        for result in failed:
+            print(f"⚠️ Petición batch {result.key} sin resultado: {result.error}")
+        if keys and len(failed) == len(keys):
+            proposals[dataset_id] = None
+            continue
+        new_rules = reused_by_dataset[dataset_id] + [rule for k in keys if results[k].text for rule in dq_gen.parse_rules_response(results[k].text)]
+        proposals[dataset_id] = merge_quality_rules(project_id, dataset_id, tables, cached_by_dataset[dataset_id], new_rules, cache)
+    return proposals
+
+def _known_columns(table: TableMetadata) -> set:
+    # Nombres y rutas (address.city) de todas las columnas de la tabla
+    return {name for path, column, _ in flatten_columns(table.columns) for name in (path, column.name)}
+
+def validate_table_rules(rules: List[dict], tables: List[TableMetadata]) -> List[dict]:
+    """
+    Reglas del modelo que referencian una tabla del lote y una columna existente de esa
+    tabla. Si el lote tiene una sola tabla, las reglas sin tabla se le asignan.
+    """
+    by_id = {t.table_id: t for t in tables}
+    valid = []
+    for rule in rules:
+        table = by_id.get(_rule_table(rule))
+        if table is None and len(tables) == 1 and not rule.get("table"):
+            table = tables[0]
+            rule["table"] = table.table_id
+        if table is None:
+            print(f"⚠️ Regla descartada: tabla desconocida '{rule.get('table')}'")
+            continue
+        if rule.get("column") and rule["column"] not in _known_columns(table):
+            print(f"⚠️ Regla descartada: la columna '{rule['column']}' no existe en {table.table_id}")
+            continue
+        valid.append(rule)
+    return valid
+
+@telemetry.timed("dq.pipeline")
+def stream_quality_rules(dq_gen: DataQualityGenerator, client: "bigquery.Client", project_id: str, dataset_id: str, output_path: str, cache: Optional[MetadataCache] = None, rule_index: Optional[RuleIndex] = None, ledger: Optional[LedgerRun] = None) -> int:
+    """
+    Modo pipeline (`PIPELINE_MODE=streaming`): las tablas avanzan de una en una por
+    extracción (en bloques de `PIPELINE_HARVEST_CHUNK`) → caché / índice de reglas →
+    agrupación en lotes de `SHARD_TOKEN_BUDGET` → Gemini → validación → fichero, de modo
+    que el modelo empieza con las primeras tablas mientras se extraen las siguientes.
+    Cada etapa tiene su propia concurrencia y colas acotadas (`PIPELINE_QUEUE_SIZE`), así
+    que la memoria no crece con el tamaño del dataset: las reglas se escriben en
+    `output_path` según llegan (agrupadas por lote, no en el orden de las tablas).
+    Con `ledger`, las tablas ya generadas en la ejecución que se reanuda no vuelven al modelo.
+
+    Devuelve el número de reglas escritas (0 si no hay ninguna; el fichero no se crea).
+    """
+    harvester = build_harvester(client)
+    profiler = build_profiler(client, cache)
+    builder = ContextBuilder(config.SHARD_TOKEN_BUDGET, max_description_chars=config.CONTEXT_MAX_DESCRIPTION_CHARS)
+    compact = config.CONTEXT_FORMAT == "compact"
+    dataset_ref = qualify_dataset(project_id, dataset_id)
+
+    table_ids = harvester.list_tables(dataset_id)
+    if not table_ids:
+        print(f"⚠️ No se encontraron tablas en {dataset_id}.")
+        return 0
+    last_modified = harvester.get_last_modified(dataset_id) if cache else {}
+    chunk_size = max(1, config.PIPELINE_HARVEST_CHUNK)
+    chunks = (table_ids[i:i + chunk_size] for i in range(0, len(table_ids), chunk_size))
+
+    def harvest(ids: List[str]) -> List[TableMetadata]:
+        tables, _ = harvest_tables(harvester, project_id, dataset_id, ids, cache, last_modified)
+        if profiler and tables:
+            profiler.profile(dataset_id, tables)
+        return tables
+
+    # Elementos de trabajo: (tablas, reglas ya resueltas, tablas pendientes del modelo)
+    def reuse(table: TableMetadata) -> list:
+        fingerprint = table_fingerprint(table, salt=_rules_salt())
+        entry = ledger.completed(f"rules:{table.table_id}", GENERATED, fingerprint) if ledger else None
+        rules = entry.payload if entry else None
+        if rules is None and cache:
+            rules = cache.get_rules(f"{dataset_ref}.{table.table_id}", fingerprint)
+        if rules is not None:
+            return [([table], rules, [])]
+        if rule_index is None:
+            return [([table], [], [table])]
+        reused, pending = rule_index.assign([table])
+        return [([table], reused.get(table.table_id, []), pending)]
+
+    header = ContextBuilder.header_tokens(dataset_id) if compact else estimate_tokens(f"Dataset: {dataset_id}")
+    available = config.SHARD_TOKEN_BUDGET - header
+    batch = {"tables": [], "rules": [], "pending": [], "tokens": 0}
+
+    def take_batch() -> list:
+        if not batch["tables"]:
+            return []
+        item = (batch["tables"], batch["rules"], batch["pending"])
+        batch.update(tables=[], rules=[], pending=[], tokens=0)
+        return [item]
+
+    def group(item) -> list:
+        # Una sola instancia (workers=1): acumula tablas pendientes hasta llenar un lote
+        tables, rules, pending = item
+        if not pending:
+            return [item]
+        tokens = sum(builder.table_tokens(dataset_id, t) if compact else estimate_tokens(render_table_context(t)) for t in pending)
+        ready = take_batch() if batch["pending"] and batch["tokens"] + tokens > available else []
+        batch["tables"] += tables
+        batch["rules"] += rules
+        batch["pending"] += pending
+        batch["tokens"] += tokens
+        return ready
+
+    def generate(item) -> list:
+        tables, rules, pending = item
+        new_rules = []
+        if pending:
+            context = builder.build(dataset_id, pending) if compact else render_dataset_context(dataset_id, pending)
+            dq_json = dq_gen.suggest_quality_rules(context)
+            new_rules = json.loads(dq_json).get("rules", []) if dq_json else []
+        return [(tables, rules, pending, new_rules)]
+
+    def validate(item) -> list:
+        tables, rules, pending, new_rules = item
+        new_rules = validate_table_rules(new_rules, pending)
+        record_generated_rules(ledger, tables, rules + new_rules)
+        if cache:
+            # Tablas completas: `pending` puede traer copias reducidas por el índice, cuya
+            # huella no coincide con la que se consulta en `reuse`
+            pending_ids = {t.table_id for t in pending}
+            for t in (t for t in tables if t.table_id in pending_ids):
+                table_rules = [r for r in rules + new_rules if _rule_table(r) == t.table_id]
+                # Una tabla sin reglas puede venir de un lote fallido: no se cachea
+                if table_rules:
+                    cache.put_rules(f"{dataset_ref}.{t.table_id}", table_fingerprint(t, salt=_rules_salt()), table_rules)
+        return rules + new_rules
+
+    pipeline = StagedPipeline([
+        Stage("harvest", harvest, workers=config.PIPELINE_HARVEST_WORKERS, queue_size=config.PIPELINE_QUEUE_SIZE),
+        Stage("cache", reuse, workers=1, queue_size=config.PIPELINE_QUEUE_SIZE),
+        Stage("batch", group, workers=1, queue_size=config.PIPELINE_QUEUE_SIZE, flush=take_batch),
+        Stage("generate", generate, workers=config.GEMINI_MAX_WORKERS, queue_size=config.PIPELINE_QUEUE_SIZE),
+        Stage("validate", validate, workers=1, queue_size=config.PIPELINE_QUEUE_SIZE),
+    ], output_queue_size=config.PIPELINE_QUEUE_SIZE * 16)
+
+    print(f"🧠 Pipeline de {len(table_ids)} tablas de {dataset_id} (extracción → caché → lotes → Gemini → validación)...")
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write('{\n  "rules": [')
+        for rule in pipeline.run(chunks):
+            text = json.dumps(rule, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+            f.write(("," if written else "") + "\n    " + text)
+            written += 1
+        f.write("\n  ]\n}\n" if written else "]\n}\n")
+    print(f"✅ Pipeline: {pipeline.summary()}; {written} reglas.")
+    if not written:
+        os.remove(output_path)
+    return written
+
+def build_batch_executor(dq_gen: DataQualityGenerator) -> BatchExecutor:
+    """
+    Ejecutor batch según `BATCH_EXECUTOR`: Vertex AI batch prediction o el sustituto local
+    basado en ficheros (que responde con llamadas síncronas si no hay predicciones previas).
+    """
+    if config.BATCH_EXECUTOR == "local":
+        return LocalBatchExecutor(config.BATCH_WORK_DIR, responder=lambda prompt: dq_gen.model.generate_content(prompt).text)
+    return VertexBatchExecutor(
+        config.PROJECT_ID,
+        config.LOCATION,
+        config.MODEL_NAME,
+        config.GCS_BUCKET,
+        prefix=config.BATCH_GCS_PREFIX,
+        poll_interval=config.BATCH_POLL_SECONDS,
+    )
+
+def configure_telemetry():
+    """
+    Activa la telemetría de la ejecución según `TELEMETRY_*` (JSONL y/o OpenTelemetry).
+    """
+    telemetry.configure(
+        enabled=config.TELEMETRY_ENABLED,
+        jsonl_path=config.TELEMETRY_JSONL_PATH or None,
+        otel=config.TELEMETRY_OTEL_ENABLED,
+    )
 
 def main():
+    configure_telemetry()
+    try:
+        with telemetry.span("dq.run", dataset=target_dataset()):
+            run_agent()
+    finally:
+        if telemetry.get_telemetry().finished:
+            print("\n" + telemetry.get_telemetry().summary_table())
+        if rate_limit.summary():
+            print(rate_limit.summary())
+
+def open_run_ledger() -> Optional[RunLedger]:
+    if not config.RUN_LEDGER_ENABLED:
+        return None
+    return RunLedger(config.RUN_LEDGER_PATH, max_age_seconds=config.RUN_LEDGER_MAX_AGE_HOURS * 3600)
+
+def open_dataset_run(ledger: Optional[RunLedger], project_id: str, dataset_id: str) -> Optional[LedgerRun]:
+    """
+    Ejecución del registro (`RUN_LEDGER_ENABLED`) para un dataset: reanuda la anterior si
+    quedó sin terminar con el mismo modelo, o empieza una nueva.
+    """
+    if ledger is None:
+        return None
+    run = ledger.open_run(f"dq:{qualify_dataset(project_id, dataset_id)}", fingerprint=_rules_salt(), resume=config.RUN_LEDGER_RESUME)
+    if run.resumed:
+        print(f"⏯️ Reanudando la ejecución {run.run_id} de {dataset_id}: {run.recorded} elementos ya completados.")
+    return run
+
+def open_proposal_store() -> Optional[ProposalStore]:
+    """
+    Histórico columnar de propuestas (`PROPOSAL_STORE_ENABLED`). None si está desactivado
+    o falta pyarrow: las propuestas se siguen guardando en JSON.
+    """
+    if not config.PROPOSAL_STORE_ENABLED:
+        return None
+    try:
+        return ProposalStore(config.PROPOSAL_STORE_DIR)
+    except ImportError as e:
+        print(f"⚠️ {e}. Las propuestas solo se guardan en JSON.")
+        return None
+
+def store_proposal(store: Optional[ProposalStore], project_id: str, dataset_id: str, dq_json: str, source: Optional[str] = None) -> Optional[ProposalDiff]:
+    """
+    Añade la propuesta al histórico y devuelve sus diferencias con la anterior del dataset.
+    """
+    if store is None:
+        return None
+    dataset_ref = qualify_dataset(project_id, dataset_id)
+    try:
+        previous = store.latest(RULES, dataset_ref)
+        record = store.append_rules(dataset_ref, dq_json, source=source)
+        if previous and previous.proposal_id == record.proposal_id:
+            return ProposalDiff(previous.proposal_id, record.proposal_id)
+        return store.diff(previous.proposal_id if previous else None, record.proposal_id)
+    except Exception as e:
+        # El JSON local es lo que se publica: un fallo del histórico no detiene la ejecución
+        print(f"⚠️ No se pudo guardar la propuesta de {dataset_ref} en el histórico: {e}")
+        return None
+
+def run_agent():
     print("🚀 Lanzando Agente de Calidad de Datos (Vertex AI + BigQuery Metadata)")
 
-    # Inicialización
-    vertexai.init(project=PROJECT_ID, location=LOCATION)
+    # Inicialización (los SDK se importan aquí, no al cargar el módulo)
+    import vertexai
+    from core.github_client import GitHubClient
+
+    project_id, location, dataset_id = config.PROJECT_ID, config.LOCATION, target_dataset()
+    vertexai.init(project=project_id, location=location)
     github_client = GitHubClient()
 
-    # PASO 1: Búsqueda de contexto en BigQuery
-    print(f"🔍 Recuperando metadatos de BigQuery para dataset '{TARGET_DATASET}'...")
-    contexto_metadatos = get_context_from_bigquery(PROJECT_ID, LOCATION, TARGET_DATASET)
+    ledger = open_run_ledger()
+    run = open_dataset_run(ledger, project_id, dataset_id)
+    try:
+        _run_agent(github_client, run, project_id, location, dataset_id)
+    finally:
+        if ledger:
+            ledger.close()
 
-    if not contexto_metadatos:
-        print("❌ No se pudo recuperar ningún contexto de metadatos de BigQuery.")
+def _run_agent(github_client: "GitHubClient", run: Optional[LedgerRun], project_id: str, location: str, dataset_id: str):
+    # Una ejecución interrumpida tras guardar la propuesta solo reintenta la PR
+    proposal = run.get("proposal") if run else None
+    if proposal and proposal.state == VALIDATED:
+        local_filename, dq_json = proposal.payload["file"], proposal.payload["proposal"]
+        print(f"⏯️ Propuesta ya generada en la ejecución anterior ({local_filename}): solo falta la PR.")
+        _publish_proposal(github_client, run, local_filename, dq_json)
         return
 
-    print(f"✅ Contexto recuperado.")
+    cache = None
+    if config.CACHE_ENABLED:
+        cache = MetadataCache(
+            os.path.join(config.CACHE_DIR, "metadata_cache.sqlite3"),
+            ttl_seconds=config.CACHE_TTL_SECONDS,
+            max_entries=config.CACHE_MAX_ENTRIES,
+        )
+    response_cache = None
+    if config.RESPONSE_CACHE_ENABLED:
+        response_cache = get_shared_cache(
+            config.RESPONSE_CACHE_DIR,
+            memory_entries=config.RESPONSE_CACHE_MEMORY_ENTRIES,
+            max_disk_bytes=config.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+        )
+    dq_gen = DataQualityGenerator(model_name=config.MODEL_NAME, max_retries=config.GEMINI_MAX_RETRIES, response_cache=response_cache)
 
-    # PASO 2: Generar Reglas de Calidad (JSON)
-    dq_gen = DataQualityGenerator(model_name=config.MODEL_NAME)
-    dq_json = dq_gen.suggest_quality_rules(contexto_metadatos)
-    
-    if dq_json:
-        print("\nSugerencia generada (Reglas DQ):")
-        print(dq_json)
+    output_dir = "output"
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = int(time.time())
+    local_filename = f"{output_dir}/dq_rules_proposal_{timestamp}.json"
 
-        output_dir = "output"
-        os.makedirs(output_dir, exist_ok=True)
-        timestamp = int(time.time())
-        local_filename = f"{output_dir}/dq_rules_proposal_{timestamp}.json"
-        
-        with open(local_filename, "w", encoding="utf-8") as f:
-            f.write(dq_json)
-        
-        print(f"\n✅ Propuesta guardada localmente en: {local_filename}")
+    if config.PIPELINE_MODE == "streaming":
+        # PASOS 1 y 2 solapados: extracción, generación y validación por tablas
+        from google.cloud import bigquery
 
-        # --- STEP 3: GITHUB PR ---
+        rule_index = load_rule_index(github_client)
+        client = bigquery.Client(project=project_id, location=location)
         try:
-            # Creando PR con la propuesta de reglas de calidad
-            pr_url = github_client.create_proposal_pr(dq_json, "data_quality_rules")
-            print(f"\n✅ Proceso completado. PR: {pr_url}")
+            written = stream_quality_rules(dq_gen, client, project_id, dataset_id, local_filename, cache=cache, rule_index=rule_index, ledger=run)
         except Exception as e:
-            print(f"❌ Error GitHub: {e}")
+            print(f"❌ Error en el pipeline de {dataset_id}: {e}")
+            written = 0
+        dq_json = None
+        if written:
+            with open(local_filename, "r", encoding="utf-8") as f:
+                dq_json = f.read()
+    else:
+        # PASO 1: Búsqueda de contexto en BigQuery
+        print(f"🔍 Recuperando metadatos de BigQuery para dataset '{dataset_id}'...")
+        tablas = get_tables_from_bigquery(project_id, location, dataset_id, cache=cache, ledger=run)
+
+        if not tablas:
+            print("❌ No se pudo recuperar ningún contexto de metadatos de BigQuery.")
+            if cache:
+                cache.close()
+            if run:
+                run.finish()
+            return
+
+        print(f"✅ Contexto recuperado.")
+
+        # PASO 2: Generar Reglas de Calidad (JSON)
+        rule_index = load_rule_index(github_client)
+        if config.GENERATION_MODE == "batch":
+            dq_json = generate_quality_rules_batch(dq_gen, build_batch_executor(dq_gen), project_id, {dataset_id: tablas}, cache=cache, rule_index=rule_index)[dataset_id]
+        else:
+            dq_json = generate_quality_rules(dq_gen, project_id, dataset_id, tablas, cache=cache, rule_index=rule_index, ledger=run)
+        if dq_json:
+            print("\nSugerencia generada (Reglas DQ):")
+            print(dq_json)
+            with open(local_filename, "w", encoding="utf-8") as f:
+                f.write(dq_json)
+
+    if cache:
+        cache.close()
+    if rule_index is not None:
+        print(f"♻️ Índice de reglas: {rule_index.summary()}")
+    if response_cache:
+        print(f"💾 Caché de respuestas Gemini: {response_cache.hits} aciertos / {response_cache.misses} fallos")
+    
+    if dq_json:
+        print(f"\n✅ Propuesta guardada localmente en: {local_filename}")
+        store = open_proposal_store()
+        if store:
+            diff = store_proposal(store, project_id, dataset_id, dq_json, source=local_filename)
+            store.close()
+            if diff:
+                print(f"🗂️ Histórico de propuestas: {diff.new_id} ({diff.summary()} reglas respecto a la anterior)")
+        if run:
+            run.record("proposal", VALIDATED, content_hash(dq_json), {"file": local_filename, "proposal": dq_json})
+        _publish_proposal(github_client, run, local_filename, dq_json)
+
+def _publish_proposal(github_client: "GitHubClient", run: Optional[LedgerRun], local_filename: str, dq_json: str):
+    # --- STEP 3: GITHUB PR ---
+    try:
+        # Creando PR con la propuesta de reglas de calidad
+        pr_url = github_client.create_proposal_pr(dq_json, "data_quality_rules")
+        print(f"\n✅ Proceso completado. PR: {pr_url}")
+    except Exception as e:
+        print(f"❌ Error GitHub: {e}")
+        if run:
+            print(f"⏯️ La próxima ejecución reintentará solo la PR de {local_filename}.")
+        return
+    if run:
+        run.record("proposal", PUBLISHED, content_hash(dq_json), pr_url)
+        run.finish()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,40 +1,276 @@
-from google.cloud import bigquery
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+import atexit
 import json
+import queue
+import threading
+import time
+import uuid
+
+from core import telemetry
+from core.retry import is_transient_error, retry_call
+
+# Tables already checked/created in this process: loggers built later skip the get_table round trip
+_ensured_tables = set()
+_ensured_tables_lock = threading.Lock()
+
+# insert_rows_json accepts up to 10k rows per request; smaller requests keep payloads well under 10 MB
+MAX_ROWS_PER_REQUEST = 500
+
+
+class _InsertAllSink:
+    """
+    Streaming inserts (`tabledata.insertAll`). Row ids let BigQuery drop duplicates
+    when a retried request had in fact been applied.
+    """
+
+    def __init__(self, client, table_ref: str):
+        self.client = client
+        self.table_ref = table_ref
+
+    def write(self, rows: List[dict], row_ids: List[str]) -> Dict[int, Tuple[bool, str]]:
+        """
+        Returns `{row index: (retryable, message)}` for the rejected rows. Rows that were
+        only `stopped` because another row of the request was invalid are retryable.
+        """
+        errors = self.client.insert_rows_json(self.table_ref, rows, row_ids=row_ids)
+        rejected = {}
+        for i, error in enumerate(errors or []):
+            reasons = {e.get("reason") for e in error.get("errors", [])}
+            rejected[error.get("index", i)] = (reasons <= {"stopped", "backendError", "timeout"}, str(error.get("errors", error)))
+        return rejected
+
+
+class _StorageWriteSink:
+    """
+    BigQuery Storage Write API (default stream, at-least-once): one AppendRows call per
+    batch, cheaper and with higher throughput than streaming inserts.
+    """
+
+    _FIELDS = [("timestamp", "TYPE_INT64"), ("actor", "TYPE_STRING"), ("status", "TYPE_STRING"),
+               ("glossary_id", "TYPE_STRING"), ("details", "TYPE_STRING")]
+
+    def __init__(self, project_id: str, dataset_id: str, table_id: str):
+        from google.cloud import bigquery_storage_v1
+        from google.cloud.bigquery_storage_v1 import types
+        from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+        self.types = types
+        self.client = bigquery_storage_v1.BigQueryWriteClient()
+        self.stream = f"{self.client.table_path(project_id, dataset_id, table_id)}/streams/_default"
+
+        file_proto = descriptor_pb2.FileDescriptorProto(name="audit_row.proto", package="audit", syntax="proto2")
+        message = file_proto.message_type.add(name="AuditRow")
+        for number, (name, field_type) in enumerate(self._FIELDS, start=1):
+            message.field.add(
+                name=name,
+                number=number,
+                type=getattr(descriptor_pb2.FieldDescriptorProto, field_type),
+                label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+            )
+        self.descriptor = descriptor_pb2.DescriptorProto()
+        self.descriptor.CopyFrom(message)
+        pool = descriptor_pool.DescriptorPool()
+        pool.Add(file_proto)
+        self.row_class = message_factory.GetMessageClass(pool.FindMessageTypeByName("audit.AuditRow"))
+
+    def _serialize(self, row: dict) -> bytes:
+        message = self.row_class()
+        # TIMESTAMP columns take microseconds since epoch; naive values are UTC, as insertAll reads them
+        timestamp = datetime.fromisoformat(row["timestamp"])
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        message.timestamp = int(timestamp.timestamp() * 1_000_000)
+        for name in ("actor", "status", "glossary_id", "details"):
+            if row.get(name) is not None:
+                setattr(message, name, row[name])
+        return message.SerializeToString()
+
+    def write(self, rows: List[dict], row_ids: List[str]) -> Dict[int, Tuple[bool, str]]:
+        types = self.types
+        request = types.AppendRowsRequest(
+            write_stream=self.stream,
+            proto_rows=types.AppendRowsRequest.ProtoData(
+                writer_schema=types.ProtoSchema(proto_descriptor=self.descriptor),
+                rows=types.ProtoRows(serialized_rows=[self._serialize(r) for r in rows]),
+            ),
+        )
+        metadata = (("x-goog-request-params", f"write_stream={self.stream}"),)
+        for response in self.client.append_rows(iter([request]), metadata=metadata):
+            # Row errors reject the whole append: the rows not listed can be retried as is
+            if response.row_errors:
+                invalid = {e.index: (False, e.message) for e in response.row_errors}
+                return {i: invalid.get(i, (True, "request rejected")) for i in range(len(rows))}
+            if response.error and response.error.code:
+                return {i: (True, response.error.message) for i in range(len(rows))}
+        return {}
+
 
 class AuditLogger:
-    def __init__(self, project_id: str, dataset_id: str, table_id: str = "glossary_audit_log"):
+    """
+    Buffered audit log in BigQuery. `log_event` only enqueues the row; a background
+    thread writes batches when `flush_max_rows` rows are pending or every
+    `flush_interval_seconds`, retrying rejected rows and transient errors. Pending rows
+    are flushed on `close()`, when used as a context manager, and at interpreter exit.
+
+    With `buffered=False` every event is written synchronously (previous behaviour).
+    """
+
+    def __init__(self, project_id: str, dataset_id: str, table_id: str = "glossary_audit_log",
+                 buffered: bool = True, flush_max_rows: int = 500, flush_interval_seconds: float = 5.0,
+                 max_retries: int = 5, use_storage_write_api: bool = False):
+        from google.cloud import bigquery
+
         self.client = bigquery.Client(project=project_id)
         self.table_ref = f"{project_id}.{dataset_id}.{table_id}"
+        self.buffered = buffered
+        self.flush_max_rows = flush_max_rows
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.failed_rows: List[dict] = []
         self._ensure_table_exists()
 
+        self.sink = _InsertAllSink(self.client, self.table_ref)
+        if use_storage_write_api:
+            try:
+                self.sink = _StorageWriteSink(project_id, dataset_id, table_id)
+            except ImportError:
+                print("⚠️ google-cloud-bigquery-storage not installed; using streaming inserts for the audit log.")
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+        if buffered:
+            self._thread = threading.Thread(target=self._run, name="audit-logger-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
     def _ensure_table_exists(self):
-        schema = [
-            bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
-            bigquery.SchemaField("actor", "STRING", mode="NULLABLE"),
-            bigquery.SchemaField("status", "STRING", mode="REQUIRED"),
-            bigquery.SchemaField("glossary_id", "STRING", mode="NULLABLE"),
-            bigquery.SchemaField("details", "STRING", mode="NULLABLE"), # JSON string
-        ]
-        try:
-            self.client.get_table(self.table_ref)
-        except Exception:
-            print(f"Creating audit table {self.table_ref}...")
-            table = bigquery.Table(self.table_ref, schema=schema)
-            self.client.create_table(table)
+        from google.cloud import bigquery
+
+        with _ensured_tables_lock:
+            if self.table_ref in _ensured_tables:
+                return
+            schema = [
+                bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
+                bigquery.SchemaField("actor", "STRING", mode="NULLABLE"),
+                bigquery.SchemaField("status", "STRING", mode="REQUIRED"),
+                bigquery.SchemaField("glossary_id", "STRING", mode="NULLABLE"),
+                bigquery.SchemaField("details", "STRING", mode="NULLABLE"), # JSON string
+            ]
+            try:
+                self.client.get_table(self.table_ref)
+            except Exception:
+                print(f"Creating audit table {self.table_ref}...")
+                table = bigquery.Table(self.table_ref, schema=schema)
+                self.client.create_table(table, exists_ok=True)
+            _ensured_tables.add(self.table_ref)
 
     def log_event(self, status: str, actor: str = "system", glossary_id: str = None, details: dict = None):
-        rows_to_insert = [
-            {
-                "timestamp": datetime.now().isoformat(),
-                "actor": actor,
-                "status": status,
-                "glossary_id": glossary_id,
-                "details": json.dumps(details) if details else None
-            }
-        ]
-        errors = self.client.insert_rows_json(self.table_ref, rows_to_insert)
-        if errors:
-            print(f"❌ Error logging to BigQuery: {errors}")
-        else:
-            print(f"✅ Event logged to BigQuery: {status}")
+        row = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "actor": actor,
+            "status": status,
+            "glossary_id": glossary_id,
+            "details": json.dumps(details) if details else None
+        }
+        if self._closed:
+            raise RuntimeError("AuditLogger is closed")
+        self._queue.put((row, uuid.uuid4().hex))
+        if not self.buffered:
+            self.flush()
+        elif self._queue.qsize() >= self.flush_max_rows:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Error flushing audit log: {e}")
+
+    def _drain(self) -> List[tuple]:
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _write_batch(self, batch: List[tuple]) -> List[tuple]:
+        """
+        Writes one batch, retrying only the rejected rows. Returns the rows that still failed.
+
+        Transient request errors and retryable row rejections share the same
+        `max_retries` attempts, so a flush (which holds `_flush_lock`) is bounded.
+        """
+        pending, rejected = batch, []
+        for attempt in range(1, self.max_retries + 1):
+            rows, row_ids = [r for r, _ in pending], [i for _, i in pending]
+            try:
+                # A single attempt through the shared BigQuery guard: this loop does the retrying
+                errors = retry_call(
+                    lambda: self.sink.write(rows, row_ids),
+                    max_attempts=1,
+                    description="audit log insert",
+                    api="bigquery",
+                )
+            except Exception as e:
+                if not is_transient_error(e) or attempt == self.max_retries:
+                    print(f"❌ Error logging to BigQuery: {e}")
+                    return rejected + pending
+                errors = None
+            if errors is not None:
+                for i, (retryable, message) in sorted(errors.items()):
+                    if not retryable:
+                        print(f"❌ Error logging to BigQuery: row rejected ({pending[i][0]['status']}): {message}")
+                        rejected.append(pending[i])
+                pending = [pending[i] for i, (retryable, _) in sorted(errors.items()) if retryable]
+                if not pending:
+                    return rejected
+            if attempt < self.max_retries:
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 10))
+        print(f"❌ Error logging to BigQuery: {len(pending)} rows still rejected after {self.max_retries} attempts")
+        return rejected + pending
+
+    def flush(self):
+        """
+        Writes every pending event now (batches of `MAX_ROWS_PER_REQUEST`).
+        """
+        with self._flush_lock:
+            items = self._drain()
+            if not items:
+                return
+            with telemetry.span("audit.flush", rows=len(items)):
+                self._flush_items(items)
+
+    def _flush_items(self, items: List[tuple]):
+        failed = []
+        for start in range(0, len(items), MAX_ROWS_PER_REQUEST):
+            failed.extend(self._write_batch(items[start:start + MAX_ROWS_PER_REQUEST]))
+        self.failed_rows.extend(row for row, _ in failed)
+        failed_ids = {row_id for _, row_id in failed}
+        written = [row for row, row_id in items if row_id not in failed_ids]
+        if written:
+            statuses = sorted({row["status"] for row in written})
+            print(f"✅ {len(written)} event(s) logged to BigQuery: {', '.join(statuses)}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread:
+            self._wakeup.set()
+            self._thread.join(timeout=self.flush_interval_seconds + 5)
+            atexit.unregister(self.close)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
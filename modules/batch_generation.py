@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.retry import retry_call
+
+# File names shared by the Vertex and local executors, so a job directory produced
+# by one can be read back by the other (e.g. replaying downloaded Vertex output).
+REQUESTS_FILE = "requests.jsonl"
+PREDICTIONS_FILE = "predictions.jsonl"
+
+
+@dataclass
+class BatchRequest:
+    """
+    One prompt of a batch job. `key` identifies the unit of work (e.g. `dataset:shard`)
+    so results can be mapped back to datasets and tables.
+    """
+    key: str
+    prompt: str
+
+
+@dataclass
+class BatchResult:
+    key: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _prompt_digest(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def request_line(request: BatchRequest, generation_config: Optional[dict] = None) -> dict:
+    """
+    Vertex AI Gemini batch input line. The key travels as a top-level field and as a
+    request label; Vertex echoes the request in the output, so either can be used to
+    map the prediction back.
+    """
+    body = {
+        "contents": [{"role": "user", "parts": [{"text": request.prompt}]}],
+        "labels": {"batch_key": request.key},
+    }
+    if generation_config:
+        body["generationConfig"] = generation_config
+    return {"key": request.key, "request": body}
+
+
+def write_request_file(requests: List[BatchRequest], path: str, generation_config: Optional[dict] = None) -> str:
+    """
+    Writes the batch input JSONL file. Keys must be unique.
+    """
+    keys = [r.key for r in requests]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Batch request keys must be unique")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request_line(request, generation_config), ensure_ascii=False) + "\n")
+    return path
+
+
+def read_request_file(path: str) -> List[BatchRequest]:
+    requests = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                text = "".join(p.get("text", "") for c in data["request"]["contents"] for p in c.get("parts", []))
+                requests.append(BatchRequest(key=data["key"], prompt=text))
+    return requests
+
+
+def _prediction_text(response: dict) -> Optional[str]:
+    candidates = response.get("candidates") or []
+    if not candidates:
+        return None
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(p.get("text", "") for p in parts) or None
+
+
+def parse_prediction_lines(lines: Iterable[str], requests: List[BatchRequest]) -> Dict[str, BatchResult]:
+    """
+    Maps Vertex prediction lines back to request keys: by `key`, then by the
+    `batch_key` label of the echoed request, then by prompt digest. Requests without
+    a prediction line come back as failed results.
+    """
+    by_digest = {_prompt_digest(r.prompt): r.key for r in requests}
+    results: Dict[str, BatchResult] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        request = data.get("request", {})
+        key = data.get("key") or request.get("labels", {}).get("batch_key")
+        if not key:
+            prompt = "".join(p.get("text", "") for c in request.get("contents", []) for p in c.get("parts", []))
+            key = by_digest.get(_prompt_digest(prompt))
+        if not key:
+            continue
+        text = _prediction_text(data.get("response") or {})
+        error = data.get("status") or None
+        if text is None and not error:
+            error = "Empty prediction"
+        results[key] = BatchResult(key=key, text=text, error=error if text is None else None)
+
+    for request in requests:
+        results.setdefault(request.key, BatchResult(key=request.key, error="Missing prediction"))
+    return results
+
+
+class BatchExecutor:
+    """
+    Runs a list of prompts as a single batch job. `submit` returns a job handle and
+    `wait` blocks until the job ends and returns one result per request key.
+    """
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        raise NotImplementedError
+
+    def wait(self, job: str) -> Dict[str, BatchResult]:
+        raise NotImplementedError
+
+    def run(self, requests: List[BatchRequest]) -> Dict[str, BatchResult]:
+        if not requests:
+            return {}
+        return self.wait(self.submit(requests))
+
+
+class VertexBatchExecutor(BatchExecutor):
+    """
+    Vertex AI batch prediction: the request file is uploaded to GCS, one batch job is
+    submitted and polled, and the prediction files under its output prefix are read back.
+    """
+
+    def __init__(self, project_id: str, location: str, model_name: str, bucket: str, prefix: str = "batch/dq",
+                 poll_interval: float = 30.0, timeout_seconds: float = 24 * 3600, generation_config: Optional[dict] = None):
+        from google.cloud import storage
+
+        self.project_id = project_id
+        self.location = location
+        self.model_name = model_name
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.poll_interval = poll_interval
+        self.timeout_seconds = timeout_seconds
+        self.generation_config = generation_config
+        self._storage = storage.Client(project=project_id)
+        self._jobs: Dict[str, tuple] = {}
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        from vertexai.batch_prediction import BatchPredictionJob
+
+        run_id = time.strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex[:6]
+        local_path = os.path.join("output", "batch", run_id, REQUESTS_FILE)
+        write_request_file(requests, local_path, self.generation_config)
+
+        blob_name = f"{self.prefix}/{run_id}/{REQUESTS_FILE}"
+        blob = self._storage.bucket(self.bucket).blob(blob_name)
+        retry_call(lambda: blob.upload_from_filename(local_path), api="storage", description=f"upload {blob_name}")
+        input_uri = f"gs://{self.bucket}/{blob_name}"
+
+        job = retry_call(
+            lambda: BatchPredictionJob.submit(
+                source_model=self.model_name,
+                input_dataset=input_uri,
+                output_uri_prefix=f"gs://{self.bucket}/{self.prefix}/{run_id}/output",
+            ),
+            api="vertex",
+            description="BatchPredictionJob.submit",
+        )
+        print(f"📤 Job batch enviado ({len(requests)} peticiones): {job.resource_name}")
+        self._jobs[job.resource_name] = (job, requests)
+        return job.resource_name
+
+    def wait(self, job: str) -> Dict[str, BatchResult]:
+        batch_job, requests = self._jobs.pop(job)
+        started = time.monotonic()
+        while not batch_job.has_ended:
+            if time.monotonic() - started > self.timeout_seconds:
+                raise TimeoutError(f"Batch job {job} did not finish in {self.timeout_seconds:.0f}s")
+            time.sleep(self.poll_interval)
+            retry_call(batch_job.refresh, api="vertex", description=f"refresh {job}")
+
+        if not batch_job.has_succeeded:
+            raise RuntimeError(f"Batch job {job} failed: {batch_job.error}")
+
+        bucket_name, _, prefix = batch_job.output_location[len("gs://"):].partition("/")
+        lines: List[str] = []
+        for blob in self._storage.list_blobs(bucket_name, prefix=prefix):
+            if blob.name.endswith(".jsonl"):
+                lines.extend(blob.download_as_text().splitlines())
+        return parse_prediction_lines(lines, requests)
+
+
+class LocalBatchExecutor(BatchExecutor):
+    """
+    File-based stand-in with the same interface, for offline runs and tests. Each job
+    is a directory under `work_dir` holding the request file and a predictions file in
+    Vertex output format.
+
+    If a job directory already contains `predictions.jsonl` (e.g. output downloaded from
+    a Vertex job) it is read as is; otherwise `responder` is called once per prompt.
+    """
+
+    def __init__(self, work_dir: str = "output/batch", responder: Optional[Callable[[str], str]] = None):
+        self.work_dir = work_dir
+        self.responder = responder
+
+    def job_dir(self, job: str) -> str:
+        return os.path.join(self.work_dir, job)
+
+    def submit(self, requests: List[BatchRequest]) -> str:
+        # Deterministic job id: the same set of prompts reuses the same job directory
+        digest = hashlib.sha256("\n".join(f"{r.key}\t{_prompt_digest(r.prompt)}" for r in requests).encode("utf-8"))
+        job = f"local_{digest.hexdigest()[:16]}"
+        write_request_file(requests, os.path.join(self.job_dir(job), REQUESTS_FILE))
+        print(f"📤 Job batch local preparado ({len(requests)} peticiones): {self.job_dir(job)}")
+        return job
+
+    def wait(self, job: str) -> Dict[str, BatchResult]:
+        requests = read_request_file(os.path.join(self.job_dir(job), REQUESTS_FILE))
+        predictions_path = os.path.join(self.job_dir(job), PREDICTIONS_FILE)
+        if not os.path.exists(predictions_path):
+            if self.responder is None:
+                raise FileNotFoundError(f"No predictions for job {job} and no responder configured: {predictions_path}")
+            self._predict(requests, predictions_path)
+        with open(predictions_path, "r", encoding="utf-8") as f:
+            return parse_prediction_lines(f, requests)
+
+    def _predict(self, requests: List[BatchRequest], path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for request in requests:
+                line = request_line(request)
+                try:
+                    text = self.responder(request.prompt)
+                    line["response"] = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+                    line["status"] = ""
+                except Exception as e:
+                    line["status"] = str(e)
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
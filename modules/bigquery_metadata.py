@@ -0,0 +1,367 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from core.retry import retry_call
+from core.telemetry import TracedThreadPoolExecutor
+
+# INFORMATION_SCHEMA reports Standard SQL type names, while `SchemaField.field_type`
+# uses the legacy ones. Both harvesting paths must render the same context.
+_LEGACY_TYPE_NAMES = {
+    "INT64": "INTEGER",
+    "FLOAT64": "FLOAT",
+    "BOOL": "BOOLEAN",
+    "STRUCT": "RECORD",
+}
+
+
+@dataclass
+class ColumnMetadata:
+    name: str
+    field_type: str
+    description: Optional[str] = None
+    mode: str = "NULLABLE"
+    fields: List["ColumnMetadata"] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnMetadata":
+        data = dict(data)
+        data["fields"] = [cls.from_dict(f) for f in data.get("fields", [])]
+        return cls(**data)
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Sampled statistics of one column (see `modules.data_profiler`).
+    """
+    name: str
+    null_ratio: Optional[float] = None
+    approx_distinct: Optional[int] = None
+    min_value: Optional[str] = None
+    max_value: Optional[str] = None
+    min_length: Optional[int] = None
+    max_length: Optional[int] = None
+    top_values: List[list] = field(default_factory=list)  # [value, count], most frequent first
+    patterns: List[list] = field(default_factory=list)  # [shape, count], e.g. "Aa-9999"
+
+
+@dataclass
+class TableProfile:
+    rows: int
+    sample_percent: float = 100.0
+    columns: List[ColumnProfile] = field(default_factory=list)
+
+    def column(self, name: str) -> Optional[ColumnProfile]:
+        return next((c for c in self.columns if c.name == name), None)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableProfile":
+        data = dict(data)
+        data["columns"] = [ColumnProfile(**c) for c in data.get("columns", [])]
+        return cls(**data)
+
+
+@dataclass
+class TableMetadata:
+    table_id: str
+    description: Optional[str] = None
+    columns: List[ColumnMetadata] = field(default_factory=list)
+    last_modified: Optional[int] = None  # Epoch millis, when known
+    profile: Optional[TableProfile] = None  # Data profile, filled after harvesting when enabled
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TableMetadata":
+        data = dict(data)
+        data["columns"] = [ColumnMetadata.from_dict(c) for c in data.get("columns", [])]
+        if data.get("profile"):
+            data["profile"] = TableProfile.from_dict(data["profile"])
+        return cls(**data)
+
+
+def _short(value, limit: int = 32) -> str:
+    text = str(value)
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def render_column_profile(profile: ColumnProfile, rows: int) -> str:
+    """
+    One-line summary of a column profile (null ratio, cardinality, range, lengths,
+    frequent values and shapes), compact enough to go next to each column in the prompt.
+    """
+    parts = []
+    if profile.null_ratio is not None:
+        parts.append(f"nulls {profile.null_ratio:.1%}")
+    if profile.approx_distinct is not None:
+        non_null = rows * (1 - (profile.null_ratio or 0))
+        # HLL estimates carry ~1% error: close to the non-null rows means unique
+        unique = non_null > 0 and profile.approx_distinct >= 0.99 * non_null
+        parts.append(f"~{profile.approx_distinct} distinct" + (" (unique)" if unique else ""))
+    if profile.min_value is not None or profile.max_value is not None:
+        parts.append(f"range {_short(profile.min_value)}..{_short(profile.max_value)}")
+    if profile.min_length is not None:
+        parts.append(f"length {profile.min_length}-{profile.max_length}")
+    # Frequent values only say something for low-cardinality columns
+    if profile.top_values and profile.approx_distinct is not None and profile.approx_distinct <= 2 * len(profile.top_values):
+        parts.append("values " + ", ".join(f"{_short(v)!r}" for v, _ in profile.top_values))
+    if profile.patterns and rows:
+        parts.append("shapes " + ", ".join(f"{_short(p)!r} {c / rows:.0%}" for p, c in profile.patterns))
+    return "; ".join(parts)
+
+
+def render_table_context(table: TableMetadata) -> str:
+    """
+    Renders the technical context of a single table (the format sent to Gemini).
+    """
+    lines = [f"  Table: {table.table_id}"]
+    if table.description:
+        lines.append(f"    Description: {table.description}")
+
+    if table.profile:
+        sampled = f", {table.profile.sample_percent:g}% sample" if table.profile.sample_percent < 100 else ""
+        lines.append(f"    Profile: {table.profile.rows} rows{sampled}")
+
+    lines.append("    Columns:")
+    for column in table.columns:
+        desc_str = f" - Description: {column.description}" if column.description else ""
+        column_profile = table.profile.column(column.name) if table.profile else None
+        profile_str = f" - Profile: {render_column_profile(column_profile, table.profile.rows)}" if column_profile else ""
+        lines.append(f"      - {column.name} ({column.field_type}){desc_str}{profile_str}")
+
+    return "\n".join(lines)
+
+
+def render_dataset_context(dataset_id: str, tables: List[TableMetadata]) -> str:
+    """
+    Renders the technical context of a dataset, keeping the given table order.
+    """
+    if not tables:
+        return ""
+    return "\n".join([f"Dataset: {dataset_id}"] + [render_table_context(t) for t in tables])
+
+
+def qualify_dataset(project_id: str, dataset_id: str) -> str:
+    """
+    Returns `project.dataset` for a dataset id that may already be qualified.
+    """
+    return dataset_id if "." in dataset_id else f"{project_id}.{dataset_id}"
+
+
+def _column_from_schema_field(schema_field) -> ColumnMetadata:
+    return ColumnMetadata(
+        name=schema_field.name,
+        field_type=schema_field.field_type,
+        description=schema_field.description,
+        mode=schema_field.mode or "NULLABLE",
+        fields=[_column_from_schema_field(f) for f in (schema_field.fields or [])],
+    )
+
+
+def table_metadata_from_bigquery(table) -> TableMetadata:
+    """
+    Builds a `TableMetadata` from a `bigquery.Table` returned by `get_table`.
+    """
+    last_modified = int(table.modified.timestamp() * 1000) if table.modified else None
+    return TableMetadata(
+        table_id=table.table_id,
+        description=table.description,
+        columns=[_column_from_schema_field(f) for f in table.schema],
+        last_modified=last_modified,
+    )
+
+
+def _parse_information_schema_type(data_type: str):
+    """
+    Translates an INFORMATION_SCHEMA `data_type` (e.g. `ARRAY<STRING(10)>`) into
+    the `(field_type, mode)` pair exposed by `SchemaField`.
+    """
+    mode = "NULLABLE"
+    if data_type.startswith("ARRAY<") and data_type.endswith(">"):
+        data_type = data_type[len("ARRAY<"):-1]
+        mode = "REPEATED"
+    match = re.match(r"[A-Z0-9_]+", data_type)
+    base_type = match.group(0) if match else data_type
+    return _LEGACY_TYPE_NAMES.get(base_type, base_type), mode
+
+
+def _parse_option_value(option_value: Optional[str]) -> Optional[str]:
+    """
+    TABLE_OPTIONS stores values as SQL literals (`"text"`); returns the plain string.
+    """
+    if not option_value:
+        return None
+    try:
+        value = json.loads(option_value)
+        return value if isinstance(value, str) else option_value
+    except ValueError:
+        return option_value.strip('"')
+
+
+class BigQueryMetadataHarvester:
+    """
+    Harvests table metadata of a BigQuery dataset.
+
+    Uses a single INFORMATION_SCHEMA query as a bulk fast path and falls back to
+    concurrent `get_table` calls (bounded thread pool with retry/backoff) for the
+    tables the query could not resolve or when the query is not permitted.
+    """
+
+    def __init__(self, client: "bigquery.Client", max_workers: int = 8, max_retries: int = 5, use_bulk_query: bool = True):
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.use_bulk_query = use_bulk_query
+
+    def qualified_dataset(self, dataset_id: str) -> str:
+        return qualify_dataset(self.client.project, dataset_id)
+
+    def list_tables(self, dataset_id: str) -> List[str]:
+        """
+        Returns the table ids of the dataset in listing order.
+        """
+        tables = retry_call(
+            lambda: list(self.client.list_tables(dataset_id)),
+            max_attempts=self.max_retries,
+            description=f"list_tables({dataset_id})",
+            api="bigquery",
+        )
+        return [t.table_id for t in tables]
+
+    def get_last_modified(self, dataset_id: str) -> Dict[str, int]:
+        """
+        Returns `{table_id: last_modified_time}` (epoch millis) for the whole dataset
+        with a single `__TABLES__` query, or an empty dict if it is not permitted.
+        """
+        sql = f"SELECT table_id, last_modified_time FROM `{self.qualified_dataset(dataset_id)}.__TABLES__`"
+        try:
+            rows = retry_call(
+                lambda: list(self.client.query(sql).result()),
+                max_attempts=self.max_retries,
+                description=f"__TABLES__({dataset_id})",
+                api="bigquery",
+            )
+        except Exception as e:
+            print(f"⚠️ No se pudo consultar __TABLES__ de {dataset_id}: {e}")
+            return {}
+        return {row["table_id"]: int(row["last_modified_time"]) for row in rows}
+
+    def harvest(self, dataset_id: str, table_ids: Optional[List[str]] = None) -> List[TableMetadata]:
+        """
+        Retrieves the metadata of the given tables (all tables of the dataset by default).
+
+        Args:
+            dataset_id (str): Dataset id, optionally qualified as `project.dataset`.
+            table_ids (Optional[List[str]]): Tables to harvest. Listed from the dataset if omitted.
+
+        Returns:
+            List[TableMetadata]: Metadata in the order of `table_ids`. Tables that could
+            not be retrieved are skipped.
+        """
+        if table_ids is None:
+            table_ids = self.list_tables(dataset_id)
+        if not table_ids:
+            return []
+
+        harvested: Dict[str, TableMetadata] = {}
+        if self.use_bulk_query:
+            try:
+                harvested = self._harvest_bulk(dataset_id, table_ids)
+            except Exception as e:
+                print(f"⚠️ Consulta INFORMATION_SCHEMA no disponible para {dataset_id} ({e}). Usando get_table por tabla...")
+
+        missing = [t for t in table_ids if t not in harvested]
+        if missing:
+            harvested.update(self._harvest_per_table(dataset_id, missing))
+
+        return [harvested[t] for t in table_ids if t in harvested]
+
+    def _harvest_bulk(self, dataset_id: str, table_ids: List[str]) -> Dict[str, TableMetadata]:
+        dataset_ref = self.qualified_dataset(dataset_id)
+        from google.cloud import bigquery
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("table_names", "STRING", table_ids)]
+        )
+        columns_sql = f"""
+            SELECT f.table_name, f.column_name, f.field_path, f.data_type, f.description
+            FROM `{dataset_ref}`.INFORMATION_SCHEMA.COLUMN_FIELD_PATHS AS f
+            JOIN `{dataset_ref}`.INFORMATION_SCHEMA.COLUMNS AS c
+              USING (table_name, column_name)
+            WHERE f.table_name IN UNNEST(@table_names)
+            ORDER BY f.table_name, c.ordinal_position, f.field_path
+        """
+        options_sql = f"""
+            SELECT table_name, option_value
+            FROM `{dataset_ref}`.INFORMATION_SCHEMA.TABLE_OPTIONS
+            WHERE option_name = 'description' AND table_name IN UNNEST(@table_names)
+        """
+        column_rows = retry_call(
+            lambda: list(self.client.query(columns_sql, job_config=job_config).result()),
+            max_attempts=self.max_retries,
+            description=f"INFORMATION_SCHEMA.COLUMNS({dataset_id})",
+            api="bigquery",
+        )
+        option_rows = retry_call(
+            lambda: list(self.client.query(options_sql, job_config=job_config).result()),
+            max_attempts=self.max_retries,
+            description=f"INFORMATION_SCHEMA.TABLE_OPTIONS({dataset_id})",
+            api="bigquery",
+        )
+
+        descriptions = {row["table_name"]: _parse_option_value(row["option_value"]) for row in option_rows}
+        tables: Dict[str, TableMetadata] = {}
+        # field_path -> column, per table, to attach nested RECORD fields to their parent
+        paths: Dict[str, Dict[str, ColumnMetadata]] = {}
+        nested: List[tuple] = []
+
+        for row in column_rows:
+            table_name = row["table_name"]
+            if table_name not in tables:
+                tables[table_name] = TableMetadata(table_id=table_name, description=descriptions.get(table_name))
+                paths[table_name] = {}
+
+            field_type, mode = _parse_information_schema_type(row["data_type"])
+            field_path = row["field_path"]
+            column = ColumnMetadata(
+                name=field_path.rsplit(".", 1)[-1],
+                field_type=field_type,
+                description=row["description"],
+                mode=mode,
+            )
+            paths[table_name][field_path] = column
+
+            if "." in field_path:
+                nested.append((table_name, field_path.rsplit(".", 1)[0], column))
+            else:
+                tables[table_name].columns.append(column)
+
+        # Second pass: a nested field may be read before its parent
+        for table_name, parent_path, column in nested:
+            parent = paths[table_name].get(parent_path)
+            if parent is not None:
+                parent.fields.append(column)
+
+        return tables
+
+    def _fetch_table(self, dataset_id: str, table_id: str) -> Optional[TableMetadata]:
+        table_ref = f"{self.qualified_dataset(dataset_id)}.{table_id}"
+        try:
+            table = retry_call(
+                lambda: self.client.get_table(table_ref),
+                max_attempts=self.max_retries,
+                description=f"get_table({table_id})",
+                api="bigquery",
+            )
+            return table_metadata_from_bigquery(table)
+        except Exception as e:
+            print(f"⚠️ Error recuperando metadatos de la tabla {table_ref}: {e}")
+            return None
+
+    def _harvest_per_table(self, dataset_id: str, table_ids: List[str]) -> Dict[str, TableMetadata]:
+        with TracedThreadPoolExecutor(max_workers=min(self.max_workers, len(table_ids))) as executor:
+            results = executor.map(lambda t: self._fetch_table(dataset_id, t), table_ids)
+            return {t: metadata for t, metadata in zip(table_ids, results) if metadata is not None}
@@ -1,13 +1,25 @@
-from typing import Optional
-from vertexai.generative_models import GenerativeModel
+import json
+from typing import Iterator, List, Optional
+from pydantic import ValidationError
+from core.response_cache import CachedGenerativeModel, ResponseCache
+from core import telemetry
+from core.retry import retry_call
+from modules.json_stream import iter_array_items, iter_response_text
+from modules.sharding import pack_shards, run_concurrently, merge_glossary_proposals
+from src.models.glossary import GlossaryCategory, GlossaryTerm
 
 class BusinessGlossaryGenerator:
-    def __init__(self, model_name: str = "gemini-2.5-flash"):
+    def __init__(self, model_name: str = "gemini-2.5-flash", max_retries: int = 5, response_cache: Optional[ResponseCache] = None):
         """
         Generador de Glosario de Negocio estructurado para Dataplex
         soportando Categorías y Etiquetas.
         """
+        from vertexai.generative_models import GenerativeModel
+
         self.model = GenerativeModel(model_name)
+        if response_cache:
+            self.model = CachedGenerativeModel(self.model, model_name, response_cache)
+        self.max_retries = max_retries
 
     def _build_prompt(self, technical_context: str) -> str:
         return f"""
@@ -79,6 +91,43 @@ class BusinessGlossaryGenerator:
         - Responde SOLO EL JSON VÁLIDO.
         """
 
+    @staticmethod
+    def _validate_category(item: dict) -> Optional[dict]:
+        # Un término inválido se descarta sin perder el resto de la categoría
+        terms = []
+        for term in item.get("terms", []):
+            try:
+                terms.append(GlossaryTerm.model_validate(term).model_dump(exclude_unset=True))
+            except ValidationError as e:
+                print(f"⚠️ Término descartado ({e.error_count()} errores de validación): {term}")
+        try:
+            category = GlossaryCategory.model_validate(dict(item, terms=[]))
+        except ValidationError as e:
+            print(f"⚠️ Categoría descartada ({e.error_count()} errores de validación): {item.get('display_name')}")
+            return None
+        return dict(category.model_dump(exclude_unset=True), terms=terms)
+
+    def _stream_categories(self, prompt: str) -> Iterator[dict]:
+        telemetry.count(telemetry.BYTES_SENT, len(prompt.encode("utf-8")))
+        responses = self.model.generate_content(prompt, stream=True)
+        for item in iter_array_items(iter_response_text(responses), ("glossary", "categories"), salvage_tail=True):
+            category = self._validate_category(item)
+            if category:
+                yield category
+
+    @telemetry.timed("gemini.generate")
+    def _generate(self, prompt: str) -> Optional[str]:
+        # Reintenta errores transitorios y de cuota (429 / RESOURCE_EXHAUSTED) con backoff
+        categories = retry_call(
+            lambda: list(self._stream_categories(prompt)),
+            max_attempts=self.max_retries,
+            description="Gemini generate_content",
+            api="vertex",
+        )
+        if categories:
+            return json.dumps({"glossary": {"categories": categories}}, indent=2, ensure_ascii=False)
+        return None
+
     def suggest_glossary_structure(self, technical_context: str) -> Optional[str]:
         """
         Genera la estructura del glosario basada en el contexto técnico proporcionado.
@@ -87,10 +136,24 @@ class BusinessGlossaryGenerator:
         print("🧠 Gemini analizando estructura de glosario (Categorías + Etiquetas)...")
         
         try:
-            response = self.model.generate_content(prompt)
-            if response.text:
-                return response.text.replace("```json", "").replace("```", "").strip()
+            return self._generate(prompt)
         except Exception as e:
             print(f"❌ Error generando glosario: {e}")
         
         return None
+
+    def stream_glossary_categories(self, technical_context: str) -> Iterator[dict]:
+        """
+        Emite cada categoría validada (con sus términos) en cuanto el modelo la completa.
+        """
+        yield from self._stream_categories(self._build_prompt(technical_context))
+
+    def suggest_glossary_structure_sharded(self, context_chunks: List[str], header: str = "", token_budget: int = 4000, max_workers: int = 4) -> Optional[str]:
+        """
+        Divide el contexto (un fragmento por tabla) en lotes acotados por tokens,
+        los envía a Gemini en paralelo y fusiona las respuestas en una única propuesta.
+        """
+        shards = pack_shards(context_chunks, token_budget, header=header)
+        print(f"🧠 Gemini analizando glosario en {len(shards)} fragmentos (concurrencia {max_workers})...")
+        results = run_concurrently(lambda ctx: self._generate(self._build_prompt(ctx)), shards, max_workers)
+        return merge_glossary_proposals(results)
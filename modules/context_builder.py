@@ -0,0 +1,207 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from modules.bigquery_metadata import ColumnMetadata, TableMetadata, render_column_profile
+from modules.sharding import estimate_tokens, pack_indices
+
+_TYPE_ABBREVIATIONS = {
+    "STRING": "STR",
+    "INTEGER": "INT",
+    "FLOAT": "FLT",
+    "NUMERIC": "NUM",
+    "BIGNUMERIC": "BIGNUM",
+    "BOOLEAN": "BOOL",
+    "TIMESTAMP": "TS",
+    "DATETIME": "DT",
+    "RECORD": "REC",
+    "GEOGRAPHY": "GEO",
+}
+
+_LEGEND = (
+    "Format: '## table: description' per table, then one 'column|type|description|profile' line per column. "
+    "Nested fields are parent.child; [] marks REPEATED. "
+    "Types: " + ", ".join(f"{short}={full}" for full, short in _TYPE_ABBREVIATIONS.items()) + ". "
+    "'+G<n>' after a table name: the table also has the columns of shared group G<n> "
+    "(a line 'column|||profile' only adds the profile of a group column)."
+)
+
+# Detail levels, from most to least detailed. When a context is over budget the next
+# level is tried, dropping the lowest-value detail first.
+_LEVELS = [
+    dict(description_chars=None, column_descriptions=True, profiles=True, nested=True, table_descriptions=True),
+    dict(description_chars=60, column_descriptions=True, profiles=True, nested=True, table_descriptions=True),
+    dict(description_chars=60, column_descriptions=False, profiles=True, nested=True, table_descriptions=True),
+    dict(description_chars=60, column_descriptions=False, profiles=False, nested=True, table_descriptions=True),
+    dict(description_chars=60, column_descriptions=False, profiles=False, nested=False, table_descriptions=True),
+    dict(description_chars=60, column_descriptions=False, profiles=False, nested=False, table_descriptions=False),
+]
+
+
+@dataclass(frozen=True)
+class _Row:
+    path: str
+    type: str
+    description: str = ""
+    profile: str = ""
+
+    @property
+    def signature(self) -> Tuple[str, str, str]:
+        return self.path, self.type, self.description
+
+
+def _clean(text: Optional[str], limit: Optional[int]) -> str:
+    # One line, no field separators, at most `limit` characters
+    text = re.sub(r"\s+", " ", (text or "").replace("|", "/")).strip()
+    if limit and len(text) > limit:
+        text = text[:limit - 1].rstrip() + "…"
+    return text
+
+
+def _format_row(row: _Row) -> str:
+    return "|".join([row.path, row.type, row.description, row.profile]).rstrip("|")
+
+
+def flatten_columns(columns: List[ColumnMetadata], prefix: str = "", nested: bool = True) -> List[Tuple[str, ColumnMetadata, bool]]:
+    """
+    Flattens nested RECORD fields into `(path, column, top_level)` entries, parents first
+    (`address`, `address.city`...). With `nested=False` only top-level columns are kept.
+    """
+    flattened = []
+    for column in columns:
+        path = f"{prefix}{column.name}"
+        flattened.append((path, column, not prefix))
+        if nested and column.fields:
+            flattened.extend(flatten_columns(column.fields, prefix=f"{path}.", nested=nested))
+    return flattened
+
+
+class ContextBuilder:
+    """
+    Builds a compact, token-efficient technical context for the generation prompt.
+
+    Tables are rendered as pipe-separated rows (abbreviated types, flattened nested fields,
+    truncated descriptions) and groups of identical columns shared by several tables
+    (audit columns, common keys...) are listed once. The result is kept under
+    `token_budget` (estimated tokens): over budget, descriptions are shortened, then column
+    descriptions, profiles, nested fields and table descriptions are dropped, and as a last
+    resort the trailing columns of the largest tables are cut.
+    """
+
+    def __init__(self, token_budget: int = 30000, max_description_chars: int = 120, min_group_columns: int = 2, min_group_tables: int = 2):
+        self.token_budget = token_budget
+        self.max_description_chars = max_description_chars
+        self.min_group_columns = min_group_columns
+        self.min_group_tables = min_group_tables
+
+    def _rows(self, table: TableMetadata, level: dict) -> List[_Row]:
+        limit = min(filter(None, [level["description_chars"], self.max_description_chars]), default=None)
+        rows = []
+        for path, column, top_level in flatten_columns(table.columns, nested=level["nested"]):
+            field_type = _TYPE_ABBREVIATIONS.get(column.field_type, column.field_type)
+            if column.mode == "REPEATED":
+                field_type += "[]"
+            description = _clean(column.description, limit) if level["column_descriptions"] else ""
+            profile = ""
+            if level["profiles"] and top_level and table.profile and table.profile.column(column.name):
+                profile = render_column_profile(table.profile.column(column.name), table.profile.rows).replace("|", "/")
+            rows.append(_Row(path, field_type, description, profile))
+        return rows
+
+    def _groups(self, rows_by_table: Dict[str, List[_Row]]) -> List[List[Tuple[str, str, str]]]:
+        """
+        Column groups shared by several tables: columns with the same name, type and
+        description, grouped by the exact set of tables they appear in.
+        """
+        # Dicts as ordered sets: membership stays O(1) with thousands of tables
+        tables_by_signature: Dict[Tuple[str, str, str], Dict[str, None]] = {}
+        for table_id, rows in rows_by_table.items():
+            for row in rows:
+                tables_by_signature.setdefault(row.signature, {})[table_id] = None
+
+        groups: Dict[Tuple[str, ...], List[Tuple[str, str, str]]] = {}
+        for signature, table_ids in tables_by_signature.items():
+            if len(table_ids) >= self.min_group_tables:
+                groups.setdefault(tuple(table_ids), []).append(signature)
+        return [columns for columns in groups.values() if len(columns) >= self.min_group_columns]
+
+    def _render(self, dataset_id: str, tables: List[TableMetadata], level: dict, max_columns: Optional[Dict[str, int]] = None) -> str:
+        rows_by_table = {t.table_id: self._rows(t, level) for t in tables}
+        for table_id, limit in (max_columns or {}).items():
+            rows_by_table[table_id] = rows_by_table[table_id][:limit]
+        groups = self._groups(rows_by_table)
+        group_of = {signature: i + 1 for i, columns in enumerate(groups) for signature in columns}
+
+        lines = [f"Dataset: {dataset_id}", _LEGEND]
+        if groups:
+            lines.append("Shared column groups:")
+            for i, columns in enumerate(groups, start=1):
+                lines.append(f"G{i}")
+                lines.extend(_format_row(_Row(*signature)) for signature in columns)
+
+        for table in tables:
+            rows = rows_by_table[table.table_id]
+            table_groups = sorted({group_of[r.signature] for r in rows if r.signature in group_of})
+            header = f"## {table.table_id}" + "".join(f" +G{g}" for g in table_groups)
+            if table.profile and level["profiles"]:
+                sampled = f", {table.profile.sample_percent:g}% sample" if table.profile.sample_percent < 100 else ""
+                header += f" ({table.profile.rows} rows{sampled})"
+            if level["table_descriptions"] and table.description:
+                header += f": {_clean(table.description, self.max_description_chars)}"
+            lines.append(header)
+            for row in rows:
+                if row.signature in group_of:
+                    if row.profile:
+                        lines.append(f"{row.path}|||{row.profile}")
+                else:
+                    lines.append(_format_row(row))
+            omitted = len(flatten_columns(table.columns, nested=level["nested"])) - len(rows)
+            if omitted > 0:
+                lines.append(f"... +{omitted} columns omitted")
+        return "\n".join(lines)
+
+    def build(self, dataset_id: str, tables: List[TableMetadata]) -> str:
+        """
+        Compact context of the given tables, within `token_budget` estimated tokens.
+        """
+        if not tables:
+            return ""
+        for level in _LEVELS:
+            context = self._render(dataset_id, tables, level)
+            if estimate_tokens(context) <= self.token_budget:
+                return context
+
+        # Still over budget with the least detail: cut columns of the largest tables
+        level = _LEVELS[-1]
+        max_columns = {t.table_id: len(flatten_columns(t.columns, nested=False)) for t in tables}
+        while estimate_tokens(context) > self.token_budget and any(n > 1 for n in max_columns.values()):
+            # Every table at the current maximum is cut in the same pass (one render per pass)
+            cap = max(1, int(max(max_columns.values()) * 0.8))
+            max_columns = {table_id: min(n, cap) for table_id, n in max_columns.items()}
+            context = self._render(dataset_id, tables, level, max_columns)
+        print(f"⚠️ Contexto de {dataset_id} recortado a {estimate_tokens(context)} tokens estimados (presupuesto {self.token_budget}).")
+        return context
+
+    @staticmethod
+    def header_tokens(dataset_id: str) -> int:
+        """
+        Estimated tokens of the part every context repeats (dataset line and legend).
+        """
+        return estimate_tokens(f"Dataset: {dataset_id}\n{_LEGEND}")
+
+    def table_tokens(self, dataset_id: str, table: TableMetadata) -> int:
+        """
+        Estimated tokens a table adds to a context at full detail.
+        """
+        return estimate_tokens(self._render(dataset_id, [table], _LEVELS[0])) - self.header_tokens(dataset_id)
+
+    def build_shards(self, dataset_id: str, tables: List[TableMetadata]) -> List[str]:
+        """
+        Groups the tables into shards whose compact context fits `token_budget` and
+        builds each one (shared column groups are deduplicated within each shard).
+        """
+        if not tables:
+            return []
+        sizes = [self.table_tokens(dataset_id, t) for t in tables]
+        available = self.token_budget - self.header_tokens(dataset_id)
+        return [self.build(dataset_id, [tables[i] for i in shard]) for shard in pack_indices(sizes, available)]
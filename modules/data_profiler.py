@@ -0,0 +1,191 @@
+from typing import Dict, List, Optional, Tuple
+
+from core import telemetry
+from core.retry import retry_call
+from core.telemetry import TracedThreadPoolExecutor
+from modules.bigquery_metadata import ColumnMetadata, ColumnProfile, TableMetadata, TableProfile, qualify_dataset
+from modules.metadata_cache import MetadataCache
+
+# Column types each statistic applies to (legacy `SchemaField` names, as harvested)
+_DISTINCT_TYPES = {"STRING", "INTEGER", "NUMERIC", "BIGNUMERIC", "DATE", "DATETIME", "TIMESTAMP", "TIME", "BOOLEAN", "BYTES"}
+_RANGE_TYPES = {"INTEGER", "FLOAT", "NUMERIC", "BIGNUMERIC", "DATE", "DATETIME", "TIMESTAMP", "TIME"}
+_TOP_K_TYPES = {"STRING", "INTEGER", "BOOLEAN", "DATE"}
+
+# Longest prefix of a string value looked at for frequent values and shapes
+_MAX_VALUE_LENGTH = 64
+# BigQuery bills at least 10 MB per table referenced
+_MIN_BYTES_BILLED = 10 * 1024 * 1024
+
+
+def _shape_expression(column: str) -> str:
+    # "AB-1234" -> "A-9999", "john@x.com" -> "a@a.a": letter runs collapsed, digits kept
+    value = f"SUBSTR({column}, 1, {_MAX_VALUE_LENGTH})"
+    value = f"REGEXP_REPLACE({value}, r'[A-Z]+', 'A')"
+    value = f"REGEXP_REPLACE({value}, r'[a-z]+', 'a')"
+    return f"REGEXP_REPLACE({value}, r'[0-9]', '9')"
+
+
+def profile_columns(table: TableMetadata, max_columns: int = 200) -> List[ColumnMetadata]:
+    """
+    Columns that can be profiled: top-level, non-repeated scalars (the ones rendered in the prompt).
+    """
+    return [c for c in table.columns if c.mode != "REPEATED" and c.field_type not in ("RECORD", "STRUCT")][:max_columns]
+
+
+def build_profile_query(table_ref: str, columns: List[ColumnMetadata], top_k: int = 5, sample_percent: Optional[float] = None) -> str:
+    """
+    One aggregate query computing every column statistic in a single (optionally sampled) scan:
+    null counts, HLL distinct counts (`APPROX_COUNT_DISTINCT`), min/max, string lengths and
+    top-k values and shapes (`APPROX_TOP_COUNT`). Column `i` is read from the `c{i}_*` aliases.
+    """
+    selects = ["COUNT(*) AS row_count"]
+    for i, column in enumerate(columns):
+        name, field_type = f"`{column.name}`", column.field_type
+        selects.append(f"COUNTIF({name} IS NULL) AS c{i}_nulls")
+        if field_type in _DISTINCT_TYPES:
+            selects.append(f"APPROX_COUNT_DISTINCT({name}) AS c{i}_distinct")
+        if field_type in _RANGE_TYPES:
+            selects.append(f"CAST(MIN({name}) AS STRING) AS c{i}_min")
+            selects.append(f"CAST(MAX({name}) AS STRING) AS c{i}_max")
+        if field_type == "STRING":
+            selects.append(f"MIN(LENGTH({name})) AS c{i}_min_length")
+            selects.append(f"MAX(LENGTH({name})) AS c{i}_max_length")
+            selects.append(f"APPROX_TOP_COUNT(SUBSTR({name}, 1, {_MAX_VALUE_LENGTH}), {top_k}) AS c{i}_top")
+            selects.append(f"APPROX_TOP_COUNT({_shape_expression(name)}, {top_k}) AS c{i}_shapes")
+        elif field_type in _TOP_K_TYPES:
+            selects.append(f"APPROX_TOP_COUNT(CAST({name} AS STRING), {top_k}) AS c{i}_top")
+
+    source = f"`{table_ref}`"
+    if sample_percent is not None and sample_percent < 100:
+        source += f" TABLESAMPLE SYSTEM ({sample_percent:g} PERCENT)"
+    return "SELECT\n  " + ",\n  ".join(selects) + f"\nFROM {source}"
+
+
+def _top_counts(value) -> List[list]:
+    return [[item["value"], int(item["count"])] for item in (value or []) if item["value"] is not None]
+
+
+def profile_from_row(columns: List[ColumnMetadata], row, sample_percent: float = 100.0) -> TableProfile:
+    """
+    Builds a `TableProfile` from the single result row of `build_profile_query`.
+    """
+    row = dict(row.items())
+    rows = int(row["row_count"] or 0)
+    profiles = []
+    for i, column in enumerate(columns):
+        get = lambda key: row.get(f"c{i}_{key}")
+        profiles.append(ColumnProfile(
+            name=column.name,
+            null_ratio=int(get("nulls") or 0) / rows if rows else None,
+            approx_distinct=int(get("distinct")) if get("distinct") is not None else None,
+            min_value=get("min"),
+            max_value=get("max"),
+            min_length=get("min_length"),
+            max_length=get("max_length"),
+            top_values=_top_counts(get("top")),
+            patterns=_top_counts(get("shapes")),
+        ))
+    return TableProfile(rows=rows, sample_percent=sample_percent, columns=profiles)
+
+
+class DataProfiler:
+    """
+    Profiles BigQuery tables with one sampled aggregate query per table.
+
+    The cost of each table is bounded by `max_bytes_billed`: a dry run estimates the bytes
+    of a full scan of the profiled columns and, when it exceeds the budget, the query uses
+    `TABLESAMPLE SYSTEM` with the percentage that fits (the job also carries
+    `maximum_bytes_billed`, so it fails rather than overspend). Tables are profiled
+    concurrently and, with a cache, reused while the table snapshot is unchanged.
+    """
+
+    def __init__(self, client: "bigquery.Client", max_bytes_billed: int = 1024 ** 3, top_k: int = 5,
+                 max_workers: int = 4, max_retries: int = 5, max_columns: int = 200, cache: Optional[MetadataCache] = None):
+        self.client = client
+        self.max_bytes_billed = max(max_bytes_billed, _MIN_BYTES_BILLED)
+        self.top_k = top_k
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(1, max_retries)
+        self.max_columns = max_columns
+        self.cache = cache
+
+    def _snapshot(self, table: TableMetadata) -> Optional[str]:
+        # Without a known modification time there is no snapshot to key the cache on
+        if table.last_modified is None:
+            return None
+        return f"{table.last_modified}:{self.max_bytes_billed}:{self.top_k}:{self.max_columns}"
+
+    def _sample_percent(self, sql: str, table_id: str) -> Optional[float]:
+        from google.cloud import bigquery
+
+        job = retry_call(
+            lambda: self.client.query(sql, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)),
+            max_attempts=self.max_retries,
+            description=f"profile dry run({table_id})",
+            api="bigquery",
+        )
+        full_bytes = job.total_bytes_processed or 0
+        if full_bytes <= self.max_bytes_billed:
+            return None
+        # Sampling is block-based, so keep some headroom under the budget
+        return max(0.01, round(80.0 * self.max_bytes_billed / full_bytes, 2))
+
+    def profile_table(self, dataset_ref: str, table: TableMetadata) -> Optional[TableProfile]:
+        """
+        Profiles one table, or returns None if it has no profilable columns or the query failed.
+        """
+        from google.cloud import bigquery
+
+        columns = profile_columns(table, self.max_columns)
+        if not columns:
+            return None
+        table_ref = f"{dataset_ref}.{table.table_id}"
+        try:
+            sample_percent = self._sample_percent(build_profile_query(table_ref, columns, self.top_k), table.table_id)
+            sql = build_profile_query(table_ref, columns, self.top_k, sample_percent)
+            job_config = bigquery.QueryJobConfig(maximum_bytes_billed=self.max_bytes_billed)
+            rows = retry_call(
+                lambda: list(self.client.query(sql, job_config=job_config).result()),
+                max_attempts=self.max_retries,
+                description=f"profile({table.table_id})",
+                api="bigquery",
+            )
+        except Exception as e:
+            print(f"⚠️ No se pudo perfilar la tabla {table_ref}: {e}")
+            return None
+        return profile_from_row(columns, rows[0], sample_percent or 100.0)
+
+    @telemetry.timed("bigquery.profile")
+    def profile(self, dataset_id: str, tables: List[TableMetadata]) -> Dict[str, TableProfile]:
+        """
+        Profiles the given tables and attaches each profile to its `TableMetadata.profile`.
+
+        Returns:
+            Dict[str, TableProfile]: Profile per table id (tables that failed are omitted).
+        """
+        dataset_ref = qualify_dataset(self.client.project, dataset_id)
+        profiles: Dict[str, TableProfile] = {}
+        pending: List[Tuple[TableMetadata, Optional[str]]] = []
+        for table in tables:
+            snapshot = self._snapshot(table)
+            cached = self.cache.get_profile(f"{dataset_ref}.{table.table_id}", snapshot) if self.cache and snapshot else None
+            if cached:
+                profiles[table.table_id] = cached
+            else:
+                pending.append((table, snapshot))
+        if self.cache:
+            print(f"♻️ {len(profiles)}/{len(tables)} perfiles de datos servidos desde caché.")
+
+        if pending:
+            with TracedThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                results = list(executor.map(lambda item: self.profile_table(dataset_ref, item[0]), pending))
+            for (table, snapshot), profile in zip(pending, results):
+                if profile is None:
+                    continue
+                profiles[table.table_id] = profile
+                if self.cache and snapshot:
+                    self.cache.put_profile(f"{dataset_ref}.{table.table_id}", snapshot, profile)
+
+        for table in tables:
+            table.profile = profiles.get(table.table_id)
+        return profiles
@@ -1,12 +1,27 @@
-from typing import Optional
-from vertexai.generative_models import GenerativeModel
+import json
+from typing import Callable, Iterable, Iterator, List, Optional
+from pydantic import ValidationError
+from core.response_cache import CachedGenerativeModel, ResponseCache
+from core import telemetry
+from core.retry import retry_call
+from modules.json_stream import iter_array_items, iter_response_text
+from modules.sharding import pack_shards, run_concurrently, merge_rule_proposals
+from src.models.quality import QualityRule
 
 class DataQualityGenerator:
-    def __init__(self, model_name: str = "gemini-2.5-flash"):
+    def __init__(self, model_name: str = "gemini-2.5-flash", max_retries: int = 5, response_cache: Optional[ResponseCache] = None, model=None):
         """
-        Generador de Reglas de Calidad (Data Quality) para Dataplex
+        Generador de Reglas de Calidad (Data Quality) para Dataplex.
+        `model` permite inyectar un modelo ya creado (p. ej. un sustituto en los benchmarks).
         """
-        self.model = GenerativeModel(model_name)
+        if model is None:
+            from vertexai.generative_models import GenerativeModel
+
+            model = GenerativeModel(model_name)
+        self.model = model
+        if response_cache:
+            self.model = CachedGenerativeModel(self.model, model_name, response_cache)
+        self.max_retries = max_retries
 
     def _build_prompt(self, technical_context: str) -> str:
         return f"""
@@ -28,6 +43,10 @@ class DataQualityGenerator:
            - Categorías -> SqlAssertion o Set check
         2. Asigna una 'dimension' correcta (COMPLETENESS, ACCURACY, CONSISTENCY, VALIDITY, UNIQUENESS).
         3. Genera una descripción para cada regla.
+        4. Si una columna incluye perfil ("Profile", o el campo 'profile' del formato compacto: estadísticas de una muestra de los datos), básate en él:
+           - Usa los 'shapes' (A = letras mayúsculas, a = minúsculas, 9 = dígito) para los Regex.
+           - Usa los 'values' para los Set check y el 'range' para los rangos.
+           - Propón Uniqueness solo si es '(unique)' y Not Null solo si 'nulls' es 0%.
         
         SALIDA ESPERADA (JSON ÚNICAMENTE):
         Una lista de reglas bajo la clave "rules", incluyendo la tabla a la que aplican.
@@ -56,6 +75,44 @@ class DataQualityGenerator:
         - Responde SOLO EL JSON VÁLIDO.
         """
 
+    def build_prompt(self, technical_context: str) -> str:
+        """
+        Prompt de generación para un contexto técnico (p. ej. para enviarlo en un job batch).
+        """
+        return self._build_prompt(technical_context)
+
+    def _validate_rules(self, items: Iterable[dict]) -> Iterator[dict]:
+        for item in items:
+            try:
+                yield QualityRule.model_validate(item).model_dump(exclude_unset=True)
+            except ValidationError as e:
+                print(f"⚠️ Regla descartada ({e.error_count()} errores de validación): {item}")
+
+    def _stream_rules(self, prompt: str) -> Iterator[dict]:
+        # Cada regla se parsea, repara y valida en cuanto el modelo cierra su objeto JSON
+        telemetry.count(telemetry.BYTES_SENT, len(prompt.encode("utf-8")))
+        responses = self.model.generate_content(prompt, stream=True)
+        yield from self._validate_rules(iter_array_items(iter_response_text(responses), ("rules",)))
+
+    def parse_rules_response(self, text: str) -> List[dict]:
+        """
+        Extrae y valida las reglas de una respuesta completa del modelo (p. ej. de un job batch).
+        """
+        return list(self._validate_rules(iter_array_items([text], ("rules",))))
+
+    @telemetry.timed("gemini.generate")
+    def _generate(self, prompt: str) -> Optional[str]:
+        # Reintenta errores transitorios y de cuota (429 / RESOURCE_EXHAUSTED) con backoff
+        rules = retry_call(
+            lambda: list(self._stream_rules(prompt)),
+            max_attempts=self.max_retries,
+            description="Gemini generate_content",
+            api="vertex",
+        )
+        if rules:
+            return json.dumps({"rules": rules}, indent=2, ensure_ascii=False)
+        return None
+
     def suggest_quality_rules(self, technical_context: str) -> Optional[str]:
         """
         Genera reglas de calidad basadas en el contexto técnico proporcionado.
@@ -64,10 +121,38 @@ class DataQualityGenerator:
         print("🧠 Gemini analizando reglas de calidad...")
         
         try:
-            response = self.model.generate_content(prompt)
-            if response.text:
-                return response.text.replace("```json", "").replace("```", "").strip()
+            return self._generate(prompt)
         except Exception as e:
             print(f"❌ Error generando reglas de calidad: {e}")
         
         return None
+
+    def stream_quality_rules(self, technical_context: str) -> Iterator[dict]:
+        """
+        Emite cada regla validada en cuanto el modelo la completa (sin esperar a la respuesta entera).
+        """
+        yield from self._stream_rules(self._build_prompt(technical_context))
+
+    def suggest_quality_rules_sharded(self, context_chunks: List[str], header: str = "", token_budget: int = 4000, max_workers: int = 4) -> Optional[str]:
+        """
+        Divide el contexto (un fragmento por tabla) en lotes acotados por tokens,
+        los envía a Gemini en paralelo y fusiona las respuestas en una única propuesta.
+        """
+        return self.suggest_quality_rules_for_shards(pack_shards(context_chunks, token_budget, header=header), max_workers=max_workers)
+
+    def suggest_quality_rules_for_shards(self, shards: List[str], max_workers: int = 4, on_result: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Envía a Gemini en paralelo contextos ya fragmentados y fusiona las respuestas.
+        `on_result` recibe la respuesta de cada fragmento en cuanto termina (p. ej. para
+        registrar el progreso de una ejecución reanudable).
+        """
+        print(f"🧠 Gemini analizando reglas de calidad en {len(shards)} fragmentos (concurrencia {max_workers})...")
+
+        def generate(context: str) -> Optional[str]:
+            result = self._generate(self._build_prompt(context))
+            if result and on_result:
+                on_result(result)
+            return result
+
+        results = run_concurrently(generate, shards, max_workers)
+        return merge_rule_proposals(results)
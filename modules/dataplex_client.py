@@ -32,16 +32,143 @@ class DataplexClient:
     
     # RE-WRITING CLASS TO USE DATA CATALOG (Correct API for Glossaries)
     
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
 from google.cloud import dataplex_v1
 from google.api_core.exceptions import AlreadyExists, NotFound
+from google.protobuf import field_mask_pb2
+
+from core import telemetry
+from core.telemetry import TracedThreadPoolExecutor
+
+from core.retry import is_transient_error, retry_call
+from modules.run_ledger import PUBLISHED, LedgerRun, content_hash
+
+
+def glossary_resource_id(text: str) -> str:
+    """
+    Stable Dataplex resource id for a category/term name: lowercase letters, digits and
+    hyphens, starting with a letter, at most 63 characters.
+    """
+    resource_id = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    if not resource_id or not resource_id[0].isalpha():
+        resource_id = f"g-{resource_id}"
+    return resource_id[:63].rstrip("-")
+
+
+# Set on a term created under the glossary root because its category parent was rejected:
+# the reconcile diff compares the term against this category instead of seeing a move
+FALLBACK_PARENT_LABEL = "fallback_parent"
+
+
+def _clean_labels(labels: Optional[dict]) -> Optional[dict]:
+    # Dataplex labels only accept lowercase letters, digits, '_' and '-' (max 63 chars)
+    if not labels:
+        return labels
+    clean = lambda v: re.sub(r"[^a-z0-9_-]+", "_", str(v).lower())[:63]
+    return {clean(k): clean(v) for k, v in labels.items()}
+
+
+@dataclass
+class PublishOutcome:
+    kind: str  # "category" | "term"
+    item_id: str
+    status: str  # "created" | "exists" | "resumed" | "failed"
+    attempts: int = 1
+    error: Optional[str] = None
+
+
+@dataclass
+class PublishReport:
+    outcomes: List[PublishOutcome] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for outcome in self.outcomes:
+            counts[outcome.status] = counts.get(outcome.status, 0) + 1
+        return counts
+
+    @property
+    def failed(self) -> List[PublishOutcome]:
+        return [o for o in self.outcomes if o.status == "failed"]
+
+    @property
+    def throughput(self) -> float:
+        return len(self.outcomes) / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.outcomes)} items in {self.elapsed_seconds:.1f}s "
+            f"({self.throughput:.1f} items/s) {self.counts}"
+        )
+
+
+@dataclass
+class GlossaryDiff:
+    """
+    Minimal set of changes to turn the live glossary into the proposed one.
+    Specs are the normalized dicts built by `DataplexGlossaryClient._desired_state`.
+    """
+    added_categories: List[dict] = field(default_factory=list)
+    changed_categories: List[dict] = field(default_factory=list)
+    removed_categories: List[str] = field(default_factory=list)
+    added_terms: List[dict] = field(default_factory=list)
+    changed_terms: List[dict] = field(default_factory=list)
+    moved_terms: List[dict] = field(default_factory=list)  # Parent category changed: delete + create
+    removed_terms: List[str] = field(default_factory=list)
+    list_rpcs: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.added_categories or self.changed_categories or self.removed_categories
+            or self.added_terms or self.changed_terms or self.moved_terms or self.removed_terms
+        )
+
+    @property
+    def estimated_rpcs(self) -> int:
+        """
+        Mutating RPCs needed to apply the diff (listing calls are reported in `list_rpcs`).
+        """
+        return (
+            len(self.added_categories) + len(self.changed_categories) + len(self.removed_categories)
+            + len(self.added_terms) + len(self.changed_terms) + 2 * len(self.moved_terms) + len(self.removed_terms)
+        )
+
+    def describe(self) -> str:
+        lines = [f"+ category {c['id']}" for c in self.added_categories]
+        lines += [f"~ category {c['id']}" for c in self.changed_categories]
+        lines += [f"- category {c}" for c in self.removed_categories]
+        lines += [f"+ term {t['id']}" for t in self.added_terms]
+        lines += [f"~ term {t['id']}" for t in self.changed_terms]
+        lines += [f"> term {t['id']} -> {t['category_id'] or 'root'}" for t in self.moved_terms]
+        lines += [f"- term {t}" for t in self.removed_terms]
+        lines.append(
+            f"Categories: +{len(self.added_categories)} ~{len(self.changed_categories)} -{len(self.removed_categories)} | "
+            f"Terms: +{len(self.added_terms)} ~{len(self.changed_terms)} >{len(self.moved_terms)} -{len(self.removed_terms)} | "
+            f"Estimated RPCs: {self.estimated_rpcs} (+{self.list_rpcs} list calls)"
+        )
+        return "\n".join(lines)
+
 
 class DataplexGlossaryClient:
-    def __init__(self, project_id: str, location: str):
+    def __init__(self, project_id: str, location: str, max_workers: int = 8, max_retries: int = 6, client=None):
         self.project_id = project_id
         self.location = location
         self.parent = f"projects/{project_id}/locations/{location}"
-        self.client = dataplex_v1.BusinessGlossaryServiceClient()
+        # `client` lets callers (e.g. benchmarks) pass a stand-in for the service client
+        self.client = client or dataplex_v1.BusinessGlossaryServiceClient()
+        self.max_workers = max_workers
+        self.max_retries = max_retries
 
+    @telemetry.timed("dataplex.create_or_update_glossary")
     def create_or_update_glossary(self, glossary_id: str, display_name: str, description: str = ""):
         glossary_name = f"{self.parent}/glossaries/{glossary_id}"
         
@@ -52,10 +179,9 @@ class DataplexGlossaryClient:
         
         try:
             print(f"Creating Glossary: {glossary_id}...")
-            operation = self.client.create_glossary(
-                parent=self.parent, 
-                glossary=glossary, 
-                glossary_id=glossary_id
+            operation, _ = self._call(
+                lambda: self.client.create_glossary(parent=self.parent, glossary=glossary, glossary_id=glossary_id),
+                f"create_glossary({glossary_id})",
             )
             operation.result() # Wait for operation to complete
             print("Glossary created.")
@@ -63,51 +189,99 @@ class DataplexGlossaryClient:
             print("Glossary already exists. Updating...")
             # For update, we need the 'name' and update_mask
             glossary.name = glossary_name
-            # Simplified update: We don't implement full update logic here to avoid complexity
-            # But technically we should call update_glossary.
-            # But technically we should call update_glossary.
-            pass
+            operation, _ = self._call(
+                lambda: self.client.update_glossary(glossary=glossary, update_mask=field_mask_pb2.FieldMask(paths=["display_name", "description"])),
+                f"update_glossary({glossary_id})",
+            )
+            operation.result()
+            print("Glossary updated.")
+
+    @telemetry.timed("dataplex.delete_glossary")
+    def delete_glossary(self, glossary_id: str, max_workers: Optional[int] = None) -> PublishReport:
+        """Deletes the glossary and all its children (categories/terms) if it exists.
 
-    def delete_glossary(self, glossary_id: str):
-        """Deletes the glossary and all its children (categories/terms) if it exists."""
+        Children are deleted page by page over a bounded worker pool, retrying transient
+        errors. Resources already gone count as deleted, so an interrupted teardown is
+        resumed by calling this again: the listings only return what is left.
+        """
         glossary_name = f"{self.parent}/glossaries/{glossary_id}"
         print(f"Checking for existing glossary: {glossary_id}...")
+        report = PublishReport()
         
         try:
              # Check if glossary exists first to avoid unnecessary API calls if it's missing
              try:
-                 self.client.get_glossary(name=glossary_name)
+                 self._call(lambda: self.client.get_glossary(name=glossary_name), f"get_glossary({glossary_id})")
              except NotFound:
                  print("Glossary does not exist. Proceeding to creation...")
-                 return
-
-             # 1. Delete all Categories
-             # Note: Deleting a category moves its terms to the glossary root (parent), so we delete categories first.
-             print(f"Clearing categories from {glossary_id}...")
-             categories = self.client.list_glossary_categories(parent=glossary_name)
-             for cat in categories:
-                 # print(f"Deleting category: {cat.name}")
-                 self.client.delete_glossary_category(name=cat.name)
-            
-             # 2. Delete all Terms
-             # Now deleting all terms (including those moved from categories)
-             print(f"Clearing terms from {glossary_id}...")
-             terms = self.client.list_glossary_terms(parent=glossary_name)
-             for term in terms:
-                 # print(f"Deleting term: {term.name}")
-                 self.client.delete_glossary_term(name=term.name)
+                 return report
+
+             start = time.monotonic()
+             with TracedThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+                 # 1. Delete all Categories
+                 # Note: Deleting a category moves its terms to the glossary root (parent), so we delete categories first.
+                 print(f"Clearing categories from {glossary_id}...")
+                 self._delete_children(executor, "category", glossary_name, report, start)
+
+                 # 2. Delete all Terms
+                 # Now deleting all terms (including those moved from categories)
+                 print(f"Clearing terms from {glossary_id}...")
+                 self._delete_children(executor, "term", glossary_name, report, start)
+             report.elapsed_seconds = time.monotonic() - start
+             print(f"Glossary {glossary_id} cleared: {report.summary()}")
+
+             if report.failed:
+                 raise RuntimeError(f"{len(report.failed)} resources could not be deleted; run again to resume.")
 
              # 3. Delete Glossary
              print(f"Deleting glossary {glossary_id}...")
-             operation = self.client.delete_glossary(name=glossary_name)
+             operation, _ = self._call(lambda: self.client.delete_glossary(name=glossary_name), f"delete_glossary({glossary_id})")
              operation.result() # Wait for deletion
              print("Glossary deleted successfully.")
+             return report
 
         except Exception as e:
              print(f"Error cleaning up/deleting glossary: {e}")
              # We raise to stop execution if cleanup fails, as creation might fail too
              raise e
 
+    def _delete_children(self, executor: ThreadPoolExecutor, kind: str, glossary_name: str, report: PublishReport, start: float, max_rounds: int = 5):
+        """
+        Deletes every category or term of the glossary, one listing page at a time.
+
+        Deleting while paging can shift later pages, so the listing is repeated until
+        it comes back empty (or only with resources that failed to delete). Resources
+        still listed after `max_rounds` are reported as failed.
+        """
+        if kind == "category":
+            lister, attribute = self.client.list_glossary_categories, "categories"
+        else:
+            lister, attribute = self.client.list_glossary_terms, "terms"
+
+        def remaining() -> List[str]:
+            pager, _ = self._call(lambda: lister(parent=glossary_name), f"list_glossary_{attribute}")
+            return [item.name for page in pager.pages for item in getattr(page, attribute) if item.name not in failed]
+
+        failed = set()
+        for _ in range(max_rounds):
+            pending = 0
+            pager, _ = self._call(lambda: lister(parent=glossary_name), f"list_glossary_{attribute}")
+            for page in pager.pages:
+                names = [item.name for item in getattr(page, attribute) if item.name not in failed]
+                pending += len(names)
+                for outcome, name in zip(executor.map(lambda n: self._delete_item(kind, n), names), names):
+                    report.outcomes.append(outcome)
+                    if outcome.status == "failed":
+                        failed.add(name)
+                        print(f"Error deleting {kind} {outcome.item_id}: {outcome.error}")
+                rate = len(report.outcomes) / max(time.monotonic() - start, 1e-9)
+                print(f"Deleted {len(report.outcomes) - len(report.failed)} resources ({rate:.1f} items/s)")
+            if pending == 0:
+                return
+
+        for name in remaining():
+            report.outcomes.append(PublishOutcome(kind, name.rsplit("/", 1)[-1], "failed", error=f"still listed after {max_rounds} deletion rounds"))
+
     def create_category(self, glossary_id: str, category_id: str, display_name: str, description: str, labels: dict = None):
         glossary_name = f"{self.parent}/glossaries/{glossary_id}"
         
@@ -120,10 +294,9 @@ class DataplexGlossaryClient:
         category.parent = glossary_name
 
         try:
-            self.client.create_glossary_category(
-                parent=glossary_name,
-                category=category,
-                category_id=category_id
+            self._call(
+                lambda: self.client.create_glossary_category(parent=glossary_name, category=category, category_id=category_id),
+                f"create_glossary_category({category_id})",
             )
             print(f"Category '{display_name}' created.")
         except AlreadyExists:
@@ -152,10 +325,9 @@ class DataplexGlossaryClient:
         
         try:
             # Fix: RPC parent must always be the Glossary (API endpoint requirement)
-            self.client.create_glossary_term(
-                parent=glossary_name, 
-                term=term,
-                term_id=term_id
+            self._call(
+                lambda: self.client.create_glossary_term(parent=glossary_name, term=term, term_id=term_id),
+                f"create_glossary_term({term_id})",
             )
             print(f"Term '{display_name}' created under {parent_category_id if parent_category_id else 'Root'}.")
         except AlreadyExists:
@@ -165,12 +337,319 @@ class DataplexGlossaryClient:
             print(f"Error creating term {term_id} under category: {e}. Trying root...")
             try:
                 term.parent = glossary_name
-                self.client.create_glossary_term(
-                    parent=glossary_name, 
-                    term=term,
-                    term_id=term_id
+                if parent_category_id:
+                    term.labels = dict(labels or {}, **{FALLBACK_PARENT_LABEL: parent_category_id})
+                self._call(
+                    lambda: self.client.create_glossary_term(parent=glossary_name, term=term, term_id=term_id),
+                    f"create_glossary_term({term_id}, root)",
                 )
                 print(f"Term '{display_name}' created under Root (Fallback).")
             except Exception as e2:
                 print(f"Error creating term {term_id}: {e2}")
                 raise e2
+
+    def _call(self, func, description: str):
+        """
+        Runs an RPC through the shared Dataplex rate limiter; returns `(result, attempts)`.
+        A quota error from any worker slows down and pauses every Dataplex caller.
+        """
+        attempts = [1]
+
+        def _on_retry(error, attempt, delay):
+            attempts[0] = attempt + 1
+
+        result = retry_call(
+            func,
+            max_attempts=self.max_retries,
+            base_delay=2.0,
+            max_delay=60.0,
+            description=description,
+            on_retry=_on_retry,
+            api="dataplex",
+        )
+        return result, attempts[0]
+
+    @staticmethod
+    def _desired_state(glossary_json: Union[str, dict]):
+        """
+        Flattens a glossary proposal into `{category_id: spec}` and `{term_id: spec}`,
+        keyed by the stable resource ids used in Dataplex.
+        """
+        data = json.loads(glossary_json) if isinstance(glossary_json, str) else glossary_json
+        categories: Dict[str, dict] = {}
+        terms: Dict[str, dict] = {}
+        for category in data.get("glossary", {}).get("categories", []):
+            category_id = glossary_resource_id(category.get("id") or category.get("display_name", ""))
+            categories[category_id] = {
+                "id": category_id,
+                "display_name": category.get("display_name", category_id),
+                "description": category.get("description", ""),
+                "labels": _clean_labels(category.get("labels")) or {},
+            }
+            for term in category.get("terms", []):
+                term_id = glossary_resource_id(term.get("term", ""))
+                terms.setdefault(term_id, {
+                    "id": term_id,
+                    "display_name": term.get("term", term_id),
+                    "description": term.get("definition", ""),
+                    "labels": _clean_labels(term.get("labels")) or {},
+                    "category_id": category_id,
+                })
+        return categories, terms
+
+    def _publish_category(self, glossary_name: str, spec: dict) -> PublishOutcome:
+        request = dataplex_v1.GlossaryCategory(
+            display_name=spec["display_name"],
+            description=spec["description"],
+            labels=spec["labels"],
+        )
+        request.parent = glossary_name
+        try:
+            _, attempts = self._call(
+                lambda: self.client.create_glossary_category(parent=glossary_name, category=request, category_id=spec["id"]),
+                f"create_glossary_category({spec['id']})",
+            )
+            return PublishOutcome("category", spec["id"], "created", attempts)
+        except AlreadyExists:
+            return PublishOutcome("category", spec["id"], "exists")
+        except Exception as e:
+            return PublishOutcome("category", spec["id"], "failed", error=str(e))
+
+    def _publish_term(self, glossary_name: str, spec: dict) -> PublishOutcome:
+        term_id, category_id = spec["id"], spec["category_id"]
+        request = dataplex_v1.GlossaryTerm(
+            display_name=spec["display_name"],
+            description=spec["description"],
+            labels=spec["labels"],
+        )
+        request.parent = f"{glossary_name}/categories/{category_id}" if category_id else glossary_name
+
+        def _create():
+            return self.client.create_glossary_term(parent=glossary_name, term=request, term_id=term_id)
+
+        try:
+            _, attempts = self._call(_create, f"create_glossary_term({term_id})")
+            return PublishOutcome("term", term_id, "created", attempts)
+        except AlreadyExists:
+            return PublishOutcome("term", term_id, "exists")
+        except Exception as e:
+            if is_transient_error(e) or not category_id:
+                return PublishOutcome("term", term_id, "failed", error=str(e))
+            # Same fallback as create_term: stricter validation may reject the category parent
+            request.parent = glossary_name
+            request.labels = dict(spec["labels"], **{FALLBACK_PARENT_LABEL: category_id})
+            try:
+                _, attempts = self._call(_create, f"create_glossary_term({term_id}, root)")
+                return PublishOutcome("term", term_id, "created", attempts + 1)
+            except AlreadyExists:
+                return PublishOutcome("term", term_id, "exists")
+            except Exception as e2:
+                return PublishOutcome("term", term_id, "failed", error=str(e2))
+
+    @staticmethod
+    def _checkpointed(publish, kind: str, ledger: Optional[LedgerRun]):
+        """
+        Wraps a per-item publish function so items already published in the run being
+        resumed are skipped, and each item is recorded in the ledger once it exists.
+        """
+        if ledger is None:
+            return publish
+
+        def checkpointed(spec: dict) -> PublishOutcome:
+            item_id, spec_hash = f"{kind}:{spec['id']}", content_hash(spec)
+            if ledger.completed(item_id, PUBLISHED, spec_hash):
+                return PublishOutcome(kind, spec["id"], "resumed", attempts=0)
+            outcome = publish(spec)
+            if outcome.status != "failed":
+                ledger.record(item_id, PUBLISHED, spec_hash)
+            return outcome
+        return checkpointed
+
+    def _publish_terms(self, executor: ThreadPoolExecutor, glossary_name: str, specs: List[dict], start: float, ledger: Optional[LedgerRun] = None) -> List[PublishOutcome]:
+        outcomes = []
+        publish = self._checkpointed(lambda spec: self._publish_term(glossary_name, spec), "term", ledger)
+        for outcome in executor.map(publish, specs):
+            outcomes.append(outcome)
+            if outcome.status == "failed":
+                print(f"Error creating term {outcome.item_id}: {outcome.error}")
+            if len(outcomes) % 100 == 0:
+                rate = len(outcomes) / (time.monotonic() - start)
+                print(f"Terms published: {len(outcomes)}/{len(specs)} ({rate:.1f} items/s)")
+        return outcomes
+
+    @telemetry.timed("dataplex.publish_glossary")
+    def publish_glossary(self, glossary_json: Union[str, dict], glossary_id: str, max_workers: Optional[int] = None, ledger: Optional[LedgerRun] = None) -> PublishReport:
+        """
+        Publishes a glossary proposal (the JSON produced by `BusinessGlossaryGenerator`).
+
+        Categories are created first, then terms are fanned out over a bounded worker pool.
+        Quota errors (429 / RESOURCE_EXHAUSTED) pause the whole pool and are retried with
+        backoff; every category/term gets an outcome in the returned report.
+
+        With a `ledger`, each created category/term is recorded as it completes, and the
+        ones already published by the interrupted run being resumed are skipped ("resumed").
+        """
+        categories, terms = self._desired_state(glossary_json)
+        glossary_name = f"{self.parent}/glossaries/{glossary_id}"
+        report = PublishReport()
+        start = time.monotonic()
+
+        with TracedThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            publish_category = self._checkpointed(lambda c: self._publish_category(glossary_name, c), "category", ledger)
+            category_outcomes = list(executor.map(publish_category, categories.values()))
+            report.outcomes.extend(category_outcomes)
+            print(f"Categories published: {len(category_outcomes)} ({sum(o.status == 'failed' for o in category_outcomes)} failed).")
+
+            # Terms of a failed category are created at the glossary root
+            failed_categories = {o.item_id for o in category_outcomes if o.status == "failed"}
+            term_specs = [
+                dict(spec, category_id=None) if spec["category_id"] in failed_categories else spec
+                for spec in terms.values()
+            ]
+            report.outcomes.extend(self._publish_terms(executor, glossary_name, term_specs, start, ledger))
+
+        report.elapsed_seconds = time.monotonic() - start
+        print(f"Glossary {glossary_id} published: {report.summary()}")
+        return report
+
+    def _live_state(self, glossary_name: str):
+        """
+        Lists the live categories and terms once; returns them in the same shape as
+        `_desired_state` plus the number of list pages fetched.
+        """
+        categories: Dict[str, dict] = {}
+        terms: Dict[str, dict] = {}
+        pages = 0
+        try:
+            categories_pager, _ = self._call(lambda: self.client.list_glossary_categories(parent=glossary_name), "list_glossary_categories")
+            for page in categories_pager.pages:
+                pages += 1
+                for category in page.categories:
+                    category_id = category.name.rsplit("/", 1)[-1]
+                    categories[category_id] = {
+                        "id": category_id,
+                        "name": category.name,
+                        "display_name": category.display_name,
+                        "description": category.description,
+                        "labels": dict(category.labels or {}),
+                    }
+            terms_pager, _ = self._call(lambda: self.client.list_glossary_terms(parent=glossary_name), "list_glossary_terms")
+            for page in terms_pager.pages:
+                pages += 1
+                for term in page.terms:
+                    term_id = term.name.rsplit("/", 1)[-1]
+                    parent = term.parent or ""
+                    labels = dict(term.labels or {})
+                    fallback = labels.pop(FALLBACK_PARENT_LABEL, None)
+                    category_id = parent.rsplit("/", 1)[-1] if "/categories/" in parent else None
+                    terms[term_id] = {
+                        "id": term_id,
+                        "name": term.name,
+                        "display_name": term.display_name,
+                        "description": term.description,
+                        "labels": labels,
+                        # A root term created as a fallback still belongs to its category
+                        "category_id": category_id or fallback,
+                        "fallback_parent": fallback if category_id is None else None,
+                    }
+        except NotFound:
+            pass
+        return categories, terms, pages
+
+    @telemetry.timed("dataplex.diff_glossary")
+    def diff_glossary(self, glossary_json: Union[str, dict], glossary_id: str) -> GlossaryDiff:
+        """
+        Compares the proposal against the live glossary, keyed by stable resource ids.
+        """
+        glossary_name = f"{self.parent}/glossaries/{glossary_id}"
+        desired_categories, desired_terms = self._desired_state(glossary_json)
+        live_categories, live_terms, pages = self._live_state(glossary_name)
+        compared = ("display_name", "description", "labels")
+
+        diff = GlossaryDiff(list_rpcs=pages)
+        for category_id, spec in desired_categories.items():
+            live = live_categories.get(category_id)
+            if live is None:
+                diff.added_categories.append(spec)
+            elif any(live[k] != spec[k] for k in compared):
+                diff.changed_categories.append(dict(spec, name=live["name"]))
+        diff.removed_categories = [c["name"] for i, c in live_categories.items() if i not in desired_categories]
+
+        for term_id, spec in desired_terms.items():
+            live = live_terms.get(term_id)
+            if live is None:
+                diff.added_terms.append(spec)
+            elif live["category_id"] != spec["category_id"]:
+                diff.moved_terms.append(dict(spec, name=live["name"]))
+            elif any(live[k] != spec[k] for k in compared):
+                labels = dict(spec["labels"], **{FALLBACK_PARENT_LABEL: live["fallback_parent"]}) if live["fallback_parent"] else spec["labels"]
+                diff.changed_terms.append(dict(spec, name=live["name"], labels=labels))
+        diff.removed_terms = [t["name"] for i, t in live_terms.items() if i not in desired_terms]
+        return diff
+
+    def _update_item(self, kind: str, spec: dict) -> PublishOutcome:
+        mask = field_mask_pb2.FieldMask(paths=["display_name", "description", "labels"])
+        try:
+            if kind == "category":
+                item = dataplex_v1.GlossaryCategory(name=spec["name"], display_name=spec["display_name"], description=spec["description"], labels=spec["labels"])
+                rpc = lambda: self.client.update_glossary_category(category=item, update_mask=mask)
+            else:
+                item = dataplex_v1.GlossaryTerm(name=spec["name"], display_name=spec["display_name"], description=spec["description"], labels=spec["labels"])
+                rpc = lambda: self.client.update_glossary_term(term=item, update_mask=mask)
+            _, attempts = self._call(rpc, f"update_glossary_{kind}({spec['id']})")
+            return PublishOutcome(kind, spec["id"], "updated", attempts)
+        except Exception as e:
+            return PublishOutcome(kind, spec["id"], "failed", error=str(e))
+
+    def _delete_item(self, kind: str, name: str) -> PublishOutcome:
+        rpc = self.client.delete_glossary_category if kind == "category" else self.client.delete_glossary_term
+        item_id = name.rsplit("/", 1)[-1]
+        try:
+            _, attempts = self._call(lambda: rpc(name=name), f"delete_glossary_{kind}({item_id})")
+            return PublishOutcome(kind, item_id, "deleted", attempts)
+        except NotFound:
+            return PublishOutcome(kind, item_id, "deleted")
+        except Exception as e:
+            return PublishOutcome(kind, item_id, "failed", error=str(e))
+
+    @telemetry.timed("dataplex.apply_glossary_diff")
+    def apply_glossary_diff(self, diff: GlossaryDiff, glossary_id: str, max_workers: Optional[int] = None) -> PublishReport:
+        """
+        Applies a diff with the minimal set of create/update/delete calls:
+        categories are created/updated first, then terms; removals run last so
+        terms are never left under a category that is about to disappear.
+        """
+        glossary_name = f"{self.parent}/glossaries/{glossary_id}"
+        report = PublishReport()
+        start = time.monotonic()
+
+        with TracedThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            report.outcomes.extend(executor.map(lambda c: self._publish_category(glossary_name, c), diff.added_categories))
+            report.outcomes.extend(executor.map(lambda c: self._update_item("category", c), diff.changed_categories))
+
+            # Moved terms are recreated under their new parent (the parent of a term is not updatable)
+            report.outcomes.extend(executor.map(lambda t: self._delete_item("term", t["name"]), diff.moved_terms))
+            report.outcomes.extend(self._publish_terms(executor, glossary_name, diff.added_terms + diff.moved_terms, start))
+            report.outcomes.extend(executor.map(lambda t: self._update_item("term", t), diff.changed_terms))
+
+            report.outcomes.extend(executor.map(lambda n: self._delete_item("term", n), diff.removed_terms))
+            report.outcomes.extend(executor.map(lambda n: self._delete_item("category", n), diff.removed_categories))
+
+        report.elapsed_seconds = time.monotonic() - start
+        print(f"Glossary {glossary_id} reconciled: {report.summary()}")
+        return report
+
+    @telemetry.timed("dataplex.reconcile_glossary")
+    def reconcile_glossary(self, glossary_json: Union[str, dict], glossary_id: str, dry_run: bool = False, max_workers: Optional[int] = None) -> Optional[PublishReport]:
+        """
+        Brings the live glossary in line with the proposal without emptying it first.
+        With `dry_run`, only prints the diff and the estimated RPC count.
+        """
+        diff = self.diff_glossary(glossary_json, glossary_id)
+        print(diff.describe())
+        if dry_run:
+            return None
+        if diff.is_empty:
+            print(f"Glossary {glossary_id} is already up to date.")
+            return PublishReport()
+        return self.apply_glossary_diff(diff, glossary_id, max_workers=max_workers)
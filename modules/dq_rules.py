@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Canonical rule kinds. The model writes `type` freely ("NOT NULL", "SqlAssertion",
+# "SET_MEMBERSHIP"...), so every consumer (local evaluation, SQL compilation, YAML
+# export) works on the normalized kind instead.
+NOT_NULL = "NOT_NULL"
+UNIQUENESS = "UNIQUENESS"
+REGEX = "REGEX"
+SET = "SET"
+RANGE = "RANGE"
+SQL_ASSERTION = "SQL_ASSERTION"
+UNSUPPORTED = "UNSUPPORTED"
+
+_TYPE_ALIASES = {
+    NOT_NULL: {"NOT_NULL", "NOTNULL", "NON_NULL", "COMPLETENESS", "REQUIRED", "NULL_CHECK"},
+    UNIQUENESS: {"UNIQUENESS", "UNIQUE", "DISTINCT", "PRIMARY_KEY"},
+    REGEX: {"REGEX", "REGEXP", "PATTERN", "REGEX_MATCH", "FORMAT"},
+    SET: {"SET", "SET_MEMBERSHIP", "IN_SET", "SET_CHECK", "ACCEPTED_VALUES", "VALUE_SET", "ALLOWED_VALUES", "ENUM"},
+    RANGE: {"RANGE", "MIN_MAX", "BETWEEN", "RANGE_CHECK", "VALUE_RANGE"},
+    SQL_ASSERTION: {"SQL_ASSERTION", "SQLASSERTION", "SQL", "ROW_CONDITION", "SQL_EXPRESSION", "CUSTOM_SQL", "SQL_CHECK"},
+}
+_KIND_BY_ALIAS = {alias: kind for kind, aliases in _TYPE_ALIASES.items() for alias in aliases}
+
+
+def _first(mapping: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        if mapping.get(key) is not None:
+            return mapping[key]
+    return None
+
+
+def _type_key(value: str) -> str:
+    # "SqlAssertion" -> "SQL_ASSERTION", "not-null" -> "NOT_NULL"
+    value = re.sub(r"(?<=[a-z])(?=[A-Z])", "_", value.strip())
+    return re.sub(r"[^A-Z0-9]+", "_", value.upper()).strip("_")
+
+
+def rule_id(rule: dict) -> str:
+    """
+    Identifier used for the Dataplex YAML (`pbt_rule_id`), kept in one place.
+    """
+    return f"rule_{rule.get('column')}_{rule.get('dimension')}".lower()
+
+
+@dataclass
+class NormalizedRule:
+    """
+    A proposed rule reduced to a canonical kind and parameters.
+    """
+    rule_id: str
+    kind: str
+    column: Optional[str]
+    table: Optional[str] = None
+    dimension: Optional[str] = None
+    description: Optional[str] = None
+    threshold: float = 1.0
+    pattern: Optional[str] = None
+    values: List[Any] = field(default_factory=list)
+    min_value: Any = None
+    max_value: Any = None
+    strict_min: bool = False
+    strict_max: bool = False
+    sql_expression: Optional[str] = None
+    ignore_null: bool = False
+    source: dict = field(default_factory=dict)
+
+
+def normalize_rule(rule: dict) -> NormalizedRule:
+    """
+    Maps a proposed rule (as validated by `QualityRule`) to a `NormalizedRule`.
+
+    The kind comes from `type` when it is a known alias, otherwise from the parameters
+    present (pattern, values, min/max, SQL) and finally from the dimension
+    (COMPLETENESS -> NOT_NULL, UNIQUENESS -> UNIQUENESS). Rules that cannot be mapped
+    get `UNSUPPORTED`.
+    """
+    params = rule.get("parameters") or {}
+    table = rule.get("table")
+    if table and "." in table:
+        table = table.split(".")[-1]
+    normalized = NormalizedRule(
+        rule_id=rule_id(rule),
+        kind=UNSUPPORTED,
+        column=rule.get("column"),
+        table=table,
+        dimension=(rule.get("dimension") or "").upper() or None,
+        description=rule.get("description"),
+        threshold=float(rule.get("threshold", params.get("threshold", 1.0)) or 1.0),
+        pattern=_first(params, "pattern", "regex", "regexp"),
+        values=list(_first(params, "values", "allowed_values", "accepted_values", "set", "value_set") or []),
+        min_value=_first(params, "min", "min_value", "minimum", "lower_bound"),
+        max_value=_first(params, "max", "max_value", "maximum", "upper_bound"),
+        strict_min=bool(params.get("strict_min", False)),
+        strict_max=bool(params.get("strict_max", False)),
+        sql_expression=rule.get("sql_expression") or _first(params, "sql_expression", "expression", "sql", "condition"),
+        ignore_null=bool(params.get("ignore_null", False)),
+        source=rule,
+    )
+
+    kind = _KIND_BY_ALIAS.get(_type_key(rule.get("type") or ""))
+    if kind is None:
+        if normalized.sql_expression:
+            kind = SQL_ASSERTION
+        elif normalized.pattern:
+            kind = REGEX
+        elif normalized.values:
+            kind = SET
+        elif normalized.min_value is not None or normalized.max_value is not None:
+            kind = RANGE
+        else:
+            kind = {"COMPLETENESS": NOT_NULL, "UNIQUENESS": UNIQUENESS}.get(normalized.dimension or "")
+
+    # A kind whose mandatory parameter is missing cannot be evaluated
+    missing = (
+        (kind == REGEX and not normalized.pattern)
+        or (kind == SET and not normalized.values)
+        or (kind == RANGE and normalized.min_value is None and normalized.max_value is None)
+        or (kind == SQL_ASSERTION and not normalized.sql_expression)
+        or (kind in (NOT_NULL, UNIQUENESS, REGEX, SET, RANGE) and not normalized.column)
+    )
+    normalized.kind = UNSUPPORTED if kind is None or missing else kind
+    return normalized
+
+
+def normalize_rules(rules: List[dict]) -> List[NormalizedRule]:
+    """
+    Normalizes a proposal, making rule ids unique (`_2`, `_3`... for repeated
+    column/dimension pairs) so results can be keyed by id.
+    """
+    normalized = [normalize_rule(r) for r in rules]
+    seen: Dict[str, int] = {}
+    for rule in normalized:
+        seen[rule.rule_id] = seen.get(rule.rule_id, 0) + 1
+        if seen[rule.rule_id] > 1:
+            rule.rule_id = f"{rule.rule_id}_{seen[rule.rule_id]}"
+    return normalized
@@ -0,0 +1,182 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.retry import retry_call
+from modules.dq_rules import NOT_NULL, RANGE, REGEX, SET, SQL_ASSERTION, UNIQUENESS, NormalizedRule
+from modules.local_dq import RuleResult
+
+# Dataplex SQL rules reference the scanned table as ${data()}
+_DATA_PLACEHOLDER = re.compile(r"\$\{data\(\)\}")
+
+
+def sql_string(value: str) -> str:
+    """
+    BigQuery string literal (backslashes and quotes escaped).
+    """
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n") + "'"
+
+
+def sql_literal(value: Any) -> str:
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    # Strings compare against DATE/TIMESTAMP columns through BigQuery's literal coercion
+    return sql_string(value)
+
+
+def sql_identifier(column: str) -> str:
+    # Nested fields (`address.city`) are quoted part by part
+    return ".".join(f"`{part}`" for part in column.split("."))
+
+
+def _is_full_query(expression: str) -> bool:
+    return expression.lstrip().lower().startswith(("select", "with"))
+
+
+@dataclass
+class CompiledQuery:
+    """
+    Single-pass SQL for every rule of one table. `rules[i]` is read from the result
+    columns `r{i}_evaluated` / `r{i}_passed`. Full-query SQL assertions cannot be
+    folded into the aggregate and are kept in `assertions` (one query each, returning
+    the failing rows as Dataplex does).
+    """
+    table_ref: str
+    sql: str
+    rules: List[NormalizedRule] = field(default_factory=list)
+    assertions: Dict[str, str] = field(default_factory=dict)
+    assertion_rules: List[NormalizedRule] = field(default_factory=list)
+    skipped: List[NormalizedRule] = field(default_factory=list)
+
+
+def _passed_expression(rule: NormalizedRule, alias: Optional[str]) -> str:
+    column = sql_identifier(rule.column) if rule.column else None
+    if rule.kind == NOT_NULL:
+        return f"COUNTIF({column} IS NOT NULL)"
+    if rule.kind == UNIQUENESS:
+        return f"COUNTIF({column} IS NOT NULL AND {alias} = 1)"
+    if rule.kind == REGEX:
+        return f"COUNTIF(REGEXP_CONTAINS(CAST({column} AS STRING), {sql_string(rule.pattern)}))"
+    if rule.kind == SET:
+        values = ", ".join(sql_string(v) for v in rule.values)
+        return f"COUNTIF(CAST({column} AS STRING) IN ({values}))"
+    if rule.kind == RANGE:
+        conditions = []
+        if rule.min_value is not None:
+            conditions.append(f"{column} {'>' if rule.strict_min else '>='} {sql_literal(rule.min_value)}")
+        if rule.max_value is not None:
+            conditions.append(f"{column} {'<' if rule.strict_max else '<='} {sql_literal(rule.max_value)}")
+        return f"COUNTIF({' AND '.join(conditions)})"
+    if rule.kind == SQL_ASSERTION:
+        return f"COUNTIF(COALESCE(({rule.sql_expression}), FALSE))"
+    raise ValueError(f"Rule kind {rule.kind} cannot be compiled")
+
+
+def compile_table_query(table_ref: str, rules: List[NormalizedRule], sample_percent: Optional[float] = None,
+                        partition_filter: Optional[str] = None) -> CompiledQuery:
+    """
+    Compiles every rule of a table into one aggregate query, i.e. one table scan
+    instead of one per rule. Only the referenced columns are read (BigQuery prunes the
+    `SELECT *` of the CTE), uniqueness uses a window count per column inside the same
+    pass, and the optional `TABLESAMPLE SYSTEM` / partition filter are applied once.
+
+    Args:
+        table_ref (str): `project.dataset.table`.
+        rules (List[NormalizedRule]): Rules of this table (`modules.dq_rules.normalize_rules`).
+        sample_percent (Optional[float]): Block sample percentage (0-100).
+        partition_filter (Optional[str]): SQL predicate, e.g. `_PARTITIONDATE = CURRENT_DATE()`.
+    """
+    compiled = CompiledQuery(table_ref=table_ref, sql="")
+    window_aliases: Dict[str, str] = {}
+    selects = ["COUNT(*) AS total_rows"]
+    for rule in rules:
+        if rule.kind == SQL_ASSERTION and _is_full_query(rule.sql_expression):
+            compiled.assertion_rules.append(rule)
+            continue
+        if rule.kind not in (NOT_NULL, UNIQUENESS, REGEX, SET, RANGE, SQL_ASSERTION):
+            compiled.skipped.append(rule)
+            continue
+        alias = None
+        if rule.kind == UNIQUENESS:
+            alias = window_aliases.setdefault(rule.column, f"__dup_{len(window_aliases)}")
+        i = len(compiled.rules)
+        compiled.rules.append(rule)
+        evaluated = f"COUNTIF({sql_identifier(rule.column)} IS NOT NULL)" if rule.ignore_null and rule.column else "COUNT(*)"
+        selects.append(f"{evaluated} AS r{i}_evaluated")
+        selects.append(f"{_passed_expression(rule, alias)} AS r{i}_passed")
+
+    source = f"`{table_ref}`"
+    if sample_percent:
+        source += f" TABLESAMPLE SYSTEM ({sample_percent:g} PERCENT)"
+    windows = "".join(
+        f",\n    COUNT(*) OVER (PARTITION BY {sql_identifier(column)}) AS {alias}" for column, alias in window_aliases.items()
+    )
+    where = f" WHERE {partition_filter}" if partition_filter else ""
+    compiled.sql = (
+        f"WITH src AS (\n  SELECT *{windows}\n  FROM {source}{where}\n)\n"
+        "SELECT\n  " + ",\n  ".join(selects) + "\nFROM src"
+    )
+    # Full-query assertions read the same sampled/filtered source
+    data = f"(SELECT * FROM {source}{where})"
+    compiled.assertions = {r.rule_id: _DATA_PLACEHOLDER.sub(lambda _: data, r.sql_expression) for r in compiled.assertion_rules}
+    return compiled
+
+
+def compile_rule_set(project_id: str, dataset_id: str, rules: List[NormalizedRule], sample_percent: Optional[float] = None,
+                     partition_filters: Optional[Dict[str, str]] = None) -> List[CompiledQuery]:
+    """
+    One `CompiledQuery` per table referenced by the rules (in first-seen order).
+    """
+    partition_filters = partition_filters or {}
+    tables = list(dict.fromkeys(r.table for r in rules if r.table))
+    return [
+        compile_table_query(
+            f"{project_id}.{dataset_id}.{table}",
+            [r for r in rules if r.table == table],
+            sample_percent=sample_percent,
+            partition_filter=partition_filters.get(table),
+        )
+        for table in tables
+    ]
+
+
+def results_from_row(compiled: CompiledQuery, row: Dict[str, Any]) -> List[RuleResult]:
+    """
+    Turns the single result row of a compiled query into one `RuleResult` per rule.
+    """
+    results = []
+    for i, rule in enumerate(compiled.rules):
+        evaluated, passed = int(row[f"r{i}_evaluated"] or 0), int(row[f"r{i}_passed"] or 0)
+        ratio = passed / evaluated if evaluated else 1.0
+        results.append(RuleResult(rule.rule_id, rule.kind, rule.column, "PASSED" if ratio >= rule.threshold else "FAILED",
+                                  evaluated, passed, rule.threshold))
+    return results
+
+
+def run_compiled_query(client, compiled: CompiledQuery, maximum_bytes_billed: Optional[int] = None) -> List[RuleResult]:
+    """
+    Runs a compiled query (plus its separate assertions) with a BigQuery client.
+    """
+    from google.cloud import bigquery
+
+    job_config = bigquery.QueryJobConfig(maximum_bytes_billed=maximum_bytes_billed) if maximum_bytes_billed else None
+    def first_row(sql: str, description: str):
+        return retry_call(lambda: next(iter(client.query(sql, job_config=job_config).result())), description=description, api="bigquery")
+
+    row = dict(first_row(compiled.sql, "rule query").items())
+    results = results_from_row(compiled, row)
+
+    total = int(row["total_rows"] or 0)
+    for rule in compiled.assertion_rules:
+        sql = compiled.assertions[rule.rule_id]
+        failing = first_row(f"SELECT COUNT(*) AS failing FROM ({sql})", f"assertion {rule.rule_id}")["failing"]
+        passed = max(total - int(failing), 0)
+        ratio = passed / total if total else 1.0
+        results.append(RuleResult(rule.rule_id, SQL_ASSERTION, rule.column,
+                                  "PASSED" if ratio >= rule.threshold else "FAILED", total, passed, rule.threshold))
+    for rule in compiled.skipped:
+        results.append(RuleResult(rule.rule_id, rule.kind, rule.column, "SKIPPED", threshold=rule.threshold,
+                                  message=f"Unsupported rule type: {rule.source.get('type')}"))
+    return results
@@ -0,0 +1,132 @@
+import fnmatch
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def parse_targets(specs: Iterable[str], default_project: str, list_datasets: Optional[Callable[[str], List[str]]] = None) -> List[Tuple[str, str]]:
+    """
+    Expands target specs into unique `(project, dataset)` pairs, keeping first-seen order.
+
+    A spec is `dataset` (default project) or `project.dataset`; the dataset part may be
+    a glob (`sales_*`), resolved with `list_datasets(project)`. Blank lines and `#`
+    comments are ignored so specs can come straight from a targets file.
+    """
+    targets: List[Tuple[str, str]] = []
+    seen = set()
+    for spec in specs:
+        spec = spec.split("#", 1)[0].strip()
+        if not spec:
+            continue
+        project, _, dataset = spec.rpartition(".")
+        project = project or default_project
+        if any(ch in dataset for ch in "*?["):
+            if list_datasets is None:
+                raise ValueError(f"Glob target '{spec}' needs a dataset lister")
+            matches = sorted(d for d in list_datasets(project) if fnmatch.fnmatchcase(d, dataset))
+            if not matches:
+                print(f"⚠️ El patrón '{spec}' no coincide con ningún dataset.")
+        else:
+            matches = [dataset]
+        for match in matches:
+            if (project, match) not in seen:
+                seen.add((project, match))
+                targets.append((project, match))
+    return targets
+
+
+def read_target_file(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+class BoundedModel:
+    """
+    Wraps a generative model so that at most `semaphore`'s value of `generate_content`
+    calls are in flight across every dataset of the run. A stream holds its slot
+    until it is fully consumed.
+    """
+
+    def __init__(self, model, semaphore: threading.BoundedSemaphore):
+        self.model = model
+        self.semaphore = semaphore
+
+    def generate_content(self, *args, stream: bool = False, **kwargs):
+        if stream:
+            return self._bounded_stream(args, kwargs)
+        with self.semaphore:
+            return self.model.generate_content(*args, **kwargs)
+
+    def _bounded_stream(self, args, kwargs):
+        with self.semaphore:
+            yield from self.model.generate_content(*args, stream=True, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+@dataclass
+class TargetResult:
+    project_id: str
+    dataset_id: str
+    status: str  # "ok" | "unchanged" | "empty" | "no_rules" | "failed"
+    tables: int = 0
+    rules: int = 0
+    output_file: Optional[str] = None
+    pr_url: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def target(self) -> str:
+        return f"{self.project_id}.{self.dataset_id}"
+
+
+@dataclass
+class RunReport:
+    """
+    Consolidated outcome of a fan-out run, one entry per target.
+    """
+    results: List[TargetResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    stats: Dict[str, float] = field(default_factory=dict)  # Run-level figures (e.g. rule reuse hit ratio)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        return counts
+
+    @property
+    def failed(self) -> List[TargetResult]:
+        return [r for r in self.results if r.status == "failed"]
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{k}={v}" for k, v in sorted(self.counts.items()))
+        rules = sum(r.rules for r in self.results)
+        return f"{len(self.results)} targets ({counts}), {rules} rules in {self.elapsed_seconds:.1f}s"
+
+    def table(self) -> str:
+        width = max([len(r.target) for r in self.results] + [6])
+        lines = [f"{'TARGET'.ljust(width)}  {'STATUS':9}  {'TABLES':>6}  {'RULES':>5}  {'SECS':>6}  DETAIL"]
+        for r in self.results:
+            detail = r.error or r.pr_url or r.output_file or ""
+            lines.append(f"{r.target.ljust(width)}  {r.status:9}  {r.tables:>6}  {r.rules:>5}  {r.elapsed_seconds:>6.1f}  {detail}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "counts": self.counts,
+            "stats": self.stats,
+            "results": [asdict(r) for r in self.results],
+        }
+
+    def write(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
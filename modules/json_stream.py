@@ -0,0 +1,214 @@
+import json
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from core import telemetry
+
+# Trailing commas before a closing bracket, the most common defect in model output.
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def repair_json_fragment(text: str) -> str:
+    """
+    Fixes common defects of model-produced JSON objects: trailing commas (outside
+    strings) and stray code fences. Raw control characters inside strings are
+    tolerated by `loads_lenient`.
+    """
+    text = text.replace("```json", "").replace("```", "").strip()
+    out = []
+    in_string = escaped = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == ",":
+            match = _TRAILING_COMMA.match(text, i)
+            if not match:
+                out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def loads_lenient(text: str):
+    """
+    `json.loads` that first applies `repair_json_fragment`.
+    """
+    return json.loads(repair_json_fragment(text), strict=False)
+
+
+def close_truncated_json(text: str) -> str:
+    """
+    Turns a truncated JSON document into a parseable one: cuts it back to the last
+    complete member/element and closes every bracket still open at that point.
+    """
+    stack: List[str] = []
+    in_string = escaped = False
+    cut_at, cut_closers = 0, ""
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut_at, cut_closers = i + 1, "".join(reversed(stack))
+        elif ch in "}]" and stack:
+            stack.pop()
+            cut_at, cut_closers = i + 1, "".join(reversed(stack))
+        elif ch == ",":
+            cut_at, cut_closers = i, "".join(reversed(stack))
+    return text[:cut_at] + cut_closers
+
+
+class JsonArrayStreamParser:
+    """
+    Incrementally extracts the object elements of one array inside a JSON document,
+    e.g. `("rules",)` or `("glossary", "categories")`, while the text arrives in chunks.
+
+    `feed()` returns the raw text of every element completed by the chunk, so callers
+    can act on each item as soon as it is closed. Text outside the document (code
+    fences, prose) is ignored and an unfinished tail is simply never emitted.
+    """
+
+    def __init__(self, path: Tuple[str, ...]):
+        self.path = tuple(path)
+        self._stack: List[dict] = []  # {"type": "obj"|"arr", "key": current key (objects)}
+        self._in_string = False
+        self._escaped = False
+        self._string_chars: List[str] = []
+        self._target_depth: Optional[int] = None  # Stack depth of the target array
+        self._element: Optional[List[str]] = None  # Text of the element being captured
+
+    @property
+    def pending(self) -> Optional[str]:
+        """
+        Text of the element still open when the stream ended (truncated output), if any.
+        """
+        return "".join(self._element) if self._element is not None else None
+
+    def _current_path(self) -> Optional[Tuple[str, ...]]:
+        if any(entry["type"] != "obj" for entry in self._stack):
+            return None
+        return tuple(entry["key"] for entry in self._stack)
+
+    def feed(self, chunk: str) -> List[str]:
+        completed = []
+        for ch in chunk:
+            if self._element is not None:
+                self._element.append(ch)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    top = self._stack[-1] if self._stack else None
+                    if top and top["type"] == "obj" and top["expect_key"]:
+                        try:
+                            top["key"] = json.loads('"' + "".join(self._string_chars) + '"', strict=False)
+                        except ValueError:
+                            top["key"] = "".join(self._string_chars)
+                        top["expect_key"] = False
+                    continue
+                self._string_chars.append(ch)
+                continue
+
+            if ch == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._string_chars = []
+            elif ch == "{":
+                if self._target_depth is not None and len(self._stack) == self._target_depth and self._element is None:
+                    self._element = [ch]
+                self._stack.append({"type": "obj", "key": None, "expect_key": True})
+            elif ch == "[":
+                if self._target_depth is None and self._current_path() == self.path:
+                    self._target_depth = len(self._stack) + 1
+                self._stack.append({"type": "arr"})
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if self._target_depth is not None:
+                    if ch == "}" and len(self._stack) == self._target_depth and self._element is not None:
+                        completed.append("".join(self._element))
+                        self._element = None
+                    elif ch == "]" and len(self._stack) == self._target_depth - 1:
+                        self._target_depth = None
+            elif ch == ",":
+                if self._stack and self._stack[-1]["type"] == "obj":
+                    self._stack[-1]["expect_key"] = True
+        return completed
+
+
+def iter_array_items(chunks: Iterable[str], path: Tuple[str, ...], salvage_tail: bool = False) -> Iterator[dict]:
+    """
+    Yields each parsed element of the array at `path` as soon as it is complete.
+    Elements that cannot be parsed even after repair are skipped with a warning.
+
+    With `salvage_tail`, an element cut off by a truncated response is closed with
+    `close_truncated_json` and yielded with whatever members were complete (useful
+    for nested items such as a category whose last terms were lost).
+    """
+    parser = JsonArrayStreamParser(path)
+    for chunk in chunks:
+        for raw in parser.feed(chunk):
+            try:
+                yield loads_lenient(raw)
+            except ValueError as e:
+                print(f"⚠️ Elemento JSON descartado ({e}): {raw[:80]}...")
+
+    if salvage_tail and parser.pending:
+        try:
+            item = loads_lenient(close_truncated_json(parser.pending))
+            print("⚠️ Respuesta truncada: se recupera la parte completa del último elemento.")
+            yield item
+        except ValueError as e:
+            print(f"⚠️ Respuesta truncada, último elemento descartado: {e}")
+
+
+def extract_array_items(text: str, path: Tuple[str, ...]) -> List[dict]:
+    """
+    Non-streaming variant: recovers every complete element from a (possibly truncated
+    or malformed) document.
+    """
+    return list(iter_array_items([text], path))
+
+
+def iter_response_text(responses: Iterable) -> Iterator[str]:
+    """
+    Text of each streamed Gemini chunk. Chunks without text (e.g. the final one
+    carrying only the finish reason) are skipped. The token usage of the response
+    (reported in full on the last chunk) and its size are counted once it ends.
+    """
+    usage = None
+    for chunk in responses:
+        usage = getattr(chunk, "usage_metadata", None) or usage
+        try:
+            text = chunk.text
+        except (ValueError, AttributeError):
+            continue
+        if text:
+            telemetry.count(telemetry.BYTES_RECEIVED, len(text.encode("utf-8")))
+            yield text
+    telemetry.record_usage(usage)
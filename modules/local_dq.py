@@ -0,0 +1,311 @@
+import os
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from modules.dq_rules import NOT_NULL, RANGE, REGEX, SET, SQL_ASSERTION, UNIQUENESS, NormalizedRule
+
+# pyarrow and duckdb are optional: only needed to validate rules locally.
+DEFAULT_BATCH_SIZE = 128 * 1024
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError("Local rule validation needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _optional_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return duckdb
+
+
+def detect_format(path: str) -> str:
+    """
+    `parquet` or `csv`, from the extension of the file (or of the files in a directory).
+    """
+    names = [path] if os.path.isfile(path) else sorted(os.listdir(path))
+    for name in names:
+        lowered = name.lower()
+        if lowered.endswith((".csv", ".csv.gz")):
+            return "csv"
+        if lowered.endswith((".parquet", ".pq")):
+            return "parquet"
+    raise ValueError(f"Cannot detect the format of {path} (expected .parquet or .csv files)")
+
+
+@dataclass
+class RuleResult:
+    rule_id: str
+    kind: str
+    column: Optional[str]
+    status: str  # "PASSED" | "FAILED" | "SKIPPED" | "ERROR"
+    evaluated_rows: int = 0
+    passed_rows: int = 0
+    threshold: float = 1.0
+    message: Optional[str] = None
+
+    @property
+    def pass_ratio(self) -> Optional[float]:
+        if not self.evaluated_rows:
+            return None
+        return self.passed_rows / self.evaluated_rows
+
+    def to_dict(self) -> dict:
+        return dict(asdict(self), pass_ratio=self.pass_ratio)
+
+
+class _Accumulator:
+    """
+    Running evaluated/passed counts of one rule across record batches.
+    """
+
+    def __init__(self, rule: NormalizedRule):
+        self.rule = rule
+        self.evaluated = 0
+        self.passed = 0
+        self.error: Optional[str] = None
+
+    def update(self, column, pa, pc):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def _count(self, column, mask, pa, pc):
+        # Null handling as in Dataplex: nulls fail unless the rule ignores them
+        valid = pc.is_valid(column)
+        if self.rule.ignore_null:
+            self.evaluated += pc.sum(valid.cast(pa.int64())).as_py() or 0
+        else:
+            self.evaluated += len(column)
+        self.passed += pc.sum(pc.and_kleene(mask, valid).fill_null(False).cast(pa.int64())).as_py() or 0
+
+
+class _NotNull(_Accumulator):
+    def update(self, column, pa, pc):
+        self.evaluated += len(column)
+        self.passed += len(column) - column.null_count
+
+
+class _Regex(_Accumulator):
+    def __init__(self, rule: NormalizedRule):
+        super().__init__(rule)
+        # Dataplex REGEX uses REGEXP_CONTAINS semantics (search, not full match)
+        self.pattern = rule.pattern
+
+    def update(self, column, pa, pc):
+        if not pa.types.is_string(column.type) and not pa.types.is_large_string(column.type):
+            column = pc.cast(column, pa.string())
+        self._count(column, pc.match_substring_regex(column, self.pattern), pa, pc)
+
+
+class _Set(_Accumulator):
+    def __init__(self, rule: NormalizedRule):
+        super().__init__(rule)
+        self.value_set = None
+
+    def update(self, column, pa, pc):
+        # Values are compared as strings, so ["1", "2"] matches an INT64 column
+        strings = pc.cast(column, pa.string())
+        if self.value_set is None:
+            self.value_set = pa.array([str(v) for v in self.rule.values], type=pa.string())
+        self._count(strings, pc.is_in(strings, value_set=self.value_set), pa, pc)
+
+
+class _Range(_Accumulator):
+    def __init__(self, rule: NormalizedRule):
+        super().__init__(rule)
+        self.bounds = None
+
+    def _bound(self, value, column, pa):
+        if value is None:
+            return None
+        try:
+            return pa.scalar(value).cast(column.type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            # e.g. "2024-01-01" for a date column: parse through string
+            return pa.scalar(str(value)).cast(column.type)
+
+    def update(self, column, pa, pc):
+        if self.bounds is None:
+            self.bounds = (self._bound(self.rule.min_value, column, pa), self._bound(self.rule.max_value, column, pa))
+        low, high = self.bounds
+        mask = pa.array([True] * len(column))
+        if low is not None:
+            mask = pc.and_kleene(mask, (pc.greater if self.rule.strict_min else pc.greater_equal)(column, low))
+        if high is not None:
+            mask = pc.and_kleene(mask, (pc.less if self.rule.strict_max else pc.less_equal)(column, high))
+        self._count(column, mask, pa, pc)
+
+
+class _Uniqueness(_Accumulator):
+    """
+    Exact value counts merged across batches (memory grows with distinct values; with
+    DuckDB installed uniqueness is computed there instead, spilling to disk).
+    """
+
+    def __init__(self, rule: NormalizedRule):
+        super().__init__(rule)
+        self.counts: Counter = Counter()
+        self.nulls = 0
+
+    def update(self, column, pa, pc):
+        self.nulls += column.null_count
+        for item in pc.value_counts(column.drop_null()).to_pylist():
+            self.counts[item["values"]] += item["counts"]
+
+    def finish(self):
+        # Passing rows: those whose value appears exactly once
+        self.passed = sum(1 for c in self.counts.values() if c == 1)
+        self.evaluated = sum(self.counts.values()) + (0 if self.rule.ignore_null else self.nulls)
+
+
+_ARROW_ACCUMULATORS = {NOT_NULL: _NotNull, REGEX: _Regex, SET: _Set, RANGE: _Range, UNIQUENESS: _Uniqueness}
+
+# Dataplex SQL rules reference the scanned table as ${data()}
+_DATA_PLACEHOLDER = re.compile(r"\$\{data\(\)\}")
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class LocalRuleEvaluator:
+    """
+    Evaluates normalized DQ rules against a Parquet/CSV extract (a file or a directory
+    of files) without deploying a Dataplex scan.
+
+    Column rules are evaluated vectorized with pyarrow in a single streaming pass over
+    record batches, so extracts larger than memory are fine. SQL assertions (and
+    uniqueness, when DuckDB is installed) run in DuckDB over the same files.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, use_duckdb: bool = True):
+        self.batch_size = batch_size
+        self.duckdb = _optional_duckdb() if use_duckdb else None
+
+    def _source_sql(self, path: str, file_format: str) -> str:
+        pattern = os.path.join(path, "*") if os.path.isdir(path) else path
+        reader = "read_parquet" if file_format == "parquet" else "read_csv_auto"
+        return f"{reader}('{pattern}')"
+
+    def _evaluate_arrow(self, rules: List[NormalizedRule], path: str, file_format: str) -> Dict[str, _Accumulator]:
+        pa = _require_pyarrow()
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(path, format=file_format)
+        available = set(dataset.schema.names)
+        accumulators = {}
+        for rule in rules:
+            accumulator = _ARROW_ACCUMULATORS[rule.kind](rule)
+            if rule.column not in available:
+                accumulator.error = f"Column {rule.column} not found"
+            accumulators[rule.rule_id] = accumulator
+
+        columns = sorted({a.rule.column for a in accumulators.values() if not a.error})
+        if columns:
+            for batch in dataset.to_batches(columns=columns, batch_size=self.batch_size):
+                for accumulator in accumulators.values():
+                    if accumulator.error:
+                        continue
+                    try:
+                        accumulator.update(batch.column(accumulator.rule.column), pa, pc)
+                    except Exception as e:
+                        accumulator.error = str(e)
+        for accumulator in accumulators.values():
+            if not accumulator.error:
+                accumulator.finish()
+        return accumulators
+
+    def _evaluate_duckdb(self, rules: List[NormalizedRule], path: str, file_format: str) -> Dict[str, RuleResult]:
+        source = self._source_sql(path, file_format)
+        conn = self.duckdb.connect()
+        results = {}
+        try:
+            total = conn.execute(f"SELECT count(*) FROM {source}").fetchone()[0]
+            # Row conditions are evaluated together in one scan; full SELECT assertions
+            # (rows returned = failing rows, as in Dataplex SQL assertions) one by one
+            conditions = [r for r in rules if r.kind == SQL_ASSERTION and not r.sql_expression.lstrip().lower().startswith(("select", "with"))]
+            if conditions:
+                try:
+                    counts = conn.execute(
+                        "SELECT " + ", ".join(f"count_if(coalesce(({r.sql_expression}), false))" for r in conditions) + f" FROM {source}"
+                    ).fetchone()
+                    for rule, passed in zip(conditions, counts):
+                        results[rule.rule_id] = self._result(rule, total, passed)
+                except Exception:
+                    # One bad expression must not fail the others: retry them one by one
+                    for rule in conditions:
+                        try:
+                            passed = conn.execute(f"SELECT count_if(coalesce(({rule.sql_expression}), false)) FROM {source}").fetchone()[0]
+                            results[rule.rule_id] = self._result(rule, total, passed)
+                        except Exception as e:
+                            results[rule.rule_id] = RuleResult(rule.rule_id, rule.kind, rule.column, "ERROR", threshold=rule.threshold, message=str(e))
+
+            for rule in rules:
+                if rule.rule_id in results:
+                    continue
+                try:
+                    if rule.kind == SQL_ASSERTION:
+                        query = _DATA_PLACEHOLDER.sub(source, rule.sql_expression)
+                        failing = conn.execute(f"SELECT count(*) FROM ({query})").fetchone()[0]
+                        results[rule.rule_id] = self._result(rule, total, max(total - failing, 0))
+                    elif rule.kind == UNIQUENESS:
+                        column = _quote_identifier(rule.column)
+                        null_filter = f"WHERE {column} IS NOT NULL"
+                        unique, non_null = conn.execute(
+                            f"SELECT coalesce(sum(CASE WHEN c = 1 THEN 1 ELSE 0 END), 0), coalesce(sum(c), 0) "
+                            f"FROM (SELECT count(*) AS c FROM {source} {null_filter} GROUP BY {column})"
+                        ).fetchone()
+                        evaluated = non_null if rule.ignore_null else total
+                        results[rule.rule_id] = self._result(rule, evaluated, unique)
+                except Exception as e:
+                    results[rule.rule_id] = RuleResult(rule.rule_id, rule.kind, rule.column, "ERROR", threshold=rule.threshold, message=str(e))
+        finally:
+            conn.close()
+        return results
+
+    @staticmethod
+    def _result(rule: NormalizedRule, evaluated: int, passed: int) -> RuleResult:
+        ratio = passed / evaluated if evaluated else 1.0
+        status = "PASSED" if ratio >= rule.threshold else "FAILED"
+        return RuleResult(rule.rule_id, rule.kind, rule.column, status, evaluated, passed, rule.threshold)
+
+    def evaluate(self, rules: List[NormalizedRule], path: str, file_format: Optional[str] = None) -> List[RuleResult]:
+        """
+        Evaluates `rules` against the extract at `path`, returning one result per rule
+        in input order.
+        """
+        file_format = file_format or detect_format(path)
+        in_duckdb = [r for r in rules if r.kind == SQL_ASSERTION or (r.kind == UNIQUENESS and self.duckdb)]
+        in_arrow = [r for r in rules if r.kind in _ARROW_ACCUMULATORS and r.kind != UNIQUENESS or (r.kind == UNIQUENESS and not self.duckdb)]
+
+        results: Dict[str, RuleResult] = {}
+        if in_duckdb and self.duckdb:
+            results.update(self._evaluate_duckdb(in_duckdb, path, file_format))
+        if in_arrow:
+            for rule_id, accumulator in self._evaluate_arrow(in_arrow, path, file_format).items():
+                rule = accumulator.rule
+                if accumulator.error:
+                    results[rule_id] = RuleResult(rule_id, rule.kind, rule.column, "ERROR", threshold=rule.threshold, message=accumulator.error)
+                else:
+                    results[rule_id] = self._result(rule, accumulator.evaluated, accumulator.passed)
+
+        ordered = []
+        for rule in rules:
+            result = results.get(rule.rule_id)
+            if result is None:
+                reason = "SQL assertions need duckdb: pip install duckdb" if rule.kind == SQL_ASSERTION else f"Unsupported rule type: {rule.source.get('type')}"
+                result = RuleResult(rule.rule_id, rule.kind, rule.column, "SKIPPED", threshold=rule.threshold, message=reason)
+            ordered.append(result)
+        return ordered
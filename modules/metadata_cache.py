@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import List, Optional
+
+from modules.bigquery_metadata import TableMetadata, TableProfile
+
+
+def table_fingerprint(table: TableMetadata, salt: str = "") -> str:
+    """
+    Hash of the table schema and descriptions (nested fields included).
+
+    Args:
+        table (TableMetadata): Harvested table metadata.
+        salt (str): Extra input mixed into the hash (e.g. the model name generating rules),
+                    so cached results are invalidated when it changes.
+    """
+    payload = table.to_dict()
+    payload.pop("last_modified", None)
+    payload.pop("profile", None)
+    payload["salt"] = salt
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class MetadataCache:
+    """
+    Persistent SQLite cache of harvested table metadata and generated DQ rules.
+
+    Two levels of reuse per table (`project.dataset.table`):
+      - Metadata is served from the cache while the table `last_modified_time` is unchanged,
+        so the table does not need to be harvested again.
+      - Rules are served while the schema fingerprint (schema + descriptions + model) is
+        unchanged, so only changed tables are sent to the model. Data-only changes bump
+        `last_modified_time` but keep the rules.
+      - Data profiles are served while the table snapshot (`last_modified_time` plus the
+        profiling settings) is unchanged, so unchanged tables are not scanned again.
+
+    Entries older than `ttl_seconds` are ignored and purged; beyond `max_entries` the
+    least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = "output/cache/metadata_cache.sqlite3", ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tables (
+                table_ref TEXT PRIMARY KEY,
+                last_modified INTEGER,
+                fingerprint TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                rules_fingerprint TEXT,
+                rules TEXT,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                table_ref TEXT PRIMARY KEY,
+                snapshot TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.evict()
+
+    def _fresh_row(self, table_ref: str, columns: str) -> Optional[tuple]:
+        row = self._conn.execute(
+            f"SELECT {columns} FROM tables WHERE table_ref = ? AND created_at >= ?",
+            (table_ref, time.time() - self.ttl_seconds),
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("UPDATE tables SET accessed_at = ? WHERE table_ref = ?", (time.time(), table_ref))
+            self._conn.commit()
+        return row
+
+    def get_metadata(self, table_ref: str, last_modified: Optional[int]) -> Optional[TableMetadata]:
+        """
+        Returns the cached metadata if the table has not been modified since it was harvested.
+        """
+        if last_modified is None:
+            return None
+        with self._lock:
+            row = self._fresh_row(table_ref, "last_modified, metadata")
+        if row is None or row[0] != last_modified:
+            return None
+        return TableMetadata.from_dict(json.loads(row[1]))
+
+    def put_metadata(self, table_ref: str, table: TableMetadata):
+        """
+        Stores freshly harvested metadata. Cached rules survive only if the schema is unchanged.
+        """
+        now = time.time()
+        fingerprint = table_fingerprint(table)
+        metadata = table.to_dict()
+        metadata.pop("profile", None)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO tables (table_ref, last_modified, fingerprint, metadata, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(table_ref) DO UPDATE SET
+                    last_modified = excluded.last_modified,
+                    metadata = excluded.metadata,
+                    rules = CASE WHEN tables.fingerprint = excluded.fingerprint THEN tables.rules END,
+                    rules_fingerprint = CASE WHEN tables.fingerprint = excluded.fingerprint THEN tables.rules_fingerprint END,
+                    fingerprint = excluded.fingerprint,
+                    created_at = excluded.created_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (table_ref, table.last_modified, fingerprint, json.dumps(metadata), now, now),
+            )
+            self._conn.commit()
+
+    def get_rules(self, table_ref: str, fingerprint: str) -> Optional[List[dict]]:
+        """
+        Returns the cached rules generated for this exact schema fingerprint, if any.
+        """
+        with self._lock:
+            row = self._fresh_row(table_ref, "rules_fingerprint, rules")
+        if row is None or row[0] != fingerprint or row[1] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[1])
+
+    def put_rules(self, table_ref: str, fingerprint: str, rules: List[dict]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tables SET rules_fingerprint = ?, rules = ?, accessed_at = ? WHERE table_ref = ?",
+                (fingerprint, json.dumps(rules, ensure_ascii=False), time.time(), table_ref),
+            )
+            self._conn.commit()
+
+    def get_profile(self, table_ref: str, snapshot: str) -> Optional[TableProfile]:
+        """
+        Returns the cached data profile taken at this snapshot, if any.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot, profile FROM profiles WHERE table_ref = ? AND created_at >= ?",
+                (table_ref, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None or row[0] != snapshot:
+                return None
+            self._conn.execute("UPDATE profiles SET accessed_at = ? WHERE table_ref = ?", (time.time(), table_ref))
+            self._conn.commit()
+        return TableProfile.from_dict(json.loads(row[1]))
+
+    def put_profile(self, table_ref: str, snapshot: str, profile: TableProfile):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (table_ref, snapshot, profile, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (table_ref, snapshot, json.dumps(asdict(profile), ensure_ascii=False), now, now),
+            )
+            self._conn.commit()
+
+    def evict(self):
+        """
+        Purges expired entries and keeps at most `max_entries` (least recently used first out).
+        """
+        with self._lock:
+            for table in ("tables", "profiles"):
+                self._conn.execute(f"DELETE FROM {table} WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+                self._conn.execute(
+                    f"""
+                    DELETE FROM {table} WHERE table_ref NOT IN (
+                        SELECT table_ref FROM {table} ORDER BY accessed_at DESC LIMIT ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def close(self):
+        self.evict()
+        self._conn.close()
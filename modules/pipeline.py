@@ -0,0 +1,191 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from core import telemetry
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+@dataclass
+class Stage:
+    """
+    One step of a `StagedPipeline`.
+
+    Args:
+        name (str): Stage name (logs, telemetry span `pipeline.<name>`, stats).
+        func (Callable): Called with each input item; returns an iterable of output items
+            (empty to drop the item, several to fan out).
+        workers (int): Items processed concurrently by this stage.
+        queue_size (int): Capacity of the stage input queue. When it is full the previous
+            stage blocks, so at most about `queue_size + workers` items are held per stage.
+        flush (Optional[Callable]): Called once when every input has been processed; its
+            output items are sent downstream before the end of the stream (e.g. the last
+            partial batch of a batching stage).
+    """
+    name: str
+    func: Callable[[object], Iterable]
+    workers: int = 1
+    queue_size: int = 16
+    flush: Optional[Callable[[], Iterable]] = None
+
+
+@dataclass
+class StageStats:
+    name: str
+    processed: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    max_queue: int = 0
+
+
+@dataclass
+class StageError:
+    stage: str
+    item: object
+    error: Exception
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues, each stage with its
+    own worker threads. Stages overlap: an item moves on as soon as its stage is done with
+    it, and a full queue blocks the stage feeding it (backpressure), so memory depends on
+    the queue sizes rather than on the number of items.
+
+    A failing item is recorded in `errors` and dropped; the rest keep flowing.
+    """
+
+    def __init__(self, stages: List[Stage], output_queue_size: int = 16, poll_seconds: float = 0.1):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.output_queue_size = output_queue_size
+        self.poll_seconds = poll_seconds
+        self.stats = {s.name: StageStats(s.name) for s in stages}
+        self.errors: List[StageError] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _put(self, q: queue.Queue, item):
+        # Blocks while the queue is full, unless the run is being torn down
+        while True:
+            try:
+                q.put(item, timeout=self.poll_seconds)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    raise _Stopped()
+
+    def _get(self, q: queue.Queue):
+        while True:
+            try:
+                return q.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise _Stopped()
+
+    def _feed(self, items: Iterable, q: queue.Queue, workers: int):
+        try:
+            for item in items:
+                self._put(q, item)
+        except _Stopped:
+            return
+        except Exception as e:
+            with self._lock:
+                self.errors.append(StageError("input", None, e))
+            print(f"❌ Error leyendo la entrada del pipeline: {e}")
+        for _ in range(workers):
+            try:
+                self._put(q, _DONE)
+            except _Stopped:
+                return
+
+    def _emit(self, stage: Stage, outputs: Optional[Iterable], out: queue.Queue):
+        for output in outputs or ():
+            self._put(out, output)
+            with self._lock:
+                self.stats[stage.name].emitted += 1
+
+    def _work(self, stage: Stage, inp: queue.Queue, out: queue.Queue, next_workers: int, remaining: List[int]):
+        stats = self.stats[stage.name]
+        with telemetry.span(f"pipeline.{stage.name}"):
+            try:
+                while True:
+                    item = self._get(inp)
+                    if item is _DONE:
+                        break
+                    with self._lock:
+                        stats.max_queue = max(stats.max_queue, inp.qsize() + 1)
+                    started = time.perf_counter()
+                    try:
+                        outputs = list(stage.func(item) or ())
+                    except Exception as e:
+                        with self._lock:
+                            stats.failed += 1
+                            self.errors.append(StageError(stage.name, item, e))
+                        print(f"❌ Error en la etapa {stage.name}: {e}")
+                        continue
+                    finally:
+                        with self._lock:
+                            stats.processed += 1
+                            stats.busy_seconds += time.perf_counter() - started
+                    self._emit(stage, outputs, out)
+
+                # The last worker of the stage flushes it and closes the next queue
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    if stage.flush:
+                        self._emit(stage, stage.flush(), out)
+                    for _ in range(next_workers):
+                        self._put(out, _DONE)
+            except _Stopped:
+                return
+
+    def run(self, items: Iterable) -> Iterator:
+        """
+        Streams the items through every stage, yielding the outputs of the last stage as
+        they are produced (not in input order).
+        """
+        queues = [queue.Queue(maxsize=max(1, s.queue_size)) for s in self.stages]
+        queues.append(queue.Queue(maxsize=max(1, self.output_queue_size)))
+        workers = [max(1, s.workers) for s in self.stages] + [1]
+
+        threads = [threading.Thread(target=telemetry.bind(self._feed), args=(items, queues[0], workers[0]), name="pipeline-input", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            remaining = [workers[i]]
+            for n in range(workers[i]):
+                threads.append(threading.Thread(
+                    target=telemetry.bind(self._work),
+                    args=(stage, queues[i], queues[i + 1], workers[i + 1], remaining),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                ))
+        self._stop.clear()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            # Also reached when the caller stops consuming early: unblock and end the workers
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def summary(self) -> str:
+        return " → ".join(
+            f"{s.name} {s.processed}" + (f" ({s.failed} ✗)" if s.failed else "") for s in self.stats.values()
+        )
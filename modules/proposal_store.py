@@ -0,0 +1,326 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.dq_rules import rule_id
+
+# pyarrow is optional: without it proposals are only kept as JSON files under output/.
+RULES = "rules"
+GLOSSARY = "glossary"
+KINDS = (RULES, GLOSSARY)
+
+# Partition column of each kind: `rules/dataset=<project.dataset>/date=<YYYY-MM-DD>/<proposal_id>.parquet`
+_PARTITION = {RULES: "dataset", GLOSSARY: "glossary"}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("The proposal store needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _text(value: Any) -> Optional[str]:
+    # Model output is not guaranteed to be typed: columns are strings or null
+    return None if value is None else str(value)
+
+
+@dataclass
+class ProposalRecord:
+    """
+    Index entry of one stored proposal.
+    """
+    proposal_id: str
+    kind: str
+    key: str  # `project.dataset` for rules, glossary id for glossaries
+    created_at: float
+    path: str
+    items: int
+    content_hash: str
+    source: Optional[str] = None
+
+
+@dataclass
+class ProposalDiff:
+    """
+    Items added, removed and changed between two proposals of the same key.
+    """
+    old_id: Optional[str]
+    new_id: str
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    @property
+    def unchanged(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+
+def _rule_keys(rules: List[dict]) -> List[str]:
+    """
+    Diff keys of the rules of a proposal: table, `rule_id` (column and dimension) and rule
+    type, so a REGEX and a RANGE on the same column and dimension are different rules.
+    Rules that still share a key are numbered in order (`#2`, `#3`...).
+    """
+    keys = []
+    seen: Dict[str, int] = {}
+    for rule in rules:
+        key = f"{rule.get('table')}:{rule_id(rule)}:{str(rule.get('type')).lower()}"
+        seen[key] = seen.get(key, 0) + 1
+        keys.append(key if seen[key] == 1 else f"{key}#{seen[key]}")
+    return keys
+
+
+def _glossary_rows(glossary: dict) -> List[dict]:
+    rows = []
+    for category in glossary.get("glossary", {}).get("categories", []):
+        category_id = category.get("id") or category.get("display_name")
+        rows.append({
+            "item_type": "category",
+            "category_id": _text(category_id),
+            "name": _text(category.get("display_name")),
+            "definition": _text(category.get("description")),
+            "item": _dumps({k: v for k, v in category.items() if k != "terms"}),
+        })
+        for term in category.get("terms", []):
+            rows.append({
+                "item_type": "term",
+                "category_id": _text(category_id),
+                "name": _text(term.get("term")),
+                "definition": _text(term.get("definition")),
+                "item": _dumps(term),
+            })
+    return rows
+
+
+class ProposalStore:
+    """
+    Columnar history of the generated proposals under `output/proposals/`.
+
+    Each proposal is one Parquet file, hive-partitioned by dataset (or glossary) and
+    date, with one row per rule (or glossary category/term). A small SQLite index keeps
+    one entry per proposal, so the latest proposal of a dataset is found without listing
+    the directory, and two runs can be diffed by reading only their two files.
+
+    The JSON proposal format stays the exchange format (PRs, publish scripts):
+    `load()` / `export_json()` rebuild it from the stored rows.
+    """
+
+    def __init__(self, root: str = "output/proposals"):
+        self._pa = _require_pyarrow()
+        self.root = root
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS proposals (
+                proposal_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                path TEXT NOT NULL,
+                items INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                source TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS proposals_latest ON proposals (kind, key, created_at)")
+        self._conn.commit()
+
+    # --- Writing ---
+
+    def append_rules(self, dataset_ref: str, proposal: Any, source: Optional[str] = None) -> ProposalRecord:
+        """
+        Stores a rules proposal (JSON string or dict) of `project.dataset`.
+        """
+        data = json.loads(proposal) if isinstance(proposal, str) else proposal
+        rules = data.get("rules", [])
+        rows = [{
+            "rule_key": key,
+            "table": _text(rule.get("table")),
+            "column": _text(rule.get("column")),
+            "dimension": _text(rule.get("dimension")),
+            "type": _text(rule.get("type")),
+            "description": _text(rule.get("description")),
+            "item": _dumps(rule),
+        } for rule, key in zip(rules, _rule_keys(rules))]
+        return self._append(RULES, dataset_ref, rows, source)
+
+    def append_glossary(self, glossary_id: str, proposal: Any, source: Optional[str] = None) -> ProposalRecord:
+        """
+        Stores a glossary proposal (JSON string or dict) of `glossary_id`.
+        """
+        data = json.loads(proposal) if isinstance(proposal, str) else proposal
+        return self._append(GLOSSARY, glossary_id, _glossary_rows(data), source)
+
+    def _append(self, kind: str, key: str, rows: List[dict], source: Optional[str]) -> ProposalRecord:
+        pa = self._pa
+        digest = hashlib.sha256("\n".join(row["item"] for row in rows).encode("utf-8")).hexdigest()
+
+        # Same content as the latest proposal of the key: nothing new to store
+        latest = self.latest(kind, key)
+        if latest is not None and latest.content_hash == digest:
+            return latest
+
+        created_at = time.time()
+        proposal_id = f"{int(created_at)}_{uuid.uuid4().hex[:8]}"
+        directory = os.path.join(
+            self.root, kind, f"{_PARTITION[kind]}={key}", f"date={time.strftime('%Y-%m-%d', time.gmtime(created_at))}"
+        )
+        path = os.path.join(directory, f"{proposal_id}.parquet")
+        table = pa.Table.from_pylist(
+            [dict(row, proposal_id=proposal_id, position=i) for i, row in enumerate(rows)],
+            schema=self._schema(kind),
+        )
+        os.makedirs(directory, exist_ok=True)
+        # Written aside and renamed: the index never points to a half-written file
+        # (dot-prefixed, so dataset scans skip it meanwhile)
+        tmp_path = os.path.join(directory, f".{proposal_id}.tmp")
+        pa.parquet.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+        record = ProposalRecord(proposal_id, kind, key, created_at, path, len(rows), digest, source)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO proposals (proposal_id, kind, key, created_at, path, items, content_hash, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.proposal_id, kind, key, created_at, path, record.items, digest, source),
+            )
+            self._conn.commit()
+        return record
+
+    def _schema(self, kind: str):
+        pa = self._pa
+        common = [("proposal_id", pa.string()), ("position", pa.int32())]
+        if kind == RULES:
+            columns = [("rule_key", pa.string()), ("table", pa.string()), ("column", pa.string()),
+                       ("dimension", pa.string()), ("type", pa.string()), ("description", pa.string())]
+        else:
+            columns = [("item_type", pa.string()), ("category_id", pa.string()), ("name", pa.string()),
+                       ("definition", pa.string())]
+        return pa.schema(common + columns + [("item", pa.string())])
+
+    # --- Index ---
+
+    def _records(self, where: str, params: Tuple, limit: Optional[int] = None) -> List[ProposalRecord]:
+        sql = f"SELECT proposal_id, kind, key, created_at, path, items, content_hash, source FROM proposals WHERE {where} ORDER BY created_at DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [ProposalRecord(*row) for row in rows]
+
+    def get(self, proposal_id: str) -> Optional[ProposalRecord]:
+        records = self._records("proposal_id = ?", (proposal_id,))
+        return records[0] if records else None
+
+    def history(self, kind: str, key: Optional[str] = None, limit: Optional[int] = None) -> List[ProposalRecord]:
+        """
+        Proposals of a kind (and key), newest first.
+        """
+        if key is None:
+            return self._records("kind = ?", (kind,), limit)
+        return self._records("kind = ? AND key = ?", (kind, key), limit)
+
+    def latest(self, kind: str, key: Optional[str] = None) -> Optional[ProposalRecord]:
+        """
+        Latest proposal of `key`, or of any key when None.
+        """
+        records = self.history(kind, key, limit=1)
+        return records[0] if records else None
+
+    def keys(self, kind: str) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT key FROM proposals WHERE kind = ? ORDER BY key", (kind,))]
+
+    # --- Reading ---
+
+    def _items(self, record: ProposalRecord) -> List[dict]:
+        table = self._pa.parquet.read_table(record.path, columns=["position", "item"]).sort_by("position")
+        return [json.loads(item) for item in table.column("item").to_pylist()]
+
+    def _require(self, proposal_id: str) -> ProposalRecord:
+        record = self.get(proposal_id)
+        if record is None:
+            raise KeyError(f"Unknown proposal '{proposal_id}'")
+        return record
+
+    def load(self, proposal_id: str) -> dict:
+        """
+        The proposal in its JSON format: `{"rules": [...]}` or `{"glossary": {"categories": [...]}}`.
+        """
+        record = self._require(proposal_id)
+        if record.kind == RULES:
+            return {"rules": self._items(record)}
+
+        table = self._pa.parquet.read_table(record.path, columns=["position", "item_type", "item"]).sort_by("position")
+        categories: List[dict] = []
+        for item_type, item in zip(table.column("item_type").to_pylist(), table.column("item").to_pylist()):
+            if item_type == "category":
+                categories.append(dict(json.loads(item), terms=[]))
+            elif categories:
+                categories[-1]["terms"].append(json.loads(item))
+        return {"glossary": {"categories": categories}}
+
+    def export_json(self, proposal_id: str, path: Optional[str] = None) -> str:
+        """
+        JSON view of a proposal, written to `path` when given.
+        """
+        content = json.dumps(self.load(proposal_id), indent=2, ensure_ascii=False)
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return content
+
+    def _keyed_items(self, record: ProposalRecord) -> Dict[str, str]:
+        if record.kind == RULES:
+            table = self._pa.parquet.read_table(record.path, columns=["rule_key", "item"])
+            keys = table.column("rule_key").to_pylist()
+        else:
+            table = self._pa.parquet.read_table(record.path, columns=["item_type", "category_id", "name", "item"])
+            keys = [f"{t}:{c}:{n}" for t, c, n in zip(*(table.column(c).to_pylist() for c in ("item_type", "category_id", "name")))]
+        return dict(zip(keys, table.column("item").to_pylist()))
+
+    def diff(self, old_id: Optional[str], new_id: str) -> ProposalDiff:
+        """
+        Items (rules keyed by table, `rule_id` and type, glossary items by category and name)
+        added, removed or changed from `old_id` (None: empty) to `new_id`.
+        """
+        new = self._keyed_items(self._require(new_id))
+        old = self._keyed_items(self._require(old_id)) if old_id else {}
+        return ProposalDiff(
+            old_id, new_id,
+            added=[k for k in new if k not in old],
+            removed=[k for k in old if k not in new],
+            changed=[k for k in new if k in old and new[k] != old[k]],
+        )
+
+    def dataset(self, kind: str = RULES):
+        """
+        `pyarrow.dataset` over every stored proposal of a kind, with the `dataset` /
+        `glossary` and `date` partition columns, for queries across runs.
+        """
+        return self._pa.dataset.dataset(os.path.join(self.root, kind), format="parquet", partitioning="hive")
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,229 @@
+import copy
+import glob
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.bigquery_metadata import ColumnProfile, TableMetadata
+from modules.dq_rules import NOT_NULL, RANGE, REGEX, SET, UNIQUENESS, normalize_rule
+from modules.json_stream import extract_array_items
+
+# Rule kinds that only depend on the column they check, so they can be moved to
+# another column as is. SQL assertions may reference other columns and are not reused.
+_REUSABLE_KINDS = {NOT_NULL, UNIQUENESS, REGEX, SET, RANGE}
+# Column types each kind makes sense for (proposals do not record the column type)
+_COMPATIBLE_TYPES = {
+    REGEX: {"STRING"},
+    SET: {"STRING", "INTEGER"},
+    RANGE: {"INTEGER", "FLOAT", "NUMERIC", "BIGNUMERIC", "DATE", "DATETIME", "TIMESTAMP", "TIME"},
+}
+
+NUM_PERM = 64
+BANDS = 16
+_ROWS_PER_BAND = NUM_PERM // BANDS
+
+
+def normalize_column_name(name: str) -> str:
+    """
+    `customerEmail`, `Customer-Email` and `customer_email` all become `customer_email`.
+    """
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", name.strip())
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _shingles(name: str) -> set:
+    padded = f"^{name}$"
+    return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+
+def minhash(name: str) -> Tuple[int, ...]:
+    """
+    MinHash signature (`NUM_PERM` values) of the character 3-grams of a normalized name.
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in _shingles(name)]
+    # One universal hash per permutation over the 64-bit shingle hashes
+    prime = (1 << 61) - 1
+    return tuple(
+        min(((seed * 0x9E3779B97F4A7C15 + 1) * h + seed) % prime for h in hashes)
+        for seed in range(1, NUM_PERM + 1)
+    )
+
+
+def _agrees_with_profile(rule: dict, profile: Optional[ColumnProfile], rows: int) -> bool:
+    # A key unique in one table (customers.customer_id) is a foreign key elsewhere
+    if profile is None or not rows:
+        return True
+    kind = normalize_rule(rule).kind
+    if kind == UNIQUENESS and profile.approx_distinct is not None:
+        return profile.approx_distinct >= 0.99 * rows * (1 - (profile.null_ratio or 0))
+    if kind == NOT_NULL and profile.null_ratio is not None:
+        return profile.null_ratio == 0
+    return True
+
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+@dataclass
+class _IndexEntry:
+    name: str
+    signature: Tuple[int, ...]
+    tables: set = field(default_factory=set)
+    # (kind, parameters) -> (occurrences, example rule)
+    variants: Dict[Tuple[str, str], list] = field(default_factory=dict)
+
+    def best_rules(self, field_type: Optional[str]) -> List[dict]:
+        # The most frequent variant of each kind, if the kind suits the column type
+        best: Dict[str, list] = {}
+        for (kind, _), variant in self.variants.items():
+            if field_type and kind in _COMPATIBLE_TYPES and field_type not in _COMPATIBLE_TYPES[kind]:
+                continue
+            if kind not in best or variant[0] > best[kind][0]:
+                best[kind] = variant
+        return [variant[1] for variant in best.values()]
+
+
+@dataclass
+class IndexMatch:
+    column: str
+    indexed_name: str
+    similarity: float
+    rules: List[dict]
+
+
+class RuleIndex:
+    """
+    Index of approved DQ rules by normalized column name, used to assign rules to
+    columns already seen in other tables without calling the model.
+
+    Lookups try the exact normalized name first and then MinHash LSH candidates (character
+    3-grams, `BANDS` bands), accepting a match when the estimated Jaccard similarity is at
+    least `min_similarity` and the name had rules in at least `min_support` tables.
+    `hits` / `lookups` count columns looked up and matched.
+    """
+
+    def __init__(self, min_similarity: float = 0.8, min_support: int = 1):
+        self.min_similarity = min_similarity
+        self.min_support = max(1, min_support)
+        self.entries: Dict[str, _IndexEntry] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], set] = {}
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def add_rule(self, rule: dict, source: str = ""):
+        normalized = normalize_rule(rule)
+        if normalized.kind not in _REUSABLE_KINDS or not normalized.column:
+            return
+        name = normalize_column_name(normalized.column)
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.entries[name] = _IndexEntry(name, minhash(name))
+            for band in range(BANDS):
+                key = (band, entry.signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND])
+                self._buckets.setdefault(key, set()).add(name)
+        # Support counts tables, not files: the same table in several proposals counts once
+        entry.tables.add(normalized.table or source)
+        variant_key = (normalized.kind, json.dumps(rule.get("parameters") or {}, sort_keys=True))
+        variant = entry.variants.setdefault(variant_key, [0, rule])
+        variant[0] += 1
+
+    def add_proposal(self, content: str, source: str = ""):
+        try:
+            rules = json.loads(content).get("rules", [])
+        except json.JSONDecodeError:
+            rules = extract_array_items(content, ("rules",))
+        for rule in rules:
+            if isinstance(rule, dict):
+                self.add_rule(rule, source)
+
+    def _find(self, name: str) -> Tuple[Optional[_IndexEntry], float]:
+        if name in self.entries:
+            return self.entries[name], 1.0
+        signature = minhash(name)
+        candidates = set()
+        for band in range(BANDS):
+            candidates |= self._buckets.get((band, signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]), set())
+        best, best_similarity = None, 0.0
+        for candidate in sorted(candidates):
+            similarity = estimated_similarity(signature, self.entries[candidate].signature)
+            if similarity > best_similarity:
+                best, best_similarity = self.entries[candidate], similarity
+        return best, best_similarity
+
+    def lookup(self, column: str, field_type: Optional[str] = None, profile: Optional[ColumnProfile] = None, rows: int = 0) -> Optional[IndexMatch]:
+        """
+        Returns the approved rules for a column when there is a confident match. With the
+        column data profile, rules it contradicts (uniqueness, not null) are left out.
+        """
+        entry, similarity = self._find(normalize_column_name(column))
+        rules = [r for r in entry.best_rules(field_type) if _agrees_with_profile(r, profile, rows)] if entry else []
+        matched = bool(rules) and similarity >= self.min_similarity and len(entry.tables) >= self.min_support
+        with self._lock:
+            self.lookups += 1
+            self.hits += matched
+        if not matched:
+            return None
+        return IndexMatch(column=column, indexed_name=entry.name, similarity=similarity, rules=rules)
+
+    def assign(self, tables: List[TableMetadata]) -> Tuple[Dict[str, List[dict]], List[TableMetadata]]:
+        """
+        Assigns indexed rules to the matching columns of each table.
+
+        Returns:
+            Tuple[Dict[str, List[dict]], List[TableMetadata]]: Reused rules by table id, and
+            the tables still to send to the model, reduced to their novel columns (tables
+            where every column matched are left out).
+        """
+        reused: Dict[str, List[dict]] = {}
+        pending: List[TableMetadata] = []
+        for table in tables:
+            novel = []
+            for column in table.columns:
+                match = None
+                if column.field_type not in ("RECORD", "STRUCT") and column.mode != "REPEATED":
+                    profile = table.profile.column(column.name) if table.profile else None
+                    match = self.lookup(column.name, column.field_type, profile, table.profile.rows if table.profile else 0)
+                if match is None:
+                    novel.append(column)
+                    continue
+                for rule in match.rules:
+                    rule = copy.deepcopy(rule)
+                    rule.update(table=table.table_id, column=column.name, reused_from=match.indexed_name)
+                    rule.pop("name", None)
+                    reused.setdefault(table.table_id, []).append(rule)
+            if novel:
+                pending.append(table if len(novel) == len(table.columns) else replace(table, columns=novel))
+        return reused, pending
+
+    def summary(self) -> str:
+        return f"{self.hits}/{self.lookups} columnas con reglas reutilizadas ({self.hit_ratio:.0%})"
+
+
+def build_rule_index(proposal_contents: Iterable[Tuple[str, str]], min_similarity: float = 0.8, min_support: int = 1) -> RuleIndex:
+    """
+    Builds a `RuleIndex` from `(source, content)` pairs of proposal files.
+    """
+    index = RuleIndex(min_similarity=min_similarity, min_support=min_support)
+    for source, content in proposal_contents:
+        index.add_proposal(content, source)
+    return index
+
+
+def read_local_proposals(pattern: str = "output/dq_rules_proposal_*.json") -> List[Tuple[str, str]]:
+    proposals = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            proposals.append((path, f.read()))
+    return proposals
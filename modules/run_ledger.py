@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Work item states, in order: an item in a later state has completed the earlier ones
+HARVESTED = "harvested"
+GENERATED = "generated"
+VALIDATED = "validated"
+PUBLISHED = "published"
+STATES = (HARVESTED, GENERATED, VALIDATED, PUBLISHED)
+
+
+def content_hash(value: Any) -> str:
+    """
+    Stable hash of a string or of any JSON-serialisable value.
+    """
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class LedgerEntry:
+    item_id: str
+    state: str
+    content_hash: str
+    payload: Any = None
+    updated_at: float = 0.0
+
+
+class RunLedger:
+    """
+    Durable SQLite ledger of the work items of long runs, so an interrupted run resumes
+    where it stopped instead of starting from zero.
+
+    A run is identified by a key (e.g. `dq:project.dataset` or `glossary:<id>`) and stays
+    open until `LedgerRun.finish()`. Opening the same key again resumes the open run if
+    its fingerprint (model, proposal hash...) is unchanged and it is not older than
+    `max_age_seconds`; otherwise its items are discarded and a new run starts.
+
+    Each item records the last state it reached with the hash of the content it was
+    computed from, so a resumed run only skips items whose input is still the same.
+    Every record is committed immediately (WAL journal).
+    """
+
+    def __init__(self, path: str = "output/ledger/run_ledger.sqlite3", max_age_seconds: Optional[float] = None):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_key TEXT PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                run_key TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                payload TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_key, item_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def open_run(self, run_key: str, fingerprint: str = "", resume: bool = True) -> "LedgerRun":
+        """
+        Resumes the open run of `run_key` (same fingerprint) or starts a new one.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, fingerprint, finished_at, started_at FROM runs WHERE run_key = ?", (run_key,)
+            ).fetchone()
+            fresh = row is not None and (self.max_age_seconds is None or time.time() - row[3] <= self.max_age_seconds)
+            if resume and fresh and row[2] is None and row[1] == fingerprint:
+                done = self._conn.execute("SELECT COUNT(*) FROM items WHERE run_key = ?", (run_key,)).fetchone()[0]
+                return LedgerRun(self, run_key, row[0], resumed=True, recorded=done)
+
+            run_id = uuid.uuid4().hex[:12]
+            self._conn.execute("DELETE FROM items WHERE run_key = ?", (run_key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_key, run_id, fingerprint, started_at, finished_at) VALUES (?, ?, ?, ?, NULL)",
+                (run_key, run_id, fingerprint, time.time()),
+            )
+            self._conn.commit()
+        return LedgerRun(self, run_key, run_id, resumed=False)
+
+    def get(self, run_key: str, item_id: str) -> Optional[LedgerEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, content_hash, payload, updated_at FROM items WHERE run_key = ? AND item_id = ?",
+                (run_key, item_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return LedgerEntry(item_id, row[0], row[1], json.loads(row[2]) if row[2] is not None else None, row[3])
+
+    def record(self, run_key: str, item_id: str, state: str, content_hash: str, payload: Any = None):
+        if state not in STATES:
+            raise ValueError(f"Unknown ledger state '{state}'")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items (run_key, item_id, state, content_hash, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_key, item_id, state, content_hash,
+                 json.dumps(payload, ensure_ascii=False) if payload is not None else None, time.time()),
+            )
+            self._conn.commit()
+
+    def finish(self, run_key: str):
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_key = ?", (time.time(), run_key))
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class LedgerRun:
+    """
+    Handle of one run of the ledger: reads and records its work items.
+    """
+
+    def __init__(self, ledger: RunLedger, run_key: str, run_id: str, resumed: bool, recorded: int = 0):
+        self.ledger = ledger
+        self.run_key = run_key
+        self.run_id = run_id
+        self.resumed = resumed
+        self.recorded = recorded
+        self.skipped = 0
+
+    def get(self, item_id: str) -> Optional[LedgerEntry]:
+        return self.ledger.get(self.run_key, item_id)
+
+    def completed(self, item_id: str, state: str, content_hash: str) -> Optional[LedgerEntry]:
+        """
+        The entry of the item if it already reached `state` (or a later one) from the
+        same content, else None. Counts as a skipped item.
+        """
+        entry = self.get(item_id)
+        if entry is None or entry.content_hash != content_hash or STATES.index(entry.state) < STATES.index(state):
+            return None
+        self.skipped += 1
+        return entry
+
+    def record(self, item_id: str, state: str, content_hash: str, payload: Any = None):
+        self.ledger.record(self.run_key, item_id, state, content_hash, payload)
+
+    def finish(self):
+        self.ledger.finish(self.run_key)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"run_key": self.run_key, "run_id": self.run_id, "resumed": self.resumed, "skipped": self.skipped}
@@ -0,0 +1,131 @@
+import json
+import re
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from core.telemetry import TracedThreadPoolExecutor
+
+T = TypeVar("T")
+
+# Rough chars-per-token ratio for Gemini tokenizers on schema-like text.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for prompt budgeting (no tokenizer round trip).
+    """
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_shards(chunks: List[str], token_budget: int, header: str = "") -> List[str]:
+    """
+    Groups context chunks (one per table) into shards that fit `token_budget`.
+
+    Small tables are bin-packed together (first-fit decreasing); a table larger than
+    the budget gets a shard of its own. Chunks keep their original relative order
+    inside each shard and shards are ordered by their first chunk, so the result is
+    deterministic.
+
+    Args:
+        chunks (List[str]): Rendered context of each table.
+        token_budget (int): Maximum estimated tokens per shard, header included.
+        header (str): Text prepended to every shard (e.g. `Dataset: <id>`).
+
+    Returns:
+        List[str]: Context of each shard.
+    """
+    available = token_budget - (estimate_tokens(header) if header else 0)
+    shards = pack_indices([estimate_tokens(c) for c in chunks], available)
+    return ["\n".join(([header] if header else []) + [chunks[i] for i in shard]) for shard in shards]
+
+
+def pack_indices(sizes: List[int], available: int) -> List[List[int]]:
+    """
+    First-fit decreasing packing of item sizes into bins of `available` tokens.
+    Returns the item indices of each bin, sorted, with bins ordered by their first item.
+    """
+    bins: List[List[int]] = []
+    loads: List[int] = []
+    for i in sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True):
+        for b, load in enumerate(loads):
+            if load + sizes[i] <= available:
+                bins[b].append(i)
+                loads[b] += sizes[i]
+                break
+        else:
+            bins.append([i])
+            loads.append(sizes[i])
+    return sorted(sorted(b) for b in bins)
+
+
+def run_concurrently(func: Callable[[str], T], inputs: List[str], max_workers: int) -> List[Optional[T]]:
+    """
+    Applies `func` to every input with a bounded thread pool, keeping input order.
+    A failing input yields None instead of aborting the remaining ones.
+    """
+    def _safe(item: str) -> Optional[T]:
+        try:
+            return func(item)
+        except Exception as e:
+            print(f"❌ Error procesando fragmento: {e}")
+            return None
+
+    if not inputs:
+        return []
+    with TracedThreadPoolExecutor(max_workers=max(1, min(max_workers, len(inputs)))) as executor:
+        return list(executor.map(_safe, inputs))
+
+
+def _load_shard_results(results: List[Optional[str]]) -> List[dict]:
+    parsed = []
+    for i, text in enumerate(results):
+        if not text:
+            continue
+        try:
+            parsed.append(json.loads(text))
+        except ValueError as e:
+            print(f"⚠️ Fragmento {i + 1} con JSON inválido, se descarta: {e}")
+    failed = len(results) - len(parsed)
+    if failed:
+        print(f"⚠️ {failed}/{len(results)} fragmentos sin resultado; la propuesta es parcial.")
+    return parsed
+
+
+def merge_rule_proposals(results: List[Optional[str]]) -> Optional[str]:
+    """
+    Merges the `rules` arrays of several DQ proposals into a single proposal.
+    """
+    parsed = _load_shard_results(results)
+    if not parsed:
+        return None
+    rules = [rule for proposal in parsed for rule in proposal.get("rules", [])]
+    return json.dumps({"rules": rules}, indent=2, ensure_ascii=False)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def merge_glossary_proposals(results: List[Optional[str]]) -> Optional[str]:
+    """
+    Merges several glossary proposals, deduplicating categories by `id` (or display name)
+    and, within a category, terms by name. The first occurrence wins.
+    """
+    parsed = _load_shard_results(results)
+    if not parsed:
+        return None
+
+    categories: Dict[str, dict] = {}
+    for proposal in parsed:
+        for category in proposal.get("glossary", {}).get("categories", []):
+            key = category.get("id") or _slug(category.get("display_name", ""))
+            if key not in categories:
+                categories[key] = dict(category, terms=[])
+            merged = categories[key]
+            known_terms = {_slug(t.get("term", "")) for t in merged["terms"]}
+            for term in category.get("terms", []):
+                if _slug(term.get("term", "")) not in known_terms:
+                    merged["terms"].append(term)
+                    known_terms.add(_slug(term.get("term", "")))
+
+    return json.dumps({"glossary": {"categories": list(categories.values())}}, indent=2, ensure_ascii=False)
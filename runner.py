@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from core import rate_limit, telemetry
+from core.retry import retry_call
+from core.response_cache import get_shared_cache
+from core.telemetry import TracedThreadPoolExecutor
+from modules.bigquery_metadata import TableMetadata
+from modules.data_quality import DataQualityGenerator
+from modules.fanout import BoundedModel, RunReport, TargetResult, parse_targets, read_target_file
+from modules.metadata_cache import MetadataCache
+from modules.run_ledger import LedgerRun
+from main import build_batch_executor, configure_telemetry, generate_quality_rules, generate_quality_rules_batch, get_tables_from_bigquery, load_rule_index, open_dataset_run, open_proposal_store, open_run_ledger, store_proposal
+from config.settings import config
+
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+    from core.github_client import GitHubClient
+
+Target = Tuple[str, str]
+
+
+def _entity_name(result: TargetResult) -> str:
+    return f"data_quality_rules_{result.project_id}_{result.dataset_id}"
+
+
+class FanOutRunner:
+    """
+    Ejecuta el agente de calidad sobre muchos datasets (de uno o varios proyectos) en un
+    único proceso: los clientes de BigQuery, Vertex AI y GitHub se crean una sola vez y
+    cada API tiene su propio presupuesto de concurrencia.
+    """
+
+    def __init__(self, create_prs: bool = True, max_targets: Optional[int] = None):
+        import vertexai
+
+        vertexai.init(project=config.PROJECT_ID, location=config.LOCATION)
+        self.create_prs = create_prs
+        self.max_targets = max_targets or config.FANOUT_MAX_TARGETS
+
+        self._bq_clients: Dict[str, "bigquery.Client"] = {}
+        self._bq_clients_lock = threading.Lock()
+        self._bq_slots = threading.BoundedSemaphore(config.FANOUT_BQ_CONCURRENCY)
+        self._github_slots = threading.BoundedSemaphore(config.FANOUT_GITHUB_CONCURRENCY)
+        self._github_client: Optional["GitHubClient"] = None
+        self._github_lock = threading.Lock()
+
+        self.cache = None
+        if config.CACHE_ENABLED:
+            self.cache = MetadataCache(
+                os.path.join(config.CACHE_DIR, "metadata_cache.sqlite3"),
+                ttl_seconds=config.CACHE_TTL_SECONDS,
+                max_entries=config.CACHE_MAX_ENTRIES,
+            )
+        self.response_cache = None
+        if config.RESPONSE_CACHE_ENABLED:
+            self.response_cache = get_shared_cache(
+                config.RESPONSE_CACHE_DIR,
+                memory_entries=config.RESPONSE_CACHE_MEMORY_ENTRIES,
+                max_disk_bytes=config.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+            )
+        self.dq_gen = DataQualityGenerator(model_name=config.MODEL_NAME, max_retries=config.GEMINI_MAX_RETRIES, response_cache=self.response_cache)
+        # Presupuesto global de llamadas a Gemini, compartido por todos los datasets
+        self.dq_gen.model = BoundedModel(self.dq_gen.model, threading.BoundedSemaphore(config.GEMINI_MAX_WORKERS))
+        self.rule_index = None
+        # Un registro por dataset: los datasets ya extraídos/generados no se repiten al reanudar
+        self.ledger = open_run_ledger()
+        self._runs: Dict[Target, Optional[LedgerRun]] = {}
+        # Histórico Parquet de propuestas, con índice de la última por dataset
+        self.proposal_store = open_proposal_store()
+
+    def bigquery_client(self, project_id: str) -> "bigquery.Client":
+        with self._bq_clients_lock:
+            if project_id not in self._bq_clients:
+                from google.cloud import bigquery
+
+                self._bq_clients[project_id] = bigquery.Client(project=project_id, location=config.LOCATION)
+            return self._bq_clients[project_id]
+
+    def github_client(self) -> "GitHubClient":
+        # El token se obtiene de Secret Manager una sola vez por ejecución
+        with self._github_lock:
+            if self._github_client is None:
+                from core.github_client import GitHubClient
+
+                self._github_client = GitHubClient()
+            return self._github_client
+
+    def list_datasets(self, project_id: str) -> List[str]:
+        client = self.bigquery_client(project_id)
+        return retry_call(lambda: [d.dataset_id for d in client.list_datasets(project=project_id)], description=f"list_datasets({project_id})", api="bigquery")
+
+    def _pool(self, func, items: list) -> list:
+        if not items:
+            return []
+        with TracedThreadPoolExecutor(max_workers=max(1, min(self.max_targets, len(items)))) as executor:
+            return list(executor.map(func, items))
+
+    def _harvest(self, target: Target) -> List[TableMetadata]:
+        project_id, dataset_id = target
+        run = self._runs[target] = open_dataset_run(self.ledger, project_id, dataset_id)
+        with self._bq_slots:
+            return get_tables_from_bigquery(project_id, config.LOCATION, dataset_id, cache=self.cache, client=self.bigquery_client(project_id), ledger=run)
+
+    def _generate_online(self, item: Tuple[Target, List[TableMetadata]]) -> Optional[str]:
+        (project_id, dataset_id), tables = item
+        return generate_quality_rules(self.dq_gen, project_id, dataset_id, tables, cache=self.cache, rule_index=self.rule_index, ledger=self._runs.get((project_id, dataset_id)))
+
+    def _generate_batch(self, harvested: Dict[Target, List[TableMetadata]]) -> Dict[Target, Optional[str]]:
+        # Un único job batch por proyecto con los prompts de todos sus datasets
+        executor = build_batch_executor(self.dq_gen)
+        proposals: Dict[Target, Optional[str]] = {}
+        for project_id in dict.fromkeys(p for p, _ in harvested):
+            datasets = {d: tables for (p, d), tables in harvested.items() if p == project_id}
+            for dataset_id, dq_json in generate_quality_rules_batch(self.dq_gen, executor, project_id, datasets, cache=self.cache, rule_index=self.rule_index).items():
+                proposals[(project_id, dataset_id)] = dq_json
+        return proposals
+
+    def _publish(self, result: TargetResult, dq_json: str, timestamp: int):
+        output_dir = "output"
+        os.makedirs(output_dir, exist_ok=True)
+        result.output_file = f"{output_dir}/dq_rules_proposal_{result.project_id}_{result.dataset_id}_{timestamp}.json"
+        with open(result.output_file, "w", encoding="utf-8") as f:
+            f.write(dq_json)
+        store_proposal(self.proposal_store, result.project_id, result.dataset_id, dq_json, source=result.output_file)
+
+        if self.create_prs and not config.GITHUB_BATCH_PRS:
+            with self._github_slots:
+                result.pr_url = self.github_client().create_proposal_pr(dq_json, _entity_name(result))
+
+    def _publish_batched(self, published: List[Tuple[TargetResult, str]]):
+        # Un único árbol/commit/PR (o grupos de GITHUB_PR_GROUP_SIZE) para todas las propuestas
+        if not published:
+            return
+        try:
+            with self._github_slots:
+                pr_urls = self.github_client().create_proposals_pr(
+                    {_entity_name(result): dq_json for result, dq_json in published},
+                    group_size=config.GITHUB_PR_GROUP_SIZE,
+                    title=f"[Agent] Data Quality Proposals: {len(published)} datasets",
+                )
+        except Exception as e:
+            print(f"❌ Error creando la PR agrupada: {e}")
+            for result, _ in published:
+                result.status = "failed"
+                result.error = str(e)
+            return
+        for result, _ in published:
+            result.pr_url = pr_urls.get(_entity_name(result))
+            if result.pr_url is None:
+                result.status = "unchanged"
+
+    def run(self, targets: List[Target]) -> RunReport:
+        started = time.monotonic()
+        results = {t: TargetResult(project_id=t[0], dataset_id=t[1], status="ok") for t in targets}
+        target_started = {t: time.monotonic() for t in targets}
+
+        # PASO 1: metadatos de BigQuery (con su propio presupuesto de concurrencia)
+        print(f"🔍 Recuperando metadatos de {len(targets)} datasets...")
+        harvested: Dict[Target, List[TableMetadata]] = {}
+        for target, tables in zip(targets, self._pool(self._harvest, targets)):
+            results[target].tables = len(tables)
+            if tables:
+                harvested[target] = tables
+            else:
+                results[target].status = "empty"
+
+        # PASO 2: generación de reglas (online con presupuesto de Gemini, o un job batch);
+        # el índice de reglas aprobadas se carga una vez y lo comparten todos los datasets
+        if self.rule_index is None:
+            self.rule_index = load_rule_index(self.github_client() if self.create_prs else None)
+        print(f"🧠 Generando reglas para {len(harvested)} datasets (modo {config.GENERATION_MODE})...")
+        if config.GENERATION_MODE == "batch":
+            proposals = self._generate_batch(harvested)
+        else:
+            items = list(harvested.items())
+            proposals = {t: dq_json for (t, _), dq_json in zip(items, self._pool(self._generate_online, items))}
+
+        # PASO 3: propuesta local + PR (presupuesto de GitHub)
+        timestamp = int(time.time())
+
+        def publish(target: Target):
+            result = results[target]
+            dq_json = proposals.get(target)
+            try:
+                if not dq_json:
+                    result.status = "no_rules"
+                    return
+                result.rules = len(json.loads(dq_json).get("rules", []))
+                self._publish(result, dq_json, timestamp)
+                published.append((result, dq_json))
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(e)
+                print(f"❌ Error publicando {result.target}: {e}")
+            finally:
+                result.elapsed_seconds = time.monotonic() - target_started[target]
+
+        published: List[Tuple[TargetResult, str]] = []
+        self._pool(publish, list(harvested))
+        if self.create_prs and config.GITHUB_BATCH_PRS:
+            order = {t: i for i, t in enumerate(targets)}
+            self._publish_batched(sorted(published, key=lambda p: order[(p[0].project_id, p[0].dataset_id)]))
+        for target in targets:
+            if target not in harvested:
+                results[target].elapsed_seconds = time.monotonic() - target_started[target]
+            # Los datasets fallidos o sin reglas quedan abiertos para la siguiente ejecución
+            run = self._runs.get(target)
+            if run and results[target].status in ("ok", "unchanged", "empty"):
+                run.finish()
+
+        stats = {}
+        if self.rule_index is not None:
+            stats = {"rule_index_lookups": self.rule_index.lookups, "rule_index_hits": self.rule_index.hits,
+                     "rule_index_hit_ratio": round(self.rule_index.hit_ratio, 4)}
+        return RunReport(results=[results[t] for t in targets], elapsed_seconds=time.monotonic() - started, stats=stats)
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+        if self.ledger:
+            self.ledger.close()
+        if self.proposal_store:
+            self.proposal_store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data quality agent over many BigQuery datasets in one process.")
+    parser.add_argument("targets", nargs="*", help="`dataset`, `project.dataset` or globs such as `project.sales_*`")
+    parser.add_argument("--targets-file", help="File with one target per line (# comments allowed)")
+    parser.add_argument("--no-pr", action="store_true", help="Only write the proposals under output/, without opening PRs")
+    parser.add_argument("--report", help="Path of the consolidated JSON report (default: output/reports/run_report_<ts>.json)")
+    args = parser.parse_args()
+
+    specs = list(args.targets)
+    if args.targets_file:
+        specs += read_target_file(args.targets_file)
+    if not specs:
+        parser.error("no targets given")
+
+    print("🚀 Lanzando Agente de Calidad de Datos en modo multi-dataset")
+    configure_telemetry()
+    runner = FanOutRunner(create_prs=not args.no_pr)
+    try:
+        with telemetry.span("dq.fanout"):
+            targets = parse_targets(specs, config.PROJECT_ID, list_datasets=runner.list_datasets)
+            report = runner.run(targets)
+    finally:
+        runner.close()
+
+    print("\n" + report.table())
+    print("\n" + telemetry.get_telemetry().summary_table())
+    if rate_limit.summary():
+        print(rate_limit.summary())
+    report_path = report.write(args.report or f"output/reports/run_report_{int(time.time())}.json")
+    print(f"\n✅ {report.summary()}. Informe: {report_path}")
+    if runner.rule_index is not None:
+        print(f"♻️ Índice de reglas: {runner.rule_index.summary()}")
+    if runner.response_cache:
+        print(f"💾 Caché de respuestas Gemini: {runner.response_cache.hits} aciertos / {runner.response_cache.misses} fallos")
+    if report.failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.settings import config
+from core.response_cache import get_shared_cache
+from modules.batch_generation import LocalBatchExecutor
+from modules.data_quality import DataQualityGenerator
+from modules.metadata_cache import MetadataCache
+from main import build_batch_executor, generate_quality_rules_batch, get_tables_from_bigquery, load_rule_index, open_proposal_store, store_proposal
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate DQ rule proposals for several datasets with one batch prediction job.")
+    parser.add_argument("datasets", nargs="+", help="BigQuery datasets (`dataset` or `project.dataset`)")
+    parser.add_argument("--local", metavar="DIR", help="Use the local file-based executor with this work directory")
+    args = parser.parse_args()
+
+    print(f"🚀 Generación batch de reglas DQ para {len(args.datasets)} datasets")
+    import vertexai
+
+    vertexai.init(project=config.PROJECT_ID, location=config.LOCATION)
+
+    cache = None
+    if config.CACHE_ENABLED:
+        cache = MetadataCache(
+            os.path.join(config.CACHE_DIR, "metadata_cache.sqlite3"),
+            ttl_seconds=config.CACHE_TTL_SECONDS,
+            max_entries=config.CACHE_MAX_ENTRIES,
+        )
+
+    datasets = {}
+    for dataset_id in args.datasets:
+        tables = get_tables_from_bigquery(config.PROJECT_ID, config.LOCATION, dataset_id, cache=cache)
+        if tables:
+            datasets[dataset_id] = tables
+        else:
+            print(f"⚠️ Dataset '{dataset_id}' sin metadatos, se omite.")
+
+    response_cache = None
+    if config.RESPONSE_CACHE_ENABLED:
+        response_cache = get_shared_cache(
+            config.RESPONSE_CACHE_DIR,
+            memory_entries=config.RESPONSE_CACHE_MEMORY_ENTRIES,
+            max_disk_bytes=config.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+        )
+    dq_gen = DataQualityGenerator(model_name=config.MODEL_NAME, max_retries=config.GEMINI_MAX_RETRIES, response_cache=response_cache)
+    if args.local:
+        executor = LocalBatchExecutor(args.local, responder=lambda prompt: dq_gen.model.generate_content(prompt).text)
+    else:
+        executor = build_batch_executor(dq_gen)
+
+    # Sin cliente de GitHub: solo las propuestas locales alimentan el índice
+    rule_index = load_rule_index()
+    try:
+        proposals = generate_quality_rules_batch(dq_gen, executor, config.PROJECT_ID, datasets, cache=cache, rule_index=rule_index)
+    finally:
+        if cache:
+            cache.close()
+    if rule_index is not None:
+        print(f"♻️ Índice de reglas: {rule_index.summary()}")
+
+    os.makedirs("output", exist_ok=True)
+    timestamp = int(time.time())
+    failed = []
+    store = open_proposal_store()
+    for dataset_id, dq_json in proposals.items():
+        if not dq_json:
+            failed.append(dataset_id)
+            continue
+        local_filename = f"output/dq_rules_proposal_{dataset_id.replace('.', '_')}_{timestamp}.json"
+        with open(local_filename, "w", encoding="utf-8") as f:
+            f.write(dq_json)
+        print(f"✅ Propuesta de '{dataset_id}' guardada en: {local_filename}")
+        store_proposal(store, config.PROJECT_ID, dataset_id, dq_json, source=local_filename)
+    if store:
+        store.close()
+
+    if failed:
+        print(f"❌ Sin propuesta para: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
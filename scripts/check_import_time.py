@@ -0,0 +1,74 @@
+import sys
+import os
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "import_time_budget.json")
+
+# Runs in a fresh interpreter: cold-start time of one entry point and which heavy
+# modules it pulled in while importing.
+_PROBE = """
+import json, sys, time
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, forbidden: list, runs: int) -> dict:
+    """
+    Best-of-`runs` import time of `module` in a new process (the minimum filters out noise).
+    """
+    code = _PROBE.format(paths=[ROOT, os.path.join(ROOT, "scripts")], module=module, forbidden=forbidden)
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip()}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if the cold import time of an entry point exceeds its budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Imports per entry point; the fastest one counts")
+    parser.add_argument("--budget-file", default=BUDGET_FILE)
+    parser.add_argument("--update", action="store_true", help="Rewrite the budgets as measured time x --headroom")
+    parser.add_argument("--headroom", type=float, default=1.5)
+    args = parser.parse_args()
+
+    with open(args.budget_file, "r", encoding="utf-8") as f:
+        budgets = json.load(f)
+
+    failures = []
+    for module, budget in budgets.items():
+        result = measure(module, budget.get("forbidden_modules", []), args.runs)
+        over = result["seconds"] > budget["max_seconds"]
+        status = "❌" if over or result["loaded"] else "✅"
+        print(f"{status} {module}: {result['seconds'] * 1000:.0f} ms (budget {budget['max_seconds'] * 1000:.0f} ms)")
+        if result["loaded"]:
+            print(f"   imports heavy modules eagerly: {', '.join(result['loaded'])}")
+            failures.append(module)
+        elif over:
+            failures.append(module)
+        if args.update:
+            budget["max_seconds"] = round(result["seconds"] * args.headroom, 3)
+
+    if args.update:
+        with open(args.budget_file, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Budgets updated in {args.budget_file}")
+    elif failures:
+        print(f"❌ Import time regression in: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.proposal_store import KINDS, RULES, ProposalStore
+
+PROPOSAL_STORE_DIR = os.getenv("PROPOSAL_STORE_DIR", "output/proposals")
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse, diff and export the proposal history kept in the proposal store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    history = sub.add_parser("list", help="Proposals of a dataset (or glossary), newest first")
+    history.add_argument("key", nargs="?", help="`project.dataset` or glossary id (default: every key)")
+    history.add_argument("--kind", choices=KINDS, default=RULES)
+    history.add_argument("--limit", type=int, default=20)
+
+    diff = sub.add_parser("diff", help="Items added, removed and changed between two proposals")
+    diff.add_argument("new_id", help="Proposal id, or `project.dataset` / glossary id for its latest proposal")
+    diff.add_argument("old_id", nargs="?", help="Proposal id (default: the one before new_id)")
+    diff.add_argument("--kind", choices=KINDS, default=RULES)
+
+    export = sub.add_parser("export", help="Write a proposal back as JSON")
+    export.add_argument("proposal_id")
+    export.add_argument("--output", help="Output file (default: print it)")
+
+    ingest = sub.add_parser("import", help="Add existing JSON proposal files to the store")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--key", required=True, help="`project.dataset` of the rules, or glossary id")
+    ingest.add_argument("--kind", choices=KINDS, default=RULES)
+    args = parser.parse_args()
+
+    store = ProposalStore(PROPOSAL_STORE_DIR)
+    try:
+        if args.command == "list":
+            keys = [args.key] if args.key else store.keys(args.kind)
+            for key in keys:
+                print(f"📚 {key}")
+                for record in store.history(args.kind, key, limit=args.limit):
+                    print(f"   {record.proposal_id}  {record.items:>5} items  {record.source or ''}")
+
+        elif args.command == "diff":
+            new = store.get(args.new_id) or store.latest(args.kind, args.new_id)
+            if new is None:
+                print(f"❌ No proposal found for {args.new_id}")
+                sys.exit(1)
+            old_id = args.old_id
+            if old_id is None:
+                previous = [r for r in store.history(new.kind, new.key) if r.created_at < new.created_at]
+                old_id = previous[0].proposal_id if previous else None
+            result = store.diff(old_id, new.proposal_id)
+            print(f"🔀 {new.key}: {old_id or '(none)'} → {new.proposal_id}: {result.summary()}")
+            for label, keys in (("+", result.added), ("-", result.removed), ("~", result.changed)):
+                for key in keys:
+                    print(f"   {label} {key}")
+
+        elif args.command == "export":
+            content = store.export_json(args.proposal_id, args.output)
+            if args.output:
+                print(f"✅ Exported {args.proposal_id} to {args.output}")
+            else:
+                print(content)
+
+        elif args.command == "import":
+            # Oldest first, so the latest proposal of the key is the newest file
+            for path in sorted(args.files, key=os.path.getmtime):
+                with open(path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                if args.kind == RULES:
+                    record = store.append_rules(args.key, content, source=path)
+                else:
+                    record = store.append_glossary(args.key, content, source=path)
+                print(f"✅ {path} → {record.proposal_id} ({record.items} items)")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
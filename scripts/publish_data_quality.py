@@ -3,28 +3,117 @@ import os
 import json
 import yaml
 import time
+import argparse
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from modules.bigquery_metadata import qualify_dataset
+from modules.dq_rules import normalize_rules, rule_id
+from modules.dq_sql import compile_rule_set, run_compiled_query
+from modules.json_stream import extract_array_items
+from modules.proposal_store import RULES, ProposalStore
+
 PROJECT_ID = os.getenv("GCP_PROJECT_ID", "pg-gccoe-carlos-monteverde")
 LOCATION = os.getenv("GCP_LOCATION", "us")
+DATASET_ID = os.getenv("DATASET_ID")
+PROPOSAL_STORE_ENABLED = os.getenv("PROPOSAL_STORE_ENABLED", "true").lower() == "true"
+PROPOSAL_STORE_DIR = os.getenv("PROPOSAL_STORE_DIR", "output/proposals")
+
+def read_proposal_file(path: str) -> dict:
+    print(f"📖 Processing file: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError as e:
+        # Truncated or malformed proposal: keep every rule that is complete
+        print(f"⚠️ Invalid JSON ({e}). Recovering complete rules...")
+        return {"rules": extract_array_items(content, ("rules",))}
+
+def read_stored_proposal(dataset_id: str = None, proposal_id: str = None):
+    """
+    The requested (or latest) rules proposal from the proposal store, looked up in its
+    index. None when the store is disabled, pyarrow is missing or it has no proposal.
+    """
+    if not PROPOSAL_STORE_ENABLED or not os.path.isdir(PROPOSAL_STORE_DIR):
+        return None
+    try:
+        store = ProposalStore(PROPOSAL_STORE_DIR)
+    except ImportError as e:
+        print(f"⚠️ {e}. Falling back to the JSON files in output/.")
+        return None
+    try:
+        if proposal_id:
+            record = store.get(proposal_id)
+        else:
+            record = store.latest(RULES, qualify_dataset(PROJECT_ID, dataset_id) if dataset_id else None)
+        if record is None or record.kind != RULES:
+            return None
+        print(f"📖 Processing proposal {record.proposal_id} of {record.key} ({record.items} rules)")
+        previous = [r for r in store.history(RULES, record.key) if r.created_at < record.created_at]
+        if previous:
+            diff = store.diff(previous[0].proposal_id, record.proposal_id)
+            print(f"🔀 Changes since proposal {previous[0].proposal_id}: {diff.summary()}")
+        return store.load(record.proposal_id)
+    finally:
+        store.close()
+
+def emit_compiled_sql(rules: list, dataset_id: str, output_dir: str, timestamp: int, sample_percent: float = None,
+                      partition_filters: dict = None, run: bool = False, maximum_bytes_billed: int = None):
+    """
+    Writes one single-pass check query per table (all its rules in one scan) and optionally runs them.
+    """
+    compiled = compile_rule_set(PROJECT_ID, dataset_id, normalize_rules(rules), sample_percent=sample_percent,
+                                partition_filters=partition_filters)
+    sql_filename = f"{output_dir}/dq_rules_{timestamp}.sql"
+    with open(sql_filename, "w", encoding="utf-8") as f:
+        for query in compiled:
+            f.write(f"-- {query.table_ref}: {len(query.rules)} rules in one pass\n{query.sql};\n\n")
+            for assertion_id, sql in query.assertions.items():
+                f.write(f"-- {query.table_ref}: {assertion_id} (failing rows)\n{sql};\n\n")
+    print(f"✅ Generated compiled SQL ({len(compiled)} queries for {len(rules)} rules): {sql_filename}")
+
+    if run:
+        from google.cloud import bigquery
+
+        client = bigquery.Client(project=PROJECT_ID, location=LOCATION)
+        for query in compiled:
+            print(f"🔎 {query.table_ref}")
+            for result in run_compiled_query(client, query, maximum_bytes_billed=maximum_bytes_billed):
+                ratio = f"{result.pass_ratio:.2%}" if result.pass_ratio is not None else "-"
+                print(f"   {'✅' if result.status == 'PASSED' else '❌' if result.status == 'FAILED' else '⚠️'} {result.rule_id} [{result.kind}] {ratio}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Convert the latest DQ proposal to Dataplex YAML (and optionally compiled SQL).")
+    parser.add_argument("--emit-sql", action="store_true", help="Also write one single-pass BigQuery check query per table")
+    parser.add_argument("--run-sql", action="store_true", help="Run the compiled queries and print the pass ratio per rule")
+    parser.add_argument("--dataset", default=DATASET_ID, help="Dataset of the proposal tables (default: DATASET_ID)")
+    parser.add_argument("--sample-percent", type=float, help="TABLESAMPLE SYSTEM percentage for the compiled queries")
+    parser.add_argument("--partition-filter", action="append", default=[], metavar="TABLE=PREDICATE",
+                        help="Partition predicate for a table, e.g. orders=\"_PARTITIONDATE = CURRENT_DATE()\"")
+    parser.add_argument("--max-bytes-billed", type=int, help="maximum_bytes_billed for --run-sql")
+    parser.add_argument("--proposal-id", help="Proposal of the proposal store to publish (default: the latest of --dataset)")
+    parser.add_argument("--file", help="Proposal JSON file to publish instead of the proposal store")
+    args = parser.parse_args()
+
     print("🚀 Starting Data Quality Rule Publishing...")
     
     output_dir = "output"
     try:
-        files = [os.path.join(output_dir, f) for f in os.listdir(output_dir) if f.endswith(".json")]
-        if not files:
-            print("❌ No validation JSON files found in output/")
+        data = None if args.file else read_stored_proposal(args.dataset, args.proposal_id)
+        if data is None and args.proposal_id:
+            print(f"❌ Proposal {args.proposal_id} not found in {PROPOSAL_STORE_DIR}")
             return
-        
-        latest_file = max(files, key=os.path.getmtime)
-        print(f"📖 Processing file: {latest_file}")
-        
-        with open(latest_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            
+        if data is None:
+            files = [args.file] if args.file else [
+                os.path.join(output_dir, f) for f in os.listdir(output_dir)
+                if f.startswith("dq_rules_proposal_") and f.endswith(".json")
+            ]
+            if not files:
+                print("❌ No DQ proposal found in the proposal store or in output/")
+                return
+            data = read_proposal_file(max(files, key=os.path.getmtime))
+
     except Exception as e:
         print(f"❌ Error reading DQ file: {e}")
         return
@@ -41,7 +130,7 @@ def main():
 
     for r in rules:
         yaml_rule = {
-            "pbt_rule_id": f"rule_{r.get('column')}_{r.get('dimension')}".lower(),
+            "pbt_rule_id": rule_id(r),
             "target": r.get("column"),
             "dimension": r.get("dimension"),
             "description": r.get("description"),
@@ -62,5 +151,17 @@ def main():
     print("Content:")
     print(yaml.dump(yaml_structure, sort_keys=False))
 
+    if args.emit_sql or args.run_sql:
+        if not args.dataset:
+            print("❌ --dataset (or DATASET_ID) is required to compile SQL.")
+            return
+        emit_compiled_sql(
+            rules, args.dataset, output_dir, timestamp,
+            sample_percent=args.sample_percent,
+            partition_filters=dict(item.split("=", 1) for item in args.partition_filter),
+            run=args.run_sql,
+            maximum_bytes_billed=args.max_bytes_billed,
+        )
+
 if __name__ == "__main__":
     main()
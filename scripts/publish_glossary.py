@@ -0,0 +1,173 @@
+import sys
+import os
+import json
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import rate_limit, telemetry
+from modules.dataplex_client import DataplexGlossaryClient
+from modules.audit_logger import AuditLogger
+from modules.proposal_store import GLOSSARY, ProposalStore
+from modules.run_ledger import PUBLISHED, RunLedger, content_hash
+
+PROJECT_ID = os.getenv("GCP_PROJECT_ID", "pg-gccoe-carlos-monteverde")
+LOCATION = os.getenv("GCP_LOCATION", "us")
+GLOSSARY_ID = os.getenv("GLOSSARY_ID", "my-business-glossary")
+GLOSSARY_DISPLAY_NAME = os.getenv("GLOSSARY_DISPLAY_NAME", "Business Glossary")
+AUDIT_DATASET_ID = os.getenv("AUDIT_DATASET_ID")  # Optional: audit log disabled if not set
+MAX_WORKERS = int(os.getenv("GLOSSARY_MAX_WORKERS", "8"))
+ACTOR = os.getenv("GITHUB_ACTOR", "system")
+AUDIT_LOG_ITEMS = os.getenv("AUDIT_LOG_ITEMS", "false").lower() == "true"  # One audit row per published item
+AUDIT_STORAGE_WRITE_API = os.getenv("AUDIT_STORAGE_WRITE_API", "false").lower() == "true"
+RUN_LEDGER_ENABLED = os.getenv("RUN_LEDGER_ENABLED", "true").lower() == "true"  # Resume an interrupted recreate
+RUN_LEDGER_PATH = os.getenv("RUN_LEDGER_PATH", "output/ledger/run_ledger.sqlite3")
+RUN_LEDGER_MAX_AGE_HOURS = int(os.getenv("RUN_LEDGER_MAX_AGE_HOURS", "24"))
+PROPOSAL_STORE_ENABLED = os.getenv("PROPOSAL_STORE_ENABLED", "true").lower() == "true"
+PROPOSAL_STORE_DIR = os.getenv("PROPOSAL_STORE_DIR", "output/proposals")
+
+def store_glossary(data: dict, source: str):
+    """
+    Adds the proposal to the proposal store history of GLOSSARY_ID and prints what changed
+    since the previous one. Skipped when the store is disabled or pyarrow is missing.
+    """
+    if not PROPOSAL_STORE_ENABLED:
+        return
+    try:
+        store = ProposalStore(PROPOSAL_STORE_DIR)
+    except ImportError as e:
+        print(f"⚠️ {e}. The proposal is not added to the history.")
+        return
+    try:
+        previous = store.latest(GLOSSARY, GLOSSARY_ID)
+        record = store.append_glossary(GLOSSARY_ID, data, source=source)
+        if previous is None:
+            print(f"🗂️ Stored as proposal {record.proposal_id} (first of glossary {GLOSSARY_ID})")
+        elif previous.proposal_id == record.proposal_id:
+            print(f"🗂️ Same content as proposal {record.proposal_id}")
+        else:
+            diff = store.diff(previous.proposal_id, record.proposal_id)
+            print(f"🗂️ Stored as proposal {record.proposal_id}: {diff.summary()} items since {previous.proposal_id}")
+    except Exception as e:
+        print(f"⚠️ Could not add the proposal to the history: {e}")
+    finally:
+        store.close()
+
+def recreate_glossary(client: DataplexGlossaryClient, data: dict):
+    """
+    Deletes and republishes the glossary. With the run ledger, a run interrupted halfway
+    (same proposal) does not delete again: it only publishes the items still missing.
+    """
+    if not RUN_LEDGER_ENABLED:
+        client.delete_glossary(GLOSSARY_ID)
+        client.create_or_update_glossary(GLOSSARY_ID, GLOSSARY_DISPLAY_NAME)
+        return client.publish_glossary(data, GLOSSARY_ID)
+
+    ledger = RunLedger(RUN_LEDGER_PATH, max_age_seconds=RUN_LEDGER_MAX_AGE_HOURS * 3600)
+    try:
+        proposal_hash = content_hash(data)
+        run = ledger.open_run(f"glossary:{GLOSSARY_ID}", fingerprint=proposal_hash)
+        if run.completed("glossary", PUBLISHED, proposal_hash):
+            print(f"⏯️ Resuming run {run.run_id}: glossary already recreated, publishing the remaining items...")
+        else:
+            client.delete_glossary(GLOSSARY_ID)
+            client.create_or_update_glossary(GLOSSARY_ID, GLOSSARY_DISPLAY_NAME)
+            run.record("glossary", PUBLISHED, proposal_hash)
+        report = client.publish_glossary(data, GLOSSARY_ID, ledger=run)
+        if not report.failed:
+            run.finish()
+        return report
+    finally:
+        ledger.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the latest glossary proposal to Dataplex.")
+    parser.add_argument(
+        "--mode", choices=["reconcile", "recreate"], default=os.getenv("GLOSSARY_PUBLISH_MODE", "reconcile"),
+        help="reconcile: apply only the diff against the live glossary; recreate: delete and publish everything",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print the diff and estimated RPC count without applying it")
+    args = parser.parse_args()
+
+    print(f"🚀 Starting Business Glossary Publishing (mode: {args.mode})...")
+
+    output_dir = "output"
+    try:
+        files = [
+            os.path.join(output_dir, f) for f in os.listdir(output_dir)
+            if f.startswith("glossary_proposal_") and f.endswith(".json")
+        ]
+        if not files:
+            print("❌ No glossary JSON files found in output/")
+            return
+
+        latest_file = max(files, key=os.path.getmtime)
+        print(f"📖 Processing file: {latest_file}")
+
+        with open(latest_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    except Exception as e:
+        print(f"❌ Error reading glossary file: {e}")
+        return
+
+    store_glossary(data, latest_file)
+
+    client = DataplexGlossaryClient(PROJECT_ID, LOCATION, max_workers=MAX_WORKERS)
+
+    if args.dry_run:
+        client.reconcile_glossary(data, GLOSSARY_ID, dry_run=True)
+        return
+
+    # Buffered: events are written in batches by a background thread and flushed on exit
+    audit = AuditLogger(PROJECT_ID, AUDIT_DATASET_ID, use_storage_write_api=AUDIT_STORAGE_WRITE_API) if AUDIT_DATASET_ID else None
+
+    try:
+        if args.mode == "recreate":
+            report = recreate_glossary(client, data)
+        else:
+            client.create_or_update_glossary(GLOSSARY_ID, GLOSSARY_DISPLAY_NAME)
+            report = client.reconcile_glossary(data, GLOSSARY_ID)
+    except Exception as e:
+        print(f"❌ Error publishing glossary: {e}")
+        if audit:
+            audit.log_event("FAILED", actor=ACTOR, glossary_id=GLOSSARY_ID, details={"file": latest_file, "error": str(e)})
+            audit.close()
+        sys.exit(1)
+
+    status = "FAILED" if report.failed else "APPROVED_AND_PUBLISHED"
+    if audit and AUDIT_LOG_ITEMS:
+        for outcome in report.outcomes:
+            audit.log_event(f"ITEM_{outcome.status.upper()}", actor=ACTOR, glossary_id=GLOSSARY_ID, details={
+                "kind": outcome.kind,
+                "item_id": outcome.item_id,
+                "attempts": outcome.attempts,
+                "error": outcome.error,
+            })
+    if audit:
+        audit.log_event(status, actor=ACTOR, glossary_id=GLOSSARY_ID, details={
+            "file": latest_file,
+            "counts": report.counts,
+            "elapsed_seconds": round(report.elapsed_seconds, 2),
+            "failed_items": [o.item_id for o in report.failed],
+        })
+        audit.close()
+
+    if report.failed:
+        print(f"❌ {len(report.failed)} items failed to publish.")
+        sys.exit(1)
+    print(f"✅ Glossary published: {report.summary()}")
+
+if __name__ == "__main__":
+    telemetry.configure(
+        enabled=os.getenv("TELEMETRY_ENABLED", "true").lower() == "true",
+        jsonl_path=os.getenv("TELEMETRY_JSONL_PATH", "output/telemetry/spans.jsonl") or None,
+        otel=os.getenv("TELEMETRY_OTEL_ENABLED", "false").lower() == "true",
+    )
+    try:
+        main()
+    finally:
+        if telemetry.get_telemetry().finished:
+            print("\n" + telemetry.get_telemetry().summary_table())
+        if rate_limit.summary():
+            print(rate_limit.summary())
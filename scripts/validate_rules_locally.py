@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from modules.dq_rules import normalize_rules
+from modules.json_stream import extract_array_items
+from modules.local_dq import LocalRuleEvaluator
+
+def load_rules(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        return json.loads(content).get("rules", [])
+    except json.JSONDecodeError:
+        return extract_array_items(content, ("rules",))
+
+def find_extract(data_dir: str, table: str):
+    # <table>.parquet / <table>.csv files, or a <table>/ directory of files
+    for name in (table, f"{table}.parquet", f"{table}.csv", f"{table}.csv.gz"):
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a DQ rule proposal against local Parquet/CSV extracts.")
+    parser.add_argument("proposal", help="dq_rules_proposal_*.json file")
+    parser.add_argument("--data-dir", help="Directory with one extract per table (<table>.parquet, <table>.csv or <table>/)")
+    parser.add_argument("--data", action="append", default=[], metavar="TABLE=PATH", help="Extract of one table (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=128 * 1024, help="Rows per record batch")
+    parser.add_argument("--report", help="Write the results as JSON to this path")
+    parser.add_argument("--fail-on-violation", action="store_true", help="Exit with 1 if any rule is below its threshold")
+    args = parser.parse_args()
+
+    rules = normalize_rules(load_rules(args.proposal))
+    if not rules:
+        print("⚠️ No rules found in the proposal.")
+        return
+
+    extracts = dict(item.split("=", 1) for item in args.data)
+    tables = list(dict.fromkeys(r.table or "" for r in rules))
+    evaluator = LocalRuleEvaluator(batch_size=args.batch_size)
+
+    report = []
+    for table in tables:
+        path = extracts.get(table) or (find_extract(args.data_dir, table) if args.data_dir and table else None)
+        if not path and len(tables) == 1 and len(extracts) == 1:
+            path = next(iter(extracts.values()))
+        table_rules = [r for r in rules if (r.table or "") == table]
+        if not path:
+            print(f"⚠️ No extract for table '{table or '?'}': {len(table_rules)} rules skipped.")
+            continue
+
+        print(f"🔎 {table or path}: {len(table_rules)} rules against {path}")
+        for result in evaluator.evaluate(table_rules, path):
+            ratio = f"{result.pass_ratio:.2%}" if result.pass_ratio is not None else "-"
+            icon = {"PASSED": "✅", "FAILED": "❌"}.get(result.status, "⚠️")
+            print(f"   {icon} {result.rule_id} [{result.kind}] {ratio} (threshold {result.threshold:.0%})"
+                  + (f" - {result.message}" if result.message else ""))
+            report.append(dict(result.to_dict(), table=table))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"proposal": args.proposal, "results": report}, f, indent=2, ensure_ascii=False)
+        print(f"✅ Report written to {args.report}")
+
+    failed = [r for r in report if r["status"] == "FAILED"]
+    print(f"{len(report)} rules evaluated: {len(report) - len(failed)} passing or skipped, {len(failed)} below threshold.")
+    if failed and args.fail_on_violation:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
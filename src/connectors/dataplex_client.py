@@ -1,5 +1,6 @@
 from google.cloud import dataplex_v1
-from typing import Dict, Any
+from typing import Dict, Any, List
+from core.retry import retry_call
 
 class DataplexClient:
     def __init__(self, project_id: str, location: str):
@@ -16,7 +17,7 @@ class DataplexClient:
                         projects/{project}/locations/{location}/entryGroups/{entry_group}/entries/{entry}
         """
         request = dataplex_v1.GetEntryRequest(name=entry_name)
-        response = self.catalog_client.get_entry(request=request)
+        response = retry_call(lambda: self.catalog_client.get_entry(request=request), description=f"get_entry({entry_name})", api="dataplex")
         return response
 
     def update_entry(self, entry_name: str, metadata: Dict[str, Any], update_mask: list = None):
@@ -43,7 +44,7 @@ class DataplexClient:
             entry=entry,
             update_mask=mask
         )
-        return self.catalog_client.update_entry(request=request)
+        return retry_call(lambda: self.catalog_client.update_entry(request=request), description=f"update_entry({entry_name})", api="dataplex")
 
     def create_quality_scan(self, parent: str, scan_id: str, table_spec: Dict[str, Any], rules: List[Dict[str, Any]]):
         """Creates a Data Quality Scan.
@@ -70,4 +71,4 @@ class DataplexClient:
             data_scan=data_scan
         )
         
-        return self.data_scan_client.create_data_scan(request=request)
+        return retry_call(lambda: self.data_scan_client.create_data_scan(request=request), description=f"create_data_scan({scan_id})", api="dataplex")
@@ -1,5 +1,6 @@
 from google.cloud import storage
 from typing import List, Optional
+from core.retry import retry_call
 
 class GCSClient:
     def __init__(self, project_id: str):
@@ -7,11 +8,14 @@ class GCSClient:
 
     def list_files(self, bucket_name: str, prefix: Optional[str] = None) -> List[str]:
         """Lists files in a GCS bucket."""
-        blobs = self.client.list_blobs(bucket_name, prefix=prefix)
-        return [blob.name for blob in blobs]
+        return retry_call(
+            lambda: [blob.name for blob in self.client.list_blobs(bucket_name, prefix=prefix)],
+            description=f"list_blobs({bucket_name})",
+            api="storage",
+        )
 
     def read_file(self, bucket_name: str, blob_name: str) -> bytes:
         """Reads a file from GCS."""
         bucket = self.client.bucket(bucket_name)
         blob = bucket.blob(blob_name)
-        return blob.download_as_bytes()
+        return retry_call(blob.download_as_bytes, description=f"download({blob_name})", api="storage")
@@ -1,12 +1,22 @@
 import vertexai
 from vertexai.generative_models import GenerativeModel
+from typing import Optional
+from core.response_cache import CachedGenerativeModel, ResponseCache, get_shared_cache
+from core.retry import retry_call
+from src.utils.config import RESPONSE_CACHE_DIR
 
 class VertexClient:
-    def __init__(self, project_id: str, location: str):
+    MODEL_NAME = "gemini-1.5-pro-001"
+
+    def __init__(self, project_id: str, location: str, response_cache: Optional[ResponseCache] = None):
         vertexai.init(project=project_id, location=location)
-        self.model = GenerativeModel("gemini-1.5-pro-001")
+        self.model = CachedGenerativeModel(
+            GenerativeModel(self.MODEL_NAME),
+            self.MODEL_NAME,
+            response_cache or get_shared_cache(RESPONSE_CACHE_DIR),
+        )
 
     def generate_content(self, prompt: str) -> str:
-        """Generates content using Gemini."""
-        response = self.model.generate_content(prompt)
+        """Generates content using Gemini (memoized by prompt)."""
+        response = retry_call(lambda: self.model.generate_content(prompt), description="Gemini generate_content", api="vertex")
         return response.text
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
+
+class GlossaryTerm(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    term: str = Field(..., description="Business term name.")
+    definition: str = Field(..., description="Functional (non-technical) definition.")
+    parent_category: Optional[str] = Field(None, description="Display name of the parent category.")
+    labels: Dict[str, Any] = Field(default_factory=dict, description="Term labels (e.g., domain, subdomain).")
+    overview: Optional[str] = Field(None, description="Long description of the term.")
+    related_terms: List[str] = Field(default_factory=list, description="Related business terms.")
+    synonym_terms: List[str] = Field(default_factory=list, description="Synonyms of the term.")
+    contacts: List[str] = Field(default_factory=list, description="Suggested contacts (roles).")
+    related_technical_column: Optional[str] = Field(None, description="Related technical column.")
+
+class GlossaryCategory(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = Field(None, description="Stable category identifier.")
+    display_name: str = Field(..., description="Category display name.")
+    description: Optional[str] = Field(None, description="Short description.")
+    overview: Optional[str] = Field(None, description="Detailed explanation of the category.")
+    labels: Dict[str, Any] = Field(default_factory=dict, description="Category labels.")
+    terms: List[GlossaryTerm] = Field(default_factory=list, description="Business terms in the category.")
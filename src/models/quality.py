@@ -1,9 +1,16 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, Optional
 
 class QualityRule(BaseModel):
+    # Keep any extra attribute the model proposes so nothing is lost on validation
+    model_config = ConfigDict(extra="allow")
+
     column: str = Field(..., description="The column this rule applies to.")
     dimension: str = Field(..., description="Data quality dimension (e.g., COMPLETENESS, VALIDITY).")
+    table: Optional[str] = Field(None, description="Table the rule applies to.")
+    type: Optional[str] = Field(None, description="Rule type (e.g., UNIQUENESS, NOT_NULL, REGEX, SET, SQL_ASSERTION).")
+    description: Optional[str] = Field(None, description="Description of the rule.")
+    parameters: Optional[Dict[str, Any]] = Field(None, description="Rule-specific parameters (pattern, values, sql_expression...).")
     name: Optional[str] = Field(None, description="Human-readable name for the rule.")
     threshold: float = Field(1.0, description="Passing threshold (0.0 to 1.0).")
     sql_expression: Optional[str] = Field(None, description="Custom SQL for validity checks.")
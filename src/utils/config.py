@@ -6,3 +6,4 @@ load_dotenv()
 PROJECT_ID = os.getenv("PROJECT_ID")
 LOCATION = os.getenv("LOCATION", "us-central1")
 GCS_BUCKET = os.getenv("GCS_BUCKET")
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "output/cache/gemini")
@@ -0,0 +1,71 @@
+import queue
+from datetime import datetime, timedelta
+
+import pytest
+
+from core import rate_limit
+from modules import audit_logger
+from modules.audit_logger import AuditLogger
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+class FlakySink:
+    """Fails the first `failures` writes, then rejects the row ids in `retryable` once."""
+
+    def __init__(self, failures=0, retryable=()):
+        self.calls = 0
+        self.failures = failures
+        self.retryable = set(retryable)
+        self.written = []
+
+    def write(self, rows, row_ids):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise Unavailable("backend unavailable")
+        rejected = {i: (True, "stopped") for i, row_id in enumerate(row_ids) if row_id in self.retryable}
+        self.retryable.clear()
+        self.written.extend(row_id for i, row_id in enumerate(row_ids) if i not in rejected)
+        return rejected
+
+
+def make_logger(sink, max_retries=3):
+    logger = AuditLogger.__new__(AuditLogger)
+    logger.sink = sink
+    logger.max_retries = max_retries
+    return logger
+
+
+@pytest.fixture(autouse=True)
+def no_waits(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    rate_limit.reset_guards()
+    monkeypatch.setattr(audit_logger.time, "sleep", lambda seconds: None)
+
+
+def batch(n):
+    return [({"status": "ok"}, f"id{i}") for i in range(n)]
+
+
+def test_transient_errors_share_the_attempt_budget():
+    sink = FlakySink(failures=10)
+    assert len(make_logger(sink, max_retries=3)._write_batch(batch(2))) == 2
+    assert sink.calls == 3
+
+
+def test_retries_transient_errors_then_rejected_rows():
+    sink = FlakySink(failures=1, retryable={"id1"})
+    assert make_logger(sink)._write_batch(batch(3)) == []
+    assert sink.calls == 3
+    assert sorted(sink.written) == ["id0", "id1", "id2"]
+
+
+def test_events_are_timestamped_in_utc():
+    logger = make_logger(FlakySink())
+    logger.buffered, logger.flush_max_rows, logger._closed = True, 10, False
+    logger._queue = queue.Queue()
+    logger.log_event("ok")
+    (row, _), = logger._drain()
+    assert datetime.fromisoformat(row["timestamp"]).utcoffset() == timedelta(0)
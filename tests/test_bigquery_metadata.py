@@ -0,0 +1,61 @@
+import sys
+import types
+
+import pytest
+
+from modules.bigquery_metadata import BigQueryMetadataHarvester
+
+
+@pytest.fixture(autouse=True)
+def bigquery_module(monkeypatch):
+    # Only QueryJobConfig / ArrayQueryParameter are used to build the query
+    try:
+        from google.cloud import bigquery  # noqa: F401
+        return
+    except ImportError:
+        pass
+    google = types.ModuleType("google")
+    cloud = types.ModuleType("google.cloud")
+    bigquery = types.ModuleType("google.cloud.bigquery")
+    bigquery.QueryJobConfig = lambda **kwargs: kwargs
+    bigquery.ArrayQueryParameter = lambda *args: args
+    google.cloud, cloud.bigquery = cloud, bigquery
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.cloud", cloud)
+    monkeypatch.setitem(sys.modules, "google.cloud.bigquery", bigquery)
+
+
+class RowsClient:
+    project = "p"
+
+    def __init__(self, column_rows, option_rows=()):
+        self.results = {"COLUMN_FIELD_PATHS": list(column_rows), "TABLE_OPTIONS": list(option_rows)}
+
+    def query(self, sql, job_config=None):
+        rows = next(rows for view, rows in self.results.items() if view in sql)
+        return types.SimpleNamespace(result=lambda: rows)
+
+
+def row(field_path, data_type, table="orders", description=None):
+    return {"table_name": table, "column_name": field_path.split(".")[0], "field_path": field_path,
+            "data_type": data_type, "description": description}
+
+
+def test_nested_fields_are_attached_whatever_the_row_order():
+    client = RowsClient([
+        row("customer.address.city", "STRING"),
+        row("customer.address", "STRUCT<city STRING>"),
+        row("customer", "STRUCT<name STRING, address STRUCT<city STRING>>"),
+        row("customer.name", "STRING"),
+        row("id", "INT64"),
+    ], [{"table_name": "orders", "option_value": '"All orders"'}])
+
+    tables = BigQueryMetadataHarvester(client)._harvest_bulk("ds", ["orders"])
+
+    orders = tables["orders"]
+    assert orders.description == "All orders"
+    assert [c.name for c in orders.columns] == ["customer", "id"]
+    customer = orders.columns[0]
+    assert sorted(f.name for f in customer.fields) == ["address", "name"]
+    address = next(f for f in customer.fields if f.name == "address")
+    assert [f.name for f in address.fields] == ["city"]
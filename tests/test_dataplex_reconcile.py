@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("google.cloud.dataplex_v1")
+exceptions = pytest.importorskip("google.api_core.exceptions")
+
+from benchmarks.fakes import FakeGlossaryServiceClient
+from core import rate_limit
+from modules.dataplex_client import FALLBACK_PARENT_LABEL, DataplexGlossaryClient
+
+
+class CategoryParentRejected(FakeGlossaryServiceClient):
+    """
+    Rejects terms whose parent is a category, as stricter API validation does: every
+    term ends up under the glossary root through the publish fallback.
+    """
+
+    def create_glossary_term(self, parent, term, term_id):
+        if "/categories/" in (term.parent or ""):
+            self._rpc("create_glossary_term")
+            raise exceptions.InvalidArgument("category parent rejected")
+        return super().create_glossary_term(parent, term, term_id)
+
+
+PROPOSAL = {"glossary": {"categories": [
+    {"id": "sales", "display_name": "Sales", "description": "Sales data", "terms": [
+        {"term": "Revenue", "definition": "Money in", "labels": {"domain": "sales"}},
+    ]},
+]}}
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+    rate_limit.reset_guards()
+
+
+def test_fallback_terms_are_not_rediffed_as_moves():
+    service = CategoryParentRejected()
+    client = DataplexGlossaryClient("p", "us", max_workers=2, client=service)
+    client.create_or_update_glossary("g", "Glossary")
+
+    report = client.reconcile_glossary(PROPOSAL, "g")
+    assert not report.failed
+    (term,) = service.items["terms"].values()
+    assert "/categories/" not in term.parent
+    assert term.labels[FALLBACK_PARENT_LABEL] == "sales"
+
+    assert client.diff_glossary(PROPOSAL, "g").is_empty
+
+
+def test_updates_keep_the_fallback_label():
+    service = CategoryParentRejected()
+    client = DataplexGlossaryClient("p", "us", max_workers=2, client=service)
+    client.create_or_update_glossary("g", "Glossary")
+    client.reconcile_glossary(PROPOSAL, "g")
+
+    changed = {"glossary": {"categories": [dict(PROPOSAL["glossary"]["categories"][0], terms=[
+        {"term": "Revenue", "definition": "Income", "labels": {"domain": "sales"}},
+    ])]}}
+    diff = client.diff_glossary(changed, "g")
+    assert not diff.moved_terms and len(diff.changed_terms) == 1
+    client.apply_glossary_diff(diff, "g")
+    assert client.diff_glossary(changed, "g").is_empty
+
+
+class TermDeletesNeverLand(FakeGlossaryServiceClient):
+    """Acknowledges term deletions without removing the terms, so listings never drain."""
+
+    def delete_glossary_term(self, name):
+        self._rpc("delete_glossary_term")
+
+
+def test_delete_glossary_keeps_a_glossary_whose_children_remain():
+    service = TermDeletesNeverLand()
+    client = DataplexGlossaryClient("p", "us", max_workers=2, client=service)
+    client.create_or_update_glossary("g", "Glossary")
+    client.reconcile_glossary(PROPOSAL, "g")
+
+    with pytest.raises(RuntimeError, match="run again to resume"):
+        client.delete_glossary("g")
+    assert service.glossaries and service.items["terms"]
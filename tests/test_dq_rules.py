@@ -0,0 +1,29 @@
+from modules.dq_rules import NOT_NULL, RANGE, REGEX, SET, SQL_ASSERTION, UNSUPPORTED, normalize_rule, normalize_rules
+
+
+def test_type_aliases():
+    assert normalize_rule({"column": "id", "type": "not-null"}).kind == NOT_NULL
+    assert normalize_rule({"sql_expression": "a > 0", "type": "SqlAssertion"}).kind == SQL_ASSERTION
+    assert normalize_rule({"column": "c", "type": "ACCEPTED_VALUES", "parameters": {"allowed_values": ["x"]}}).kind == SET
+
+
+def test_kind_inferred_from_parameters_and_dimension():
+    assert normalize_rule({"column": "mail", "type": "custom", "parameters": {"regex": ".+@.+"}}).kind == REGEX
+    assert normalize_rule({"column": "age", "parameters": {"min": 0}}).kind == RANGE
+    assert normalize_rule({"column": "id", "dimension": "completeness"}).kind == NOT_NULL
+
+
+def test_missing_mandatory_parameters_are_unsupported():
+    assert normalize_rule({"column": "mail", "type": "REGEX"}).kind == UNSUPPORTED
+    assert normalize_rule({"type": "NOT_NULL"}).kind == UNSUPPORTED
+    assert normalize_rule({"column": "x", "type": "whatever"}).kind == UNSUPPORTED
+
+
+def test_table_is_unqualified_and_ids_are_unique():
+    rules = normalize_rules([
+        {"table": "p.d.orders", "column": "id", "dimension": "UNIQUENESS"},
+        {"table": "orders", "column": "id", "dimension": "UNIQUENESS", "type": "NOT_NULL"},
+        {"table": "orders", "column": "id", "dimension": "UNIQUENESS"},
+    ])
+    assert [r.table for r in rules] == ["orders"] * 3
+    assert [r.rule_id for r in rules] == ["rule_id_uniqueness", "rule_id_uniqueness_2", "rule_id_uniqueness_3"]
@@ -0,0 +1,90 @@
+import types
+
+import pytest
+
+from core import github_client, retry
+from core.github_client import GitHubClient, git_blob_sha
+
+
+class GithubError(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class FlakyRepo:
+    """
+    Repository stand-in whose writes land on GitHub but answer 502 the first time, so the
+    retried request gets 422 as the real API does.
+    """
+
+    owner = types.SimpleNamespace(login="org")
+
+    def __init__(self):
+        self.refs = {"heads/main": "base-sha"}
+        self.files = {}
+        self.pulls = []
+        self.failed = set()
+
+    def _flaky(self, name: str, exists: bool):
+        if exists:
+            raise GithubError(422)
+        if name not in self.failed:
+            self.failed.add(name)
+            return True
+        return False
+
+    def get_git_ref(self, ref):
+        return types.SimpleNamespace(object=types.SimpleNamespace(sha=self.refs[ref]))
+
+    def create_git_ref(self, ref, sha):
+        key = ref[len("refs/"):]
+        exists = key in self.refs
+        self.refs.setdefault(key, sha)
+        if self._flaky("ref", exists):
+            raise GithubError(502)
+
+    def create_file(self, path, message, content, branch):
+        exists = (branch, path) in self.files
+        self.files.setdefault((branch, path), content)
+        if self._flaky("file", exists):
+            raise GithubError(502)
+
+    def get_contents(self, path, ref):
+        return types.SimpleNamespace(sha=git_blob_sha(self.files[(ref, path)]))
+
+    def create_pull(self, title, body, head, base):
+        exists = any(p.head == head for p in self.pulls)
+        if not exists:
+            self.pulls.append(types.SimpleNamespace(head=head, base=base, html_url=f"https://github.test/pull/{len(self.pulls) + 1}"))
+        if self._flaky("pull", exists):
+            raise GithubError(502)
+        return self.pulls[-1]
+
+    def get_pulls(self, state, head, base):
+        return [p for p in self.pulls if f"org:{p.head}" == head and p.base == base]
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(github_client, "config", types.SimpleNamespace(GITHUB_BASE_BRANCH="main"))
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+
+
+def test_retried_writes_that_already_landed_are_not_errors():
+    repo = FlakyRepo()
+    url = GitHubClient(repo=repo).create_proposal_pr('{"rules": []}', "data_quality_rules")
+
+    assert url == "https://github.test/pull/1"
+    assert repo.failed == {"ref", "file", "pull"}
+    assert len(repo.pulls) == 1
+
+
+def test_conflicting_branch_is_still_an_error():
+    repo = FlakyRepo()
+    repo.failed = {"ref"}
+    client = GitHubClient(repo=repo)
+    repo.refs["heads/taken"] = "other-sha"
+    with pytest.raises(GithubError):
+        client._create_branch("taken", "base-sha")
@@ -0,0 +1,29 @@
+import json
+
+from modules.json_stream import close_truncated_json, extract_array_items, iter_array_items, loads_lenient
+
+DOCUMENT = json.dumps({"rules": [{"id": 1, "name": "a, [b]"}, {"id": 2, "name": "c \\\" }"}, {"id": 3}]})
+
+
+def test_items_survive_any_chunking():
+    for size in (1, 2, 7, len(DOCUMENT)):
+        chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+        assert [item["id"] for item in iter_array_items(chunks, ("rules",))] == [1, 2, 3]
+
+
+def test_repairs_fences_and_trailing_commas():
+    text = '```json\n{"rules": [{"id": 1, "tags": ["x",],}, {"id": 2,},]}\n```'
+    assert extract_array_items(text, ("rules",)) == [{"id": 1, "tags": ["x"]}, {"id": 2}]
+    assert loads_lenient('{"a": "keep ,}", "b": [1,],}') == {"a": "keep ,}", "b": [1]}
+
+
+def test_truncated_document_keeps_complete_items():
+    truncated = DOCUMENT[:DOCUMENT.index('{"id": 3}') + 6]
+    assert [item["id"] for item in extract_array_items(truncated, ("rules",))] == [1, 2]
+
+
+def test_salvages_the_complete_members_of_the_last_item():
+    text = '{"categories": [{"id": "a", "terms": [{"term": "x"}, {"term": "y", "defin'
+    items = list(iter_array_items([text], ("categories",), salvage_tail=True))
+    assert items == [{"id": "a", "terms": [{"term": "x"}, {"term": "y"}]}]
+    assert json.loads(close_truncated_json('{"a": [1, 2, {"b": "c')) == {"a": [1, 2, {}]}
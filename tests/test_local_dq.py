@@ -0,0 +1,51 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from modules.dq_rules import normalize_rules
+from modules.local_dq import LocalRuleEvaluator
+
+TABLE = {
+    "id": [1, 2, 3, 4, 5, 6, 7, 8, 9, 9],
+    "email": ["a@x.com", "b@x.com", "bad", "c@x.com", "d@x.com", "e@x.com", "also-bad", "f@x.com", "g@x.com", "h@x.com"],
+    "status": ["A", "B", "A", "C", "A", "B", "A", "A", "B", "X"],
+    "amount": [10, 20, -5, 30, None, 40, 50, 60, 70, 80],
+}
+
+RULES = normalize_rules([
+    {"column": "id", "dimension": "UNIQUENESS", "type": "UNIQUENESS"},
+    {"column": "amount", "dimension": "COMPLETENESS", "type": "NOT_NULL"},
+    {"column": "email", "dimension": "VALIDITY", "type": "REGEX", "parameters": {"pattern": ".+@.+"}},
+    {"column": "status", "dimension": "VALIDITY", "type": "SET", "parameters": {"values": ["A", "B"]}},
+    {"column": "amount", "dimension": "ACCURACY", "type": "RANGE", "parameters": {"min": 0}, "threshold": 0.8},
+    {"column": "amount", "dimension": "CONSISTENCY", "type": "SQL_ASSERTION", "sql_expression": "amount >= 0"},
+])
+COLUMN_RATIOS = [0.8, 0.9, 0.8, 0.8, 0.8]
+
+
+@pytest.fixture(params=["parquet", "csv"])
+def extract(request, tmp_path):
+    table = pa.table(TABLE)
+    path = tmp_path / f"extract.{request.param}"
+    if request.param == "parquet":
+        pq.write_table(table, path, row_group_size=4)
+    else:
+        pa_csv.write_csv(table, path)
+    return str(path)
+
+
+def test_column_rules_stream_over_several_batches(extract):
+    results = LocalRuleEvaluator(batch_size=3, use_duckdb=False).evaluate(RULES, extract)
+    assert [r.pass_ratio for r in results[:5]] == COLUMN_RATIOS
+    assert [r.status for r in results[:5]] == ["FAILED", "FAILED", "FAILED", "FAILED", "PASSED"]
+    assert results[5].status == "SKIPPED"
+
+
+def test_duckdb_agrees_with_arrow(extract):
+    pytest.importorskip("duckdb")
+    arrow = LocalRuleEvaluator(batch_size=3, use_duckdb=False).evaluate(RULES[:5], extract)
+    duckdb = LocalRuleEvaluator(batch_size=3, use_duckdb=True).evaluate(RULES, extract)
+    assert [r.to_dict() for r in duckdb[:5]] == [r.to_dict() for r in arrow]
+    assert duckdb[5].pass_ratio == 0.8
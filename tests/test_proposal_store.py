@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from modules.proposal_store import GLOSSARY, RULES, ProposalStore
+
+REGEX = {"table": "t", "column": "a", "dimension": "VALIDITY", "type": "REGEX", "parameters": {"pattern": "^[A-Z]+$"}}
+RANGE = {"table": "t", "column": "a", "dimension": "VALIDITY", "type": "RANGE", "parameters": {"min_value": 0}}
+NOT_NULL = {"table": "t", "column": "b", "dimension": "COMPLETENESS", "type": "NOT_NULL"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProposalStore(str(tmp_path / "proposals"))
+    yield store
+    store.close()
+
+
+def test_round_trip_and_latest(store):
+    proposal = {"rules": [REGEX, RANGE, NOT_NULL]}
+    first = store.append_rules("p.ds", json.dumps(proposal), source="a.json")
+    assert store.load(first.proposal_id) == proposal
+    assert json.loads(store.export_json(first.proposal_id)) == proposal
+
+    # Unchanged content is not stored again
+    assert store.append_rules("p.ds", proposal).proposal_id == first.proposal_id
+    second = store.append_rules("p.ds", {"rules": [NOT_NULL]})
+    store.append_rules("p.other", {"rules": [REGEX]})
+    assert store.latest(RULES, "p.ds").proposal_id == second.proposal_id
+    assert [r.proposal_id for r in store.history(RULES, "p.ds")] == [second.proposal_id, first.proposal_id]
+    assert store.keys(RULES) == ["p.ds", "p.other"]
+
+
+def test_diff_keeps_rules_on_the_same_column_and_dimension_apart(store):
+    old = store.append_rules("p.ds", {"rules": [REGEX, RANGE, NOT_NULL]})
+    new = store.append_rules("p.ds", {"rules": [dict(REGEX, parameters={"pattern": "^[a-z]+$"}), NOT_NULL]})
+
+    diff = store.diff(old.proposal_id, new.proposal_id)
+    assert diff.removed == ["t:rule_a_validity:range"]
+    assert diff.changed == ["t:rule_a_validity:regex"]
+    assert diff.added == []
+    assert diff.summary() == "+0 -1 ~1"
+
+
+def test_diff_numbers_rules_sharing_a_key(store):
+    second_regex = dict(REGEX, parameters={"pattern": "^[0-9]+$"})
+    old = store.append_rules("p.ds", {"rules": [REGEX]})
+    new = store.append_rules("p.ds", {"rules": [REGEX, second_regex]})
+    diff = store.diff(old.proposal_id, new.proposal_id)
+    assert diff.added == ["t:rule_a_validity:regex#2"] and not diff.changed and not diff.removed
+
+
+def test_diff_against_nothing_adds_everything(store):
+    record = store.append_rules("p.ds", {"rules": [REGEX, RANGE]})
+    assert len(store.diff(None, record.proposal_id).added) == 2
+
+
+def test_glossary_round_trip(store):
+    glossary = {"glossary": {"categories": [
+        {"id": "sales", "display_name": "Sales", "terms": [{"term": "Revenue", "definition": "Money in"}]},
+        {"id": "empty", "display_name": "Empty", "terms": []},
+    ]}}
+    record = store.append_glossary("g", glossary)
+    assert record.items == 3
+    assert store.load(record.proposal_id) == glossary
+
+    changed = json.loads(json.dumps(glossary))
+    changed["glossary"]["categories"][0]["terms"][0]["definition"] = "Income"
+    diff = store.diff(record.proposal_id, store.append_glossary("g", changed).proposal_id)
+    assert diff.changed == ["term:sales:Revenue"]
+    assert store.latest(GLOSSARY, "g").items == 3
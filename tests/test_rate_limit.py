@@ -0,0 +1,120 @@
+import pytest
+
+from core import rate_limit
+from core.rate_limit import AdaptiveRateLimiter, ApiGuard, CircuitBreaker, CircuitOpenError, parse_rates
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class HttpError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def test_parse_rates():
+    assert parse_rates("vertex=2, GitHub=5.5,") == {"vertex": 2.0, "github": 5.5}
+    assert parse_rates("") == {}
+    with pytest.raises(ValueError):
+        parse_rates("vertex")
+
+
+def test_limiter_paces_requests_at_its_rate():
+    clock = FakeClock()
+    # Powers of two keep the fake clock exact
+    limiter = AdaptiveRateLimiter(8, clock=clock, sleep=clock.sleep)
+    for _ in range(24):
+        limiter.acquire()
+    # The first second of burst is free, the remaining 16 requests take 2s
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_limiter_cuts_on_throttle_and_recovers():
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(8, min_rate=1, clock=clock, sleep=clock.sleep)
+    limiter.on_throttle(pause=5)
+    assert limiter.rate == 4
+    # A second 429 from the same burst does not cut again
+    limiter.on_throttle()
+    assert limiter.rate == 4
+    limiter.acquire()
+    assert clock.now >= 5
+
+    clock.now += 10
+    limiter.on_throttle()
+    clock.now += 10
+    limiter.on_throttle()
+    clock.now += 10
+    limiter.on_throttle()
+    assert limiter.rate == 1
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 8
+
+
+def test_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("dataplex")
+
+    clock.now = 31
+    breaker.before_call("dataplex")  # single probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("dataplex")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call("dataplex")
+
+
+def test_failed_probe_reopens_the_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 11
+    breaker.before_call()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_guard_classifies_errors():
+    clock = FakeClock()
+    guard = ApiGuard("bigquery", AdaptiveRateLimiter(10, clock=clock, sleep=clock.sleep), CircuitBreaker(1, clock=clock))
+    guard.on_error(HttpError(429), pause=1)
+    assert guard.limiter.throttled == 1 and guard.breaker.state == "closed"
+    guard.on_error(HttpError(404))
+    assert guard.breaker.state == "closed"
+    guard.on_error(HttpError(503))
+    assert guard.breaker.state == "open"
+
+
+def test_get_guard_reads_the_environment_without_building_the_config(monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", "dataplex=3")
+    rate_limit.reset_guards()
+    try:
+        guard = rate_limit.get_guard("dataplex")
+        assert guard.limiter.max_rate == 3
+
+        monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+        assert rate_limit.get_guard("dataplex") is None
+
+        monkeypatch.setenv("RATE_LIMIT_ENABLED", "true")
+        monkeypatch.setenv("RATE_LIMITS", "invalid")
+        rate_limit.reset_guards()
+        assert rate_limit.get_guard("vertex") is None
+    finally:
+        rate_limit.reset_guards()
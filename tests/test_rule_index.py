@@ -0,0 +1,42 @@
+import json
+
+from modules.bigquery_metadata import ColumnMetadata, ColumnProfile, TableMetadata, TableProfile
+from modules.rule_index import build_rule_index, normalize_column_name
+
+PROPOSAL = json.dumps({"rules": [
+    {"table": "customers", "column": "customer_email", "dimension": "VALIDITY", "type": "REGEX", "parameters": {"pattern": ".+@.+"}},
+    {"table": "customers", "column": "customer_id", "dimension": "UNIQUENESS", "type": "UNIQUENESS"},
+    {"table": "customers", "column": "customer_id", "dimension": "COMPLETENESS", "type": "NOT_NULL"},
+    {"table": "customers", "column": "total", "dimension": "VALIDITY", "type": "SQL_ASSERTION", "sql_expression": "total >= 0"},
+]})
+
+
+def index(**kwargs):
+    return build_rule_index([("customers.json", PROPOSAL)], **kwargs)
+
+
+def test_column_names_are_normalized():
+    assert normalize_column_name("customerEmail") == normalize_column_name("Customer-Email") == "customer_email"
+
+
+def test_exact_and_similar_names_match():
+    rules = index()
+    assert rules.lookup("CustomerEmail").similarity == 1.0
+    match = rules.lookup("customer_emails", "STRING")
+    assert match and match.indexed_name == "customer_email" and 0.8 <= match.similarity < 1.0
+    assert rules.lookup("order_date") is None
+    assert (rules.hits, rules.lookups) == (2, 3)
+
+
+def test_incompatible_types_sql_assertions_and_support_are_not_reused():
+    assert index().lookup("customer_email", "INTEGER") is None
+    assert index().lookup("total") is None
+    assert index(min_support=2).lookup("customer_id") is None
+
+
+def test_assign_skips_rules_the_profile_contradicts():
+    table = TableMetadata("orders", columns=[ColumnMetadata("customer_id", "INTEGER"), ColumnMetadata("amount", "FLOAT")],
+                          profile=TableProfile(rows=100, columns=[ColumnProfile("customer_id", null_ratio=0.0, approx_distinct=40)]))
+    reused, pending = index().assign([table])
+    assert [(r["table"], r["type"], r["reused_from"]) for r in reused["orders"]] == [("orders", "NOT_NULL", "customer_id")]
+    assert [c.name for c in pending[0].columns] == ["amount"]
@@ -0,0 +1,90 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from modules.bigquery_metadata import ColumnMetadata, TableMetadata
+from modules.rule_index import build_rule_index
+from modules.run_ledger import GENERATED, HARVESTED, PUBLISHED, RunLedger, content_hash
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger.sqlite3"))
+    yield ledger
+    ledger.close()
+
+
+def test_interrupted_run_resumes_with_its_items(tmp_path, ledger):
+    run = ledger.open_run("dq:p.d", fingerprint="model-a")
+    run.record("orders", GENERATED, content_hash("orders v1"), payload={"rules": [1]})
+    ledger.close()
+
+    reopened = RunLedger(str(tmp_path / "ledger.sqlite3"))
+    try:
+        run = reopened.open_run("dq:p.d", fingerprint="model-a")
+        assert run.resumed and run.recorded == 1
+        assert run.completed("orders", HARVESTED, content_hash("orders v1")).payload == {"rules": [1]}
+        assert run.completed("orders", PUBLISHED, content_hash("orders v1")) is None
+        assert run.completed("orders", GENERATED, content_hash("orders v2")) is None
+        assert run.summary()["skipped"] == 1
+    finally:
+        reopened.close()
+
+
+def test_changed_fingerprint_or_finished_run_starts_over(ledger):
+    first = ledger.open_run("dq:p.d", fingerprint="model-a")
+    first.record("orders", GENERATED, "h")
+    second = ledger.open_run("dq:p.d", fingerprint="model-b")
+    assert not second.resumed and second.run_id != first.run_id and second.get("orders") is None
+
+    second.record("orders", GENERATED, "h")
+    second.finish()
+    assert not ledger.open_run("dq:p.d", fingerprint="model-b").resumed
+
+
+def test_max_age_and_unknown_states(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger.sqlite3"), max_age_seconds=-1)
+    try:
+        ledger.open_run("glossary:g")
+        assert not ledger.open_run("glossary:g").resumed
+        with pytest.raises(ValueError):
+            ledger.record("glossary:g", "term", "done", "h")
+    finally:
+        ledger.close()
+
+
+class CrashingGenerator:
+    """Stands in for `DataQualityGenerator`: fails the first call, then proposes a rule per column sent."""
+
+    def __init__(self):
+        self.contexts = []
+
+    def suggest_quality_rules(self, context):
+        self.contexts.append(context)
+        if len(self.contexts) == 1:
+            raise RuntimeError("model unavailable")
+        return json.dumps({"rules": [{"table": "orders", "column": "amount", "dimension": "VALIDITY", "type": "RANGE", "parameters": {"min": 0}}]})
+
+
+def test_resumed_run_generates_the_new_columns_of_a_partly_indexed_table(monkeypatch, ledger):
+    import main
+
+    monkeypatch.setattr(main, "config", SimpleNamespace(MODEL_NAME="m", PROFILING_ENABLED=False, GENERATION_SHARDING=False, CONTEXT_FORMAT="full"))
+    index = build_rule_index([("customers.json", json.dumps({"rules": [
+        {"table": "customers", "column": "customer_email", "dimension": "VALIDITY", "type": "REGEX", "parameters": {"pattern": ".+@.+"}},
+    ]}))])
+    orders = TableMetadata("orders", columns=[ColumnMetadata("customer_email", "STRING"), ColumnMetadata("amount", "FLOAT")])
+    dq_gen = CrashingGenerator()
+
+    with pytest.raises(RuntimeError):
+        main.generate_quality_rules(dq_gen, "p", "d", [orders], rule_index=index, ledger=ledger.open_run("dq:p.d"))
+    run = ledger.open_run("dq:p.d")
+    assert run.resumed and run.recorded == 0
+    rules = json.loads(main.generate_quality_rules(dq_gen, "p", "d", [orders], rule_index=index, ledger=run))["rules"]
+    assert "amount" in dq_gen.contexts[-1] and "customer_email" not in dq_gen.contexts[-1]
+    assert sorted(r["column"] for r in rules) == ["amount", "customer_email"]
+
+    # Recorded under the fingerprint of the full table, so the next resume skips the model
+    cached, pending = main.split_cached_rules("p", "d", [orders], ledger=ledger.open_run("dq:p.d"))
+    assert not pending and len(cached["orders"]) == 2